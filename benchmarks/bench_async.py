@@ -0,0 +1,101 @@
+"""
+AsyncMemoryCondenser load test: search latency with and without ingest.
+
+A pool of concurrent searcher tasks issues queries back to back, first
+against an idle store and then while a producer streams new turns
+through ``ingest``. Reports p50/p99 search latency for both phases and
+the ingest rate sustained alongside.
+
+Usage:
+    pixi run python benchmarks/bench_async.py [--seed-turns 2000] [--searchers 8] [--real-model]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from common import StubEncoder, synthetic_turns
+
+from memory_condense import AsyncMemoryCondenser
+
+
+async def _searcher(amc, queries, latencies: list[float], stop: asyncio.Event) -> None:
+    i = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await amc.search(queries[i % len(queries)], k=10)
+        latencies.append(time.perf_counter() - start)
+        i += 1
+
+
+async def _phase(amc, queries, searchers: int, seconds: float, ingest_turns=None):
+    latencies: list[float] = []
+    stop = asyncio.Event()
+    tasks = [
+        asyncio.create_task(_searcher(amc, queries, latencies, stop))
+        for _ in range(searchers)
+    ]
+    ingested = 0
+    start = time.perf_counter()
+    if ingest_turns is None:
+        await asyncio.sleep(seconds)
+    else:
+        pending = set()
+        for role, text in ingest_turns:
+            if time.perf_counter() - start > seconds:
+                break
+            pending.add(asyncio.create_task(amc.ingest(role, text)))
+            if len(pending) >= 32:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                ingested += len(done)
+        ingested += len(await asyncio.gather(*pending))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await asyncio.gather(*tasks)
+    return np.array(latencies) * 1000, ingested / elapsed
+
+
+async def _run(args) -> None:
+    seed = synthetic_turns(args.seed_turns, seed=1)
+    stream = synthetic_turns(100_000, seed=2)
+    queries = [text.split(".")[0] for _, text in synthetic_turns(200, (1, 1), seed=3)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        amc = AsyncMemoryCondenser(
+            data_dir=Path(tmp), search_workers=args.searchers, checkpoint_interval=None
+        )
+        if not args.real_model:
+            amc.condenser._embedder._model = StubEncoder()
+        async with amc:
+            await amc.ingest_many(seed)
+
+            print(f"{'phase':<16} {'searches':>9} {'p50 ms':>8} {'p99 ms':>8} {'ingest/s':>9}")
+            for label, turns in (("search only", None), ("search + ingest", stream)):
+                lat, rate = await _phase(
+                    amc, queries, args.searchers, args.seconds, turns
+                )
+                print(
+                    f"{label:<16} {len(lat):>9} {np.percentile(lat, 50):>8.2f} "
+                    f"{np.percentile(lat, 99):>8.2f} {rate:>9.1f}"
+                )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seed-turns", type=int, default=2000)
+    parser.add_argument("--searchers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--real-model", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
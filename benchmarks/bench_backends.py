@@ -0,0 +1,98 @@
+"""
+Vector backends by store size: exact brute force vs HNSW.
+
+For each store size, builds both backends over the same clustered
+vectors in a memory-mapped EmbeddingStore and reports build time,
+single-query latency and recall@k against exact search (which is 1 by
+construction for the exact backend). HNSW builds above ``--hnsw-max``
+chunks are skipped, as they take tens of minutes on one core; 1M
+float32 chunks at dim 1024 need 4 GB, so use a smaller ``--dim`` there.
+
+Usage:
+    pixi run python benchmarks/bench_backends.py [--sizes 1000 10000 100000] [--dim 1024]
+    pixi run python benchmarks/bench_backends.py --sizes 1000000 --dim 256
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from common import random_unit_vectors
+
+from memory_condense.embedding_store import EmbeddingStore
+from memory_condense.vector_backend import ExactBackend, HnswBackend
+
+_BLOCK = 50_000
+
+
+def _fill(store: EmbeddingStore, n: int, clusters: int = 64) -> np.ndarray:
+    """Append ``n`` clustered unit vectors in blocks; return the centroids."""
+    rng = np.random.default_rng(0)
+    centroids = random_unit_vectors(clusters, store.dim, seed=1)
+    for start in range(0, n, _BLOCK):
+        m = min(_BLOCK, n - start)
+        vecs = centroids[rng.integers(0, clusters, m)]
+        vecs = vecs + 0.05 * rng.standard_normal((m, store.dim)).astype(np.float32)
+        store.append(vecs / np.linalg.norm(vecs, axis=1, keepdims=True))
+    return centroids
+
+
+def _add_blocks(backend, store: EmbeddingStore) -> float:
+    start = time.perf_counter()
+    for first in range(0, len(store), _BLOCK):
+        labels = np.arange(first, min(first + _BLOCK, len(store)))
+        backend.add(store.vectors(labels), labels)
+    return time.perf_counter() - start
+
+
+def _search(backend, queries: np.ndarray, k: int) -> tuple[np.ndarray, float]:
+    start = time.perf_counter()
+    labels = np.vstack(
+        [backend.search(q.reshape(1, -1), k, num_threads=1)[0] for q in queries]
+    )
+    return labels, (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--hnsw-max", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(
+        f"{'chunks':>9} {'backend':<7} {'build s':>8} {'ms/query':>9} "
+        f"{f'recall@{args.k}':>10}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            store = EmbeddingStore(dim=args.dim, path=Path(tmp) / f"{n}.vec")
+            centroids = _fill(store, n)
+            rng = np.random.default_rng(2)
+            queries = centroids[rng.integers(0, len(centroids), args.queries)]
+            queries = queries + 0.05 * rng.standard_normal(queries.shape).astype(np.float32)
+
+            exact = ExactBackend(store)
+            build = _add_blocks(exact, store)
+            truth, ms = _search(exact, queries, args.k)
+            print(f"{n:>9} {'exact':<7} {build:>8.2f} {ms:>9.2f} {1.0:>10.3f}")
+
+            if n > args.hnsw_max:
+                print(f"{n:>9} {'hnsw':<7} {'skipped (--hnsw-max)':>29}")
+                continue
+            hnsw = HnswBackend(dim=args.dim, max_elements=n)
+            build = _add_blocks(hnsw, store)
+            found, ms = _search(hnsw, queries, args.k)
+            recall = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(found, truth)])
+            print(f"{n:>9} {'hnsw':<7} {build:>8.2f} {ms:>9.2f} {recall:>10.3f}")
+            del hnsw
+
+
+if __name__ == "__main__":
+    main()
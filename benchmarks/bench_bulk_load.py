@@ -0,0 +1,59 @@
+"""
+Archive import: batched ``ingest_many`` with and without ``bulk_load()``.
+
+Usage:
+    pixi run python benchmarks/bench_bulk_load.py [--turns 20000] [--batch 500] [--real-model]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from common import StubEncoder, synthetic_turns, timed
+
+from memory_condense import MemoryCondenser
+
+
+def _load(data_dir: Path, turns, batch: int, bulk: bool, real_model: bool):
+    with MemoryCondenser(data_dir=data_dir, checkpoint_interval=None) as mc:
+        if not real_model:
+            mc._embedder._model = StubEncoder()
+        if not bulk:
+            for i in range(0, len(turns), batch):
+                mc.ingest_many(turns[i : i + batch])
+            return None
+        with mc.bulk_load() as report:
+            for i in range(0, len(turns), batch):
+                mc.ingest_many(turns[i : i + batch])
+        return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=20_000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--real-model", action="store_true")
+    args = parser.parse_args()
+
+    turns = synthetic_turns(args.turns)
+    timings: dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        with timed("ingest_many", timings):
+            _load(Path(tmp) / "normal", turns, args.batch, False, args.real_model)
+        with timed("bulk_load", timings):
+            report = _load(Path(tmp) / "bulk", turns, args.batch, True, args.real_model)
+
+    print(f"{'path':<12} {'seconds':>9} {'turns/sec':>11}")
+    for label, seconds in timings.items():
+        print(f"{label:<12} {seconds:>9.2f} {len(turns) / seconds:>11.1f}")
+    print(f"speedup: {timings['ingest_many'] / timings['bulk_load']:.2f}x")
+    print(
+        f"bulk load: {report.chunks} chunks, one-pass HNSW build "
+        f"{report.index_build_seconds:.2f}s, quick_check={report.integrity_check}"
+    )
+
+
+if __name__ == "__main__":
+    main()
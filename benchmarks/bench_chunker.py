@@ -0,0 +1,108 @@
+"""
+Chunker token-counting cost on large turns.
+
+pySBD segmentation is cached so the timings isolate the chunker's own
+work. "per-call" counts every sentence twice and every word of an
+oversized sentence separately with ``count_tokens`` (one tiktoken encode
+each), as the chunker used to; "chunk_turn" is the current chunker,
+which encodes each turn once and derives counts from token offsets.
+
+A second table compares sentence span recovery: pySBD's ``char_span``
+pass (one regex search over the whole text per sentence) against the
+chunker's single forward cursor.
+
+Usage:
+    pixi run python benchmarks/bench_chunker.py [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import pysbd
+from common import synthetic_turns
+
+from memory_condense._tokenizer import count_tokens
+from memory_condense.chunker import Chunker
+
+
+def _cached(segment):
+    cache: dict[str, list[str]] = {}
+
+    def wrapper(text: str) -> list[str]:
+        if text not in cache:
+            cache[text] = segment(text)
+        return cache[text]
+
+    return wrapper
+
+
+def _workloads() -> dict[str, str]:
+    prose = " ".join(text for _, text in synthetic_turns(400, (4, 8)))
+    log = "\n".join(
+        f"2024-01-01 12:00:{i % 60:02d} INFO worker-{i % 8} request id={i} "
+        f"status=200 latency_ms={i % 977}"
+        for i in range(3000)
+    )
+    blob = " ".join(f"token{i} value{i * 7 % 1000}" for i in range(10_000))
+    return {"prose": prose, "pasted log": log, "no punctuation": blob}
+
+
+def _per_call_counts(chunker: Chunker, text: str) -> int:
+    total = 0
+    for seg in chunker._segment(text):
+        seg = seg.strip()
+        if not seg:
+            continue
+        tokens = count_tokens(seg)  # split pass
+        if tokens > chunker.max_tokens:
+            tokens = sum(count_tokens(word) for word in seg.split())
+        total += count_tokens(seg) if tokens <= chunker.max_tokens else tokens  # merge pass
+    return total
+
+
+def _best(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    chunker = Chunker()
+    chunker._segment = _cached(chunker._segment)
+    count_tokens("warm up the encoder")
+
+    print(f"{'workload':<16} {'chars':>8} {'per-call ms':>12} {'chunk_turn ms':>14} {'speedup':>8}")
+    for name, text in _workloads().items():
+        chunker.chunk_turn("t", text)  # populate the segmentation cache
+        baseline = _best(lambda: _per_call_counts(chunker, text), args.repeat)
+        current = _best(lambda: chunker.chunk_turn("t", text), args.repeat)
+        print(
+            f"{name:<16} {len(text):>8} {baseline * 1000:>12.1f} "
+            f"{current * 1000:>14.1f} {baseline / current:>7.1f}x"
+        )
+
+    print()
+    print(f"{'workload':<16} {'sentences':>9} {'pysbd spans ms':>15} {'cursor ms':>10} {'speedup':>8}")
+    segmenter = pysbd.Segmenter(language="en", clean=False)
+    for name, text in _workloads().items():
+        sentences = chunker._segment(text)
+        segmenter.original_text = text
+        baseline = _best(lambda: segmenter.sentences_with_char_spans(sentences), args.repeat)
+        current = _best(lambda: chunker._sentence_spans(text), args.repeat)
+        print(
+            f"{name:<16} {len(sentences):>9} {baseline * 1000:>15.1f} "
+            f"{current * 1000:>10.1f} {baseline / current:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Deletion and compaction: query latency with tombstones vs after compaction.
+
+Loads ``--chunks`` chunks into a retriever, measures query latency, then
+deletes ``--delete-fraction`` of them (tombstoned, still in the index)
+and measures again, then compacts (index rebuild plus SQLite VACUUM) and
+measures a third time. Also reports the database size at each step.
+
+Usage:
+    pixi run python benchmarks/bench_compaction.py [--chunks 50000] [--delete-fraction 0.5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from common import random_unit_vectors
+
+from memory_condense.db import Database
+from memory_condense.retrieval import SimilarityRetriever
+from memory_condense.schemas import Chunk
+
+
+def _latency_ms(retriever: SimilarityRetriever, queries: np.ndarray, k: int) -> float:
+    start = time.perf_counter()
+    for q in queries:
+        retriever.query(q, k=k)
+    return (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--delete-fraction", type=float, default=0.5)
+    parser.add_argument("--backend", default="hnsw")
+    args = parser.parse_args()
+
+    vectors = random_unit_vectors(args.chunks, args.dim, seed=0)
+    queries = random_unit_vectors(args.queries, args.dim, seed=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(Path(tmp) / "bench.db")
+        db.execute(
+            "INSERT INTO turns (turn_id, role, text, created_at) "
+            "VALUES ('t', 'user', '', '2024-01-01')"
+        )
+        retriever = SimilarityRetriever(
+            db=db,
+            dim=args.dim,
+            index_path=Path(tmp) / "index.bin",
+            max_elements=args.chunks,
+            backend=args.backend,
+            compact_threshold=None,
+        )
+        chunk_ids = []
+        for start in range(0, args.chunks, 5000):
+            batch = [
+                Chunk(
+                    turn_id="t",
+                    text=f"chunk {i} " + "filler words " * 40,
+                    start_char=0,
+                    end_char=1,
+                    token_count=1,
+                    embedding=vectors[i].tolist(),
+                )
+                for i in range(start, min(start + 5000, args.chunks))
+            ]
+            retriever.add_chunks(batch)
+            chunk_ids.extend(c.chunk_id for c in batch)
+
+        print(f"{args.chunks} chunks, dim {args.dim}, {args.backend} backend")
+        print(f"{'state':<22} {'ms/query':>9} {'db MB':>8}")
+
+        def row(label: str) -> None:
+            ms = _latency_ms(retriever, queries, args.k)
+            print(f"{label:<22} {ms:>9.3f} {db.size_bytes() / 1e6:>8.1f}")
+
+        row("before deletion")
+        rng = np.random.default_rng(2)
+        doomed = rng.choice(
+            args.chunks, int(args.chunks * args.delete_fraction), replace=False
+        )
+        start = time.perf_counter()
+        retriever.delete_chunks([chunk_ids[i] for i in doomed])
+        delete_s = time.perf_counter() - start
+        row(f"{args.delete_fraction:.0%} tombstoned")
+
+        report = retriever.compact()
+        row("after compaction")
+        print(
+            f"delete {delete_s:.2f}s, index rebuild {report.index_seconds:.2f}s, "
+            f"vacuum {report.vacuum_seconds:.2f}s; probe queries "
+            f"{report.query_ms_before:.3f} -> {report.query_ms_after:.3f} ms"
+        )
+        retriever.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+SQLite read throughput under concurrent writes: pooled WAL readers vs a
+single serialized connection.
+
+Reader threads run chunk-hydration style lookups (20 random chunk ids
+joined to their turns) back to back while writer threads run ingest-like
+transactions (insert a batch of turns and chunks, holding the transaction
+for ``--hold-ms`` to stand in for chunking and embedding). "serialized"
+routes every read through the writer connection and its lock, which is
+what sharing one connection safely amounts to; "pooled" is the default
+per-thread reader connections.
+
+Usage:
+    pixi run python benchmarks/bench_db_concurrency.py [--seconds 3] [--readers 1 2 4 8] [--writers 0 1 2]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+from memory_condense.db import Database
+
+_HYDRATE = (
+    "SELECT c.chunk_id, c.text, t.role, t.text FROM chunks c "
+    "LEFT JOIN turns t ON t.turn_id = c.turn_id WHERE c.chunk_id IN ({})"
+)
+
+
+def _insert(db: Database, n: int) -> list[str]:
+    turns, chunks = [], []
+    for _ in range(n):
+        turn_id, chunk_id = uuid.uuid4().hex, uuid.uuid4().hex
+        turns.append((turn_id, "user", "some turn text " * 20, "2024-01-01T00:00:00"))
+        chunks.append((chunk_id, turn_id, "some chunk text " * 10, 0, 10, 10))
+    db.executemany("INSERT INTO turns VALUES (?, ?, ?, ?)", turns)
+    db.executemany(
+        "INSERT INTO chunks (chunk_id, turn_id, text, start_char, end_char, "
+        "token_count) VALUES (?, ?, ?, ?, ?, ?)",
+        chunks,
+    )
+    return [c[0] for c in chunks]
+
+
+def _run(path: Path, serialized: bool, readers: int, writers: int, args):
+    db = Database(path)
+    db._shared_reads = serialized
+    with db.transaction():
+        ids = _insert(db, 20_000)
+
+    stop = threading.Event()
+    latencies: list[list[float]] = [[] for _ in range(readers)]
+    commits = [0] * writers
+
+    def reader(slot: int) -> None:
+        rng = random.Random(slot)
+        while not stop.is_set():
+            batch = rng.sample(ids, 20)
+            start = time.perf_counter()
+            db.read(_HYDRATE.format(",".join("?" * len(batch))), tuple(batch))
+            latencies[slot].append(time.perf_counter() - start)
+
+    def writer(slot: int) -> None:
+        while not stop.is_set():
+            with db.transaction():
+                _insert(db, 50)
+                time.sleep(args.hold_ms / 1000)
+            commits[slot] += 1
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for t in threads:
+        t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    db.close()
+
+    lat = np.concatenate([np.array(l) for l in latencies]) * 1000
+    return len(lat) / args.seconds, np.percentile(lat, 99), sum(commits) / args.seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--readers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--writers", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--hold-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    print(
+        f"{'readers':>7} {'writers':>7} {'mode':<11} {'reads/s':>9} "
+        f"{'p99 ms':>8} {'commits/s':>10}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        run = 0
+        for writers in args.writers:
+            for readers in args.readers:
+                for mode in ("serialized", "pooled"):
+                    run += 1
+                    path = Path(tmp) / f"{run}.db"
+                    serialized = mode == "serialized"
+                    rps, p99, cps = _run(path, serialized, readers, writers, args)
+                    print(
+                        f"{readers:>7} {writers:>7} {mode:<11} {rps:>9.0f} "
+                        f"{p99:>8.2f} {cps:>10.1f}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
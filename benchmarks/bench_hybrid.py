@@ -0,0 +1,138 @@
+"""
+Identifier lookups: dense-only vs hybrid (dense + lexical) retrieval.
+
+Each query targets one chunk holding a unique identifier token (a ticket
+number, error code, ...). Chunks are clustered by topic, and the query
+vector lands near the target's topic rather than the target itself, so
+dense search sees hundreds of equally good matches; the query's lexical
+weights put most of their mass on the identifier. Reports how often the target is
+returned and the mean latency for dense search at k, dense search with
+k raised to ``--candidates``, and hybrid fusion at k for each
+``--sparse-weights`` value.
+
+Usage:
+    pixi run python benchmarks/bench_hybrid.py [--chunks 50000] [--queries 500]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from common import random_unit_vectors
+
+from memory_condense.db import Database
+from memory_condense.retrieval import SimilarityRetriever
+from memory_condense.schemas import Chunk
+
+_VOCAB = 30_000  # ordinary tokens; identifiers get ids above this
+
+
+def _doc_weights(rng: np.random.Generator, n: int, terms: int = 40) -> list[dict]:
+    """Zipf-distributed ordinary tokens plus one identifier per chunk."""
+    docs = []
+    for i in range(n):
+        tokens = np.minimum(rng.zipf(1.3, terms), _VOCAB - 1)
+        values = rng.uniform(0.01, 0.15, terms)
+        weights = {str(t): float(w) for t, w in zip(tokens, values)}
+        weights[str(_VOCAB + i)] = float(rng.uniform(0.25, 0.35))
+        docs.append(weights)
+    return docs
+
+
+def _near(centroids: np.ndarray, spread: float, seed: int) -> np.ndarray:
+    """Unit vectors scattered around the given centroids."""
+    rng = np.random.default_rng(seed)
+    vecs = centroids + spread * rng.standard_normal(centroids.shape).astype(np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--candidates", type=int, default=40)
+    parser.add_argument("--topics", type=int, default=64)
+    parser.add_argument("--spread", type=float, default=0.02)
+    parser.add_argument(
+        "--sparse-weights", type=float, nargs="+", default=[0.3, 1.0]
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centroids = random_unit_vectors(args.topics, args.dim, seed=1)
+    topic = rng.integers(0, args.topics, args.chunks)
+    vectors = _near(centroids[topic], args.spread, seed=2)
+    weights = _doc_weights(rng, args.chunks)
+    targets = rng.choice(args.chunks, args.queries, replace=False)
+    query_vecs = _near(centroids[topic[targets]], args.spread, seed=3)
+    query_weights = []
+    for t in targets:
+        common = rng.choice(_VOCAB // 10, 3)
+        qw = {str(c): 0.05 for c in common}
+        qw[str(_VOCAB + t)] = 0.3
+        query_weights.append(qw)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(Path(tmp) / "bench.db")
+        db.execute(
+            "INSERT INTO turns (turn_id, role, text, created_at) "
+            "VALUES ('t', 'user', '', '2024-01-01')"
+        )
+        retriever = SimilarityRetriever(
+            db=db, dim=args.dim, max_elements=args.chunks, vectors_path=Path(tmp) / "v"
+        )
+        chunk_ids = []
+        for start in range(0, args.chunks, 5000):
+            batch = [
+                Chunk(
+                    turn_id="t",
+                    text=f"chunk {i}",
+                    start_char=0,
+                    end_char=1,
+                    token_count=1,
+                    embedding=vectors[i].tolist(),
+                    lexical_weights=weights[i],
+                )
+                for i in range(start, min(start + 5000, args.chunks))
+            ]
+            retriever.add_chunks(batch)
+            chunk_ids.extend(c.chunk_id for c in batch)
+
+        paths = {
+            f"dense k={args.k}": lambda q, w: retriever.query(q, k=args.k),
+            f"dense k={args.candidates}": lambda q, w: retriever.query(
+                q, k=args.candidates
+            ),
+        }
+        for sparse_weight in args.sparse_weights:
+            paths[f"hybrid w={sparse_weight:g}"] = (
+                lambda q, w, sw=sparse_weight: retriever.query_hybrid(
+                    q, w, k=args.k, candidates=args.candidates, sparse_weight=sw
+                )
+            )
+
+        print(
+            f"{args.chunks} chunks, {retriever.lexical_index.postings} postings, "
+            f"{args.queries} identifier queries"
+        )
+        print(f"{'path':<14} {'ms/query':>9} {'recall':>10}")
+        for label, search in paths.items():
+            found = 0
+            start = time.perf_counter()
+            for target, q, w in zip(targets, query_vecs, query_weights):
+                hits = search(q, w)
+                found += chunk_ids[target] in {r.chunk.chunk_id for r in hits}
+            ms = (time.perf_counter() - start) * 1000 / args.queries
+            print(f"{label:<14} {ms:>9.2f} {found / args.queries:>10.3f}")
+        retriever.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
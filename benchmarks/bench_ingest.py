@@ -0,0 +1,52 @@
+"""
+Ingest throughput: per-turn ``ingest()`` vs batched ``ingest_many()``.
+
+Usage:
+    pixi run python benchmarks/bench_ingest.py [--turns 2000] [--real-model]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from common import StubEncoder, synthetic_turns, timed
+
+from memory_condense import MemoryCondenser
+
+
+def _open(data_dir: Path, real_model: bool) -> MemoryCondenser:
+    mc = MemoryCondenser(data_dir=data_dir)
+    if not real_model:
+        mc._embedder._model = StubEncoder()
+    return mc
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=2000)
+    parser.add_argument("--real-model", action="store_true")
+    args = parser.parse_args()
+
+    turns = synthetic_turns(args.turns)
+    timings: dict[str, float] = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with _open(Path(tmp) / "per_turn", args.real_model) as mc:
+            with timed("ingest", timings):
+                for role, text in turns:
+                    mc.ingest(role, text)
+
+        with _open(Path(tmp) / "batched", args.real_model) as mc:
+            with timed("ingest_many", timings):
+                mc.ingest_many(turns)
+
+    print(f"{'path':<12} {'seconds':>9} {'turns/sec':>11}")
+    for label, seconds in timings.items():
+        print(f"{label:<12} {seconds:>9.2f} {len(turns) / seconds:>11.1f}")
+    print(f"speedup: {timings['ingest'] / timings['ingest_many']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+IVF-PQ vs HNSW: index RAM per chunk, build time, query latency and recall@10.
+
+Both backends index the same clustered vectors held in a memory-mapped
+EmbeddingStore. RAM per chunk is the saved index size divided by the
+chunk count: hnswlib's file is its in-memory graph plus full float32
+vectors, while IVF-PQ keeps only codes and labels (its exact re-rank
+reads candidate rows from the memory-mapped store). Recall@10 is
+measured against exact search; build time for IVF-PQ includes training
+on ``--train-size`` vectors.
+
+Usage:
+    pixi run python benchmarks/bench_ivfpq.py [--n 100000] [--dim 1024] [--nprobe 8 16 32]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from bench_backends import _add_blocks, _fill, _search
+
+from memory_condense.embedding_store import EmbeddingStore
+from memory_condense.vector_backend import ExactBackend, HnswBackend, IvfPqBackend
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--m", type=int, default=None)
+    parser.add_argument("--rerank", type=int, default=10)
+    parser.add_argument("--train-size", type=int, default=50_000)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--skip-hnsw", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = EmbeddingStore(dim=args.dim, path=Path(tmp) / "bench.vec")
+        centroids = _fill(store, args.n)
+        rng = np.random.default_rng(2)
+        queries = centroids[rng.integers(0, len(centroids), args.queries)]
+        queries = queries + 0.05 * rng.standard_normal(queries.shape).astype(np.float32)
+
+        exact = ExactBackend(store)
+        _add_blocks(exact, store)
+        truth, _ = _search(exact, queries, args.k)
+
+        print(f"{args.n} chunks, dim {args.dim}, float32 store")
+        print(
+            f"{'backend':<16} {'B/chunk':>8} {'build s':>8} {'ms/query':>9} "
+            f"{f'recall@{args.k}':>10}"
+        )
+
+        def report(label, backend, build, path):
+            backend.save(path)
+            per_chunk = path.stat().st_size / args.n
+            found, ms = _search(backend, queries, args.k)
+            recall = np.mean(
+                [len(set(a) & set(b)) / args.k for a, b in zip(found, truth)]
+            )
+            print(
+                f"{label:<16} {per_chunk:>8.0f} {build:>8.1f} {ms:>9.2f} "
+                f"{recall:>10.3f}"
+            )
+
+        if not args.skip_hnsw:
+            hnsw = HnswBackend(dim=args.dim, max_elements=args.n)
+            report("hnsw", hnsw, _add_blocks(hnsw, store), Path(tmp) / "index.bin")
+            del hnsw
+
+        ivf = IvfPqBackend(
+            store, m=args.m, rerank=args.rerank, train_size=args.train_size
+        )
+        build = _add_blocks(ivf, store)
+        for nprobe in args.nprobe:
+            ivf._nprobe = nprobe
+            report(f"ivfpq nprobe={nprobe}", ivf, build, Path(tmp) / "index.ivfpq")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Mixed query load: dense search vs keyword="auto" (BM25 for lookups).
+
+Half the queries are identifier lookups ("ERR-1234"), half are prose.
+With keyword="auto" the lookups are answered from the SQLite FTS5 index
+without running the encoder. The stub encoder's ``--encode-ms`` stands
+in for a transformer forward pass. The search cache is disabled.
+
+Usage:
+    pixi run python benchmarks/bench_keyword.py [--turns 5000] [--queries 1000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from common import StubEncoder, synthetic_turns
+
+from memory_condense import MemoryCondenser
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--encode-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    turns = synthetic_turns(args.turns)
+    codes = [f"ERR-{i:04d}" for i in range(0, args.turns, 10)]
+    for i, code in zip(range(0, args.turns, 10), codes):
+        role, text = turns[i]
+        turns[i] = (role, f"{text} The job failed with {code}.")
+    prose = [text for _, text in synthetic_turns(args.queries, (1, 1), seed=3)]
+    queries = [
+        rng.choice(codes) if i % 2 else prose[i] for i in range(args.queries)
+    ]
+
+    print(f"{'mode':<6} {'ms/query':>9} {'encoder calls':>14} {'lookup hit@k':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        with MemoryCondenser(data_dir=Path(tmp), search_cache_size=0) as mc:
+            stub = StubEncoder(call_overhead_ms=args.encode_ms)
+            mc._embedder._model = stub
+            mc.ingest_many(turns)
+
+            for mode in ("off", "auto"):
+                calls = 0
+                original = stub.encode
+
+                def counting(*a, **kw):
+                    nonlocal calls
+                    calls += 1
+                    return original(*a, **kw)
+
+                stub.encode = counting
+                found = lookups = 0
+                start = time.perf_counter()
+                for i, query in enumerate(queries):
+                    hits = mc.search(query, k=args.k, keyword=mode)
+                    if i % 2:
+                        lookups += 1
+                        found += any(query in r.chunk.text for r in hits)
+                ms = (time.perf_counter() - start) * 1000 / len(queries)
+                stub.encode = original
+                print(f"{mode:<6} {ms:>9.2f} {calls:>14} {found / lookups:>13.3f}")
+
+            stats = mc.keyword_stats()
+    print(
+        f"keyword='auto': {stats.bm25_only}/{stats.queries} queries skipped the "
+        f"embedder ({stats.embedder_skip_rate:.0%})"
+    )
+
+
+if __name__ == "__main__":
+    main()
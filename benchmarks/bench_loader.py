@@ -0,0 +1,102 @@
+"""
+Conversation parsing: the previous lookahead regex vs the line scanner.
+
+Usage:
+    pixi run python benchmarks/bench_loader.py [--sizes-mb 1 4 16] [--repeats 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from common import synthetic_turns
+
+from memory_condense.loader import iter_conversation, parse_txt
+
+# The parser this replaces: a lazy body with a MULTILINE lookahead that
+# is re-tested at every character.
+_TXT_TURN_RE = re.compile(
+    r"^(User|Claude):\s*\n(.*?)(?=^(?:User|Claude):\s*\n|\Z)",
+    re.MULTILINE | re.DOTALL,
+)
+_ROLE_MAP = {"User": "user", "Claude": "assistant"}
+
+
+def regex_parse_txt(text: str) -> list[tuple[str, str]]:
+    turns = []
+    for match in _TXT_TURN_RE.finditer(text):
+        body = match.group(2).strip()
+        if body:
+            turns.append((_ROLE_MAP[match.group(1)], body))
+    return turns
+
+
+def _export(size_mb: float) -> str:
+    parts: list[str] = []
+    total = 0
+    seed = 0
+    while total < size_mb * 1_000_000:
+        for role, text in synthetic_turns(500, sentences_per_turn=(1, 30), seed=seed):
+            part = f"{'User' if role == 'user' else 'Claude'}:\n{text}\n\n"
+            parts.append(part)
+            total += len(part)
+        seed += 1
+    return "".join(parts)
+
+
+def _best(fn, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def _peak_mb(fn) -> float:
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'size MB':>8} {'turns':>8} {'regex s':>9} {'scan s':>9} {'speedup':>8} "
+        f"{'lazy file s':>12} {'regex peak MB':>14} {'lazy peak MB':>13}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes_mb:
+            text = _export(size)
+            path = Path(tmp) / f"export_{size}.txt"
+            path.write_text(text, encoding="utf-8")
+
+            expected = regex_parse_txt(text)
+            assert parse_txt(text) == expected
+            regex_s = _best(lambda: regex_parse_txt(text), args.repeats)
+            scan_s = _best(lambda: parse_txt(text), args.repeats)
+            lazy_s = _best(lambda: sum(1 for _ in iter_conversation(path)), args.repeats)
+            regex_peak = _peak_mb(
+                lambda: regex_parse_txt(path.read_text(encoding="utf-8"))
+            )
+            lazy_peak = _peak_mb(lambda: sum(1 for _ in iter_conversation(path)))
+            print(
+                f"{len(text) / 1e6:>8.1f} {len(expected):>8} {regex_s:>9.3f} "
+                f"{scan_s:>9.3f} {regex_s / scan_s:>7.1f}x {lazy_s:>12.3f} "
+                f"{regex_peak:>14.1f} {lazy_peak:>13.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Chunking throughput with ParallelChunker at 1/2/4/8 worker processes.
+
+Pool start-up (spawning workers and loading pySBD/tiktoken in each) is
+done before timing, since a bulk import pays it once. Every run's output
+is checked against the serial chunker so the speedup is for identical,
+identically ordered chunks.
+
+Usage:
+    pixi run python benchmarks/bench_parallel_chunking.py [--turns 4000] [--workers 1 2 4 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+
+from common import synthetic_turns, timed
+
+from memory_condense.chunker import ParallelChunker
+
+
+def _spans(per_turn) -> list[list[tuple[int, int, int]]]:
+    return [
+        [(c.start_char, c.end_char, c.token_count) for c in chunks]
+        for chunks in per_turn
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=4000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    generated = synthetic_turns(args.turns, (2, 12))
+    turns = [(f"t{i}", text) for i, (_, text) in enumerate(generated)]
+    timings: dict[int, float] = {}
+    reference = None
+
+    for workers in args.workers:
+        with ParallelChunker(workers=workers, batch_size=args.batch_size) as pc:
+            pc.chunk_turns(turns[: args.batch_size * workers * 2])  # start the pool
+            with timed(workers, timings):
+                per_turn = pc.chunk_turns(turns)
+        spans = _spans(per_turn)
+        if reference is None:
+            reference = spans
+        assert spans == reference, f"output differs at workers={workers}"
+
+    print(f"cpus: {os.cpu_count()}  turns: {len(turns)}")
+    print(f"{'workers':>7} {'seconds':>9} {'turns/sec':>11} {'speedup':>8}")
+    for workers, seconds in timings.items():
+        print(
+            f"{workers:>7} {seconds:>9.2f} {len(turns) / seconds:>11.1f} "
+            f"{timings[args.workers[0]] / seconds:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
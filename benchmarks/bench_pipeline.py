@@ -0,0 +1,77 @@
+"""
+Directory import: sequential per-file ``ingest_many`` vs the staged pipeline.
+
+Usage:
+    pixi run python benchmarks/bench_pipeline.py [--files 40] [--turns-per-file 200] [--overhead-ms 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from common import StubEncoder, synthetic_turns, timed
+
+from memory_condense import MemoryCondenser
+from memory_condense.ingest import ingest_directory, print_report
+from memory_condense.loader import load_directory
+
+
+def _write_exports(directory: Path, files: int, turns_per_file: int) -> None:
+    directory.mkdir()
+    for i in range(files):
+        turns = synthetic_turns(turns_per_file, seed=i)
+        body = "".join(
+            f"{'User' if role == 'user' else 'Claude'}:\n{text}\n" for role, text in turns
+        )
+        (directory / f"conv_{i:04d}.txt").write_text(body)
+
+
+def _condenser(data_dir: Path, overhead_ms: float) -> MemoryCondenser:
+    mc = MemoryCondenser(data_dir=data_dir, checkpoint_interval=None)
+    mc._embedder._model = StubEncoder(call_overhead_ms=overhead_ms)
+    return mc
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--turns-per-file", type=int, default=200)
+    parser.add_argument(
+        "--overhead-ms", type=float, default=20.0, help="Simulated per-batch encoder latency"
+    )
+    parser.add_argument("--chunk-workers", type=int, default=1)
+    parser.add_argument("--batch-turns", type=int, default=64)
+    args = parser.parse_args()
+
+    timings: dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        exports = Path(tmp) / "exports"
+        _write_exports(exports, args.files, args.turns_per_file)
+
+        with _condenser(Path(tmp) / "seq", args.overhead_ms) as mc:
+            with timed("sequential", timings):
+                for turns in load_directory(exports).values():
+                    for i in range(0, len(turns), args.batch_turns):
+                        mc.ingest_many(turns[i : i + args.batch_turns])
+
+        with _condenser(Path(tmp) / "pipe", args.overhead_ms) as mc:
+            with timed("pipeline", timings):
+                report = ingest_directory(
+                    mc,
+                    exports,
+                    chunk_workers=args.chunk_workers,
+                    batch_turns=args.batch_turns,
+                )
+
+    n_turns = report.turns
+    print(f"{'path':<12} {'seconds':>9} {'turns/sec':>11}")
+    for label, seconds in timings.items():
+        print(f"{label:<12} {seconds:>9.2f} {n_turns / seconds:>11.1f}")
+    print(f"speedup: {timings['sequential'] / timings['pipeline']:.2f}x\n")
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Embedding storage precision: bytes/chunk, exact-scoring latency and recall@k.
+
+Compares float32, float16 and int8 EmbeddingStore encodings on clustered
+synthetic vectors. Recall@k is measured against float32 exact top-k.
+
+Usage:
+    pixi run python benchmarks/bench_quantization.py [--n 50000] [--dim 1024]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from common import random_unit_vectors
+
+from memory_condense.embedding_store import PRECISIONS, EmbeddingStore
+
+
+def _clustered(n: int, dim: int, clusters: int = 64, seed: int = 0) -> np.ndarray:
+    """Unit vectors scattered around random centroids, like real embeddings."""
+    rng = np.random.default_rng(seed)
+    centroids = random_unit_vectors(clusters, dim, seed=seed + 1)
+    vecs = centroids[rng.integers(0, clusters, n)]
+    vecs = vecs + 0.05 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    data = _clustered(args.n, args.dim)
+    queries = _clustered(args.queries, args.dim, seed=99)
+    rows = np.arange(args.n)
+
+    truth = None
+    print(
+        f"{'precision':<10} {'bytes/chunk':>12} {'file MB':>9} "
+        f"{'ms/query':>9} {f'recall@{args.k}':>10}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for precision in PRECISIONS:
+            path = Path(tmp) / f"{precision}.vec"
+            store = EmbeddingStore(dim=args.dim, path=path, precision=precision)
+            for i in range(0, args.n, 10_000):
+                store.append(data[i : i + 10_000])
+
+            top: list[np.ndarray] = []
+            start = time.perf_counter()
+            for q in queries:
+                scores = store.score(q, rows)
+                top.append(np.argpartition(-scores, args.k)[: args.k])
+            ms = (time.perf_counter() - start) * 1000 / args.queries
+
+            if truth is None:
+                truth = top
+            recall = np.mean(
+                [len(set(a) & set(b)) / args.k for a, b in zip(top, truth)]
+            )
+            print(
+                f"{precision:<10} {store.bytes_per_vector:>12} "
+                f"{path.stat().st_size / 1e6:>9.1f} {ms:>9.2f} {recall:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
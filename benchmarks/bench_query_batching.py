@@ -0,0 +1,85 @@
+"""
+Query embedding throughput vs added latency with micro-batching.
+
+Client threads call ``embed_query`` back to back. The baseline encodes
+each query on its own; the batched runs coalesce concurrent queries
+through ``QueryBatcher`` at several ``max_wait_ms`` settings. The stub
+encoder charges a fixed cost per ``encode`` call (``--call-overhead-ms``)
+to stand in for a transformer forward pass; use ``--real-model`` for
+bge-m3.
+
+Usage:
+    pixi run python benchmarks/bench_query_batching.py [--clients 16] [--real-model]
+"""
+
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+
+import numpy as np
+from common import StubEncoder, synthetic_turns
+
+from memory_condense.embedding import EmbeddingService
+
+
+def _run(svc: EmbeddingService, queries: list[str], clients: int, per_client: int):
+    latencies: list[float] = []
+    lock = threading.Lock()
+
+    def client(offset: int) -> None:
+        mine = []
+        for i in range(per_client):
+            start = time.perf_counter()
+            svc.embed_query(queries[(offset + i) % len(queries)])
+            mine.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=client, args=(c,)) for c in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, np.array(latencies) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--per-client", type=int, default=50)
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--waits", type=float, nargs="+", default=[0.5, 2.0, 5.0])
+    parser.add_argument("--call-overhead-ms", type=float, default=10.0)
+    parser.add_argument("--real-model", action="store_true")
+    args = parser.parse_args()
+
+    queries = [text for _, text in synthetic_turns(500, (1, 1))]
+    stub = StubEncoder(call_overhead_ms=args.call_overhead_ms)
+    configs = [("unbatched", 1, 0.0)] + [
+        (f"wait {w:g} ms", args.max_batch, w) for w in args.waits
+    ]
+
+    print(
+        f"{'config':<14} {'queries/s':>10} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'mean batch':>11}"
+    )
+    for label, batch_size, wait in configs:
+        svc = EmbeddingService(query_batch_size=batch_size, query_max_wait_ms=wait)
+        if not args.real_model:
+            svc._model = stub
+        svc.embed_queries(["warm up"])
+        qps, lat = _run(svc, queries, args.clients, args.per_client)
+        mean_batch = svc.query_batcher.mean_batch_size if svc.query_batcher else 1.0
+        svc.close()
+        print(
+            f"{label:<14} {qps:>10.1f} {np.percentile(lat, 50):>8.2f} "
+            f"{np.percentile(lat, 99):>8.2f} {mean_batch:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Index recovery: targeted ``verify_index()`` repair vs full ``rebuild_index()``.
+
+Builds a store of --n chunks, checkpoints it, then simulates a crash that
+loses the last --missing additions from the index file and leaves
+--orphans labels with no chunk row.
+
+Usage:
+    pixi run python benchmarks/bench_repair.py [--n 200000] [--dim 128]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from common import random_unit_vectors
+
+from memory_condense.db import Database
+from memory_condense.retrieval import SimilarityRetriever
+from memory_condense.schemas import Chunk
+from memory_condense.transcript_store import TranscriptStore
+
+
+def _chunks(turn_id: str, vectors, offset: int) -> list[Chunk]:
+    return [
+        Chunk(
+            turn_id=turn_id,
+            text=f"chunk {offset + i}",
+            start_char=0,
+            end_char=1,
+            token_count=1,
+            embedding=vec.tolist(),
+        )
+        for i, vec in enumerate(vectors)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--missing", type=int, default=1_000)
+    parser.add_argument("--orphans", type=int, default=100)
+    args = parser.parse_args()
+
+    vectors = random_unit_vectors(args.n, args.dim)
+    base = args.n - args.missing
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index_path = Path(tmp) / "hnsw_index.bin"
+        with Database(Path(tmp) / "memory.db") as db:
+            turn = TranscriptStore(db).append("user", "bench")
+            retriever = SimilarityRetriever(
+                db=db, dim=args.dim, index_path=index_path, max_elements=args.n
+            )
+            print(f"Building index over {base} chunks...")
+            for i in range(0, base, 10_000):
+                retriever.add_chunks(_chunks(turn.turn_id, vectors[i : min(i + 10_000, base)], i))
+            retriever.save()
+            # Committed to SQLite but never checkpointed
+            retriever.add_chunks(_chunks(turn.turn_id, vectors[base:], base))
+            db.execute(
+                "DELETE FROM chunks WHERE hnsw_label < ?", (args.orphans,)
+            )
+            db.commit()
+
+            start = time.perf_counter()
+            repaired = SimilarityRetriever(
+                db=db, dim=args.dim, index_path=index_path, max_elements=args.n
+            )
+            open_seconds = time.perf_counter() - start
+            report = repaired.repair_report
+            print(
+                f"verify_index: replayed={report.replayed} "
+                f"orphans_deleted={report.orphans_deleted} "
+                f"repair={report.seconds:.2f}s (open incl. load={open_seconds:.2f}s)"
+            )
+
+            start = time.perf_counter()
+            repaired.rebuild_index()
+            print(f"rebuild_index: {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
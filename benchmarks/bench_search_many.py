@@ -0,0 +1,55 @@
+"""
+Query throughput: a loop of ``search()`` vs one ``search_many()`` call.
+
+The search cache is disabled so every loop iteration does real work.
+
+Usage:
+    pixi run python benchmarks/bench_search_many.py [--turns 5000] [--queries 2000] [--real-model]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from common import StubEncoder, synthetic_turns, timed
+
+from memory_condense import MemoryCondenser
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--real-model", action="store_true")
+    args = parser.parse_args()
+
+    queries = [text for _, text in synthetic_turns(args.queries, (1, 1), seed=7)]
+    timings: dict[str, float] = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with MemoryCondenser(data_dir=Path(tmp), search_cache_size=0) as mc:
+            if not args.real_model:
+                mc._embedder._model = StubEncoder()
+            mc.ingest_many(synthetic_turns(args.turns))
+
+            with timed("search loop", timings):
+                looped = [mc.search(q, k=args.k) for q in queries]
+            with timed("search_many", timings):
+                batched = mc.search_many(queries, k=args.k)
+
+    agree = sum(
+        [r.chunk.chunk_id for r in a] == [r.chunk.chunk_id for r in b]
+        for a, b in zip(looped, batched)
+    )
+    print(f"{'path':<12} {'seconds':>9} {'queries/sec':>12}")
+    for label, seconds in timings.items():
+        print(f"{label:<12} {seconds:>9.2f} {len(queries) / seconds:>12.1f}")
+    print(f"speedup: {timings['search loop'] / timings['search_many']:.1f}x")
+    print(f"identical result lists: {agree}/{len(queries)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks default to a deterministic stub encoder so that they measure
+storage, indexing and pipeline overhead rather than transformer time.
+Pass ``--real-model`` to a script to run against bge-m3 instead.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import numpy as np
+
+_WORDS = (
+    "memory index vector query chunk turn embed store retrieval cosine sqlite "
+    "python latency budget token context window model batch recall score "
+    "deploy error config cache thread queue disk graph label schema user "
+    "assistant decision preference constraint correction entity summary"
+).split()
+
+
+class StubEncoder:
+    """Stand-in for SentenceTransformer with hash-seeded unit vectors.
+
+    ``call_overhead_ms`` adds a fixed sleep per ``encode`` call, standing in
+    for the per-call cost of a real transformer forward pass. Calls take
+    a lock for that sleep, so like one model on one device they do not
+    overlap.
+    """
+
+    def __init__(self, dim: int = 1024, call_overhead_ms: float = 0.0) -> None:
+        self.dim = dim
+        self.call_overhead_ms = call_overhead_ms
+        self._device = threading.Lock()
+
+    def encode(self, texts, batch_size=32, normalize_embeddings=False, **kwargs):
+        if self.call_overhead_ms:
+            with self._device:
+                time.sleep(self.call_overhead_ms / 1000)
+        vecs = np.empty((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            seed = int.from_bytes(hashlib.sha1(text.encode()).digest()[:4], "little")
+            vec = np.random.default_rng(seed).standard_normal(self.dim)
+            vecs[i] = vec / np.linalg.norm(vec)
+        return vecs
+
+
+def synthetic_turns(
+    n: int, sentences_per_turn: tuple[int, int] = (1, 6), seed: int = 0
+) -> list[tuple[str, str]]:
+    """Generate ``n`` alternating user/assistant turns of random sentences."""
+    rng = random.Random(seed)
+    turns: list[tuple[str, str]] = []
+    for i in range(n):
+        sentences = []
+        for _ in range(rng.randint(*sentences_per_turn)):
+            words = rng.choices(_WORDS, k=rng.randint(6, 20))
+            sentences.append(" ".join(words).capitalize() + ".")
+        turns.append(("user" if i % 2 == 0 else "assistant", " ".join(sentences)))
+    return turns
+
+
+def random_unit_vectors(n: int, dim: int, seed: int = 0) -> np.ndarray:
+    """Return an (n, dim) float32 matrix of L2-normalized random vectors."""
+    rng = np.random.default_rng(seed)
+    vecs = rng.standard_normal((n, dim)).astype(np.float32)
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+    return vecs
+
+
+@contextmanager
+def timed(label: str, results: dict[str, float]) -> Iterator[None]:
+    """Record wall-clock seconds for the block under ``results[label]``."""
+    start = time.perf_counter()
+    yield
+    results[label] = time.perf_counter() - start
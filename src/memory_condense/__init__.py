@@ -1,11 +1,13 @@
 """memory_condense — Long-term memory condensation for LLM conversations."""
 
+from memory_condense.async_condenser import AsyncMemoryCondenser
 from memory_condense.condenser import MemoryCondenser
 from memory_condense.loader import load_conversation, load_directory
 from memory_condense.schemas import Chunk, RetrievalResult, Turn
 
 __all__ = [
     "MemoryCondenser",
+    "AsyncMemoryCondenser",
     "Turn",
     "Chunk",
     "RetrievalResult",
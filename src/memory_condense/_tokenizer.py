@@ -1,8 +1,17 @@
 from __future__ import annotations
 
+import numpy as np
 import tiktoken
 
 _encoder: tiktoken.Encoding | None = None
+_token_bytes: np.ndarray | None = None
+
+
+def _get_encoder(encoding: str = "cl100k_base") -> tiktoken.Encoding:
+    global _encoder
+    if _encoder is None:
+        _encoder = tiktoken.get_encoding(encoding)
+    return _encoder
 
 
 def count_tokens(text: str, encoding: str = "cl100k_base") -> int:
@@ -11,7 +20,39 @@ def count_tokens(text: str, encoding: str = "cl100k_base") -> int:
     Uses cl100k_base (GPT-4 family) as a reasonable proxy
     for token budgets across modern LLMs.
     """
-    global _encoder
-    if _encoder is None:
-        _encoder = tiktoken.get_encoding(encoding)
-    return len(_encoder.encode(text))
+    return len(_get_encoder(encoding).encode(text))
+
+
+def _token_byte_lengths(enc: tiktoken.Encoding) -> np.ndarray:
+    """Byte length of every token id, built once per process."""
+    global _token_bytes
+    if _token_bytes is None:
+        lengths = np.zeros(enc.n_vocab, dtype=np.int64)
+        for token in range(enc.n_vocab):
+            try:
+                lengths[token] = len(enc.decode_single_token_bytes(token))
+            except KeyError:
+                pass  # unused id between regular and special tokens
+        _token_bytes = lengths
+    return _token_bytes
+
+
+def token_end_offsets(text: str, encoding: str = "cl100k_base") -> np.ndarray:
+    """Return the end character offset of every token in ``text``.
+
+    The text is encoded once; the token count of any span ``[start, end)``
+    can then be derived by bisecting these offsets (a token belongs to
+    the span its last character falls in). Special-token strings are
+    treated as ordinary text.
+    """
+    enc = _get_encoder(encoding)
+    tokens = np.array(enc.encode_ordinary(text), dtype=np.int64)
+    byte_ends = np.cumsum(_token_byte_lengths(enc)[tokens])
+    if text.isascii():
+        return byte_ends
+
+    # Map UTF-8 byte offsets to character offsets: count the bytes that
+    # start a character up to and including each token's last byte.
+    data = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+    chars_through = np.cumsum((data & 0xC0) != 0x80)
+    return chars_through[byte_ends - 1]
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+
+from memory_condense.condenser import MemoryCondenser
+from memory_condense.schemas import Chunk, RetrievalResult, Turn
+
+
+class _PendingIngest(NamedTuple):
+    turns: list[tuple[str, str]]
+    future: asyncio.Future
+
+
+class AsyncMemoryCondenser:
+    """asyncio facade over MemoryCondenser that never blocks the event loop.
+
+    Usage::
+
+        async with AsyncMemoryCondenser(data_dir="./data") as mc:
+            await mc.ingest("user", "I prefer dark mode in all my apps.")
+            results = await mc.search("What are the user's UI preferences?")
+
+    Work is split across three executors:
+
+    * writes — a single thread. Ingest requests wait in a bounded queue
+      and a writer task drains it, coalescing whatever is pending (up to
+      ``max_write_batch`` requests) into one ``ingest_many`` call, so
+      writes are serialized and share a transaction.
+    * encoding — ``encode_workers`` threads that embed search queries.
+      If the condenser was built with ``query_batch_size > 1``, queries
+      go to its micro-batcher instead and are awaited without holding a
+      thread.
+    * search — ``search_workers`` threads running ANN lookup and
+      hydration, so searches proceed concurrently with each other and
+      with ingest.
+
+    ``ingest`` waits for queue space when ``max_pending_ingests`` requests
+    are already queued; ``ingest_nowait`` raises ``asyncio.QueueFull``
+    instead, for callers that prefer to shed load.
+    """
+
+    def __init__(
+        self,
+        condenser: MemoryCondenser | None = None,
+        *,
+        max_pending_ingests: int = 256,
+        max_write_batch: int = 64,
+        encode_workers: int = 1,
+        search_workers: int = 4,
+        **condenser_kwargs,
+    ) -> None:
+        self._mc = condenser or MemoryCondenser(**condenser_kwargs)
+        self._max_write_batch = max_write_batch
+        self._queue: asyncio.Queue[_PendingIngest | None] = asyncio.Queue(
+            maxsize=max_pending_ingests
+        )
+        self._write_executor = ThreadPoolExecutor(1, thread_name_prefix="mc-write")
+        self._encode_executor = ThreadPoolExecutor(
+            encode_workers, thread_name_prefix="mc-encode"
+        )
+        self._search_executor = ThreadPoolExecutor(
+            search_workers, thread_name_prefix="mc-search"
+        )
+        self._writer: asyncio.Task | None = None
+        self._closed = False
+
+    @property
+    def condenser(self) -> MemoryCondenser:
+        """The wrapped synchronous condenser."""
+        return self._mc
+
+    @property
+    def pending_ingests(self) -> int:
+        """Ingest requests queued but not yet picked up by the writer."""
+        return self._queue.qsize()
+
+    async def ingest(self, role: str, text: str) -> tuple[Turn, list[Chunk]]:
+        """Ingest a single turn; see ``MemoryCondenser.ingest``."""
+        return (await self.ingest_many([(role, text)]))[0]
+
+    async def ingest_many(
+        self, turns: Iterable[tuple[str, str]]
+    ) -> list[tuple[Turn, list[Chunk]]]:
+        """Ingest many turns; see ``MemoryCondenser.ingest_many``.
+
+        Waits for space in the ingest queue, then for the write to land.
+        """
+        pending = self._pending(turns)
+        await self._queue.put(pending)
+        return await pending.future
+
+    def ingest_nowait(self, role: str, text: str) -> asyncio.Future:
+        """Queue a turn without waiting; raises ``asyncio.QueueFull`` if full.
+
+        Returns a future resolving to the (turn, chunks) pair.
+        """
+        pending = self._pending([(role, text)])
+        self._queue.put_nowait(pending)
+        return asyncio.ensure_future(self._first(pending.future))
+
+    async def search(
+        self,
+        query: str,
+        k: int = 10,
+        ef_search: int = 50,
+        include_vectors: bool = False,
+        rescore: bool = False,
+        hybrid: bool = False,
+        sparse_weight: float = 0.3,
+        keyword: str = "off",
+    ) -> list[RetrievalResult]:
+        """Search for chunks similar to the query; see ``MemoryCondenser.search``."""
+        if keyword != "off" and not hybrid:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._search_executor,
+                lambda: self._mc.search(
+                    query,
+                    k=k,
+                    ef_search=ef_search,
+                    include_vectors=include_vectors,
+                    rescore=rescore,
+                    keyword=keyword,
+                ),
+            )
+        if hybrid:
+            # Dense and lexical query encodings come from one forward pass
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._encode_executor,
+                lambda: self._mc.search(
+                    query,
+                    k=k,
+                    ef_search=ef_search,
+                    include_vectors=include_vectors,
+                    hybrid=True,
+                    sparse_weight=sparse_weight,
+                ),
+            )
+
+        params = dict(
+            k=k, ef_search=ef_search, include_vectors=include_vectors, rescore=rescore
+        )
+        results = self._mc.cached_search(query, **params)
+        if results is not None:
+            return results
+
+        query_embedding = self._mc.cached_query_embedding(query)
+        if query_embedding is None:
+            query_embedding = await self._embed_query(query)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._search_executor,
+            lambda: self._mc.search_by_embedding(query_embedding, query=query, **params),
+        )
+
+    async def _embed_query(self, query: str) -> np.ndarray:
+        embedder = self._mc.embedder
+        if embedder.batches_queries:
+            return await asyncio.wrap_future(embedder.submit_query(query))
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._encode_executor, embedder.embed_query, query
+        )
+
+    async def aclose(self) -> None:
+        """Finish queued ingests, then close the condenser and executors."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is not None:
+            await self._queue.put(None)
+            await self._writer
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._write_executor, self._mc.close)
+        for executor in (
+            self._write_executor,
+            self._encode_executor,
+            self._search_executor,
+        ):
+            executor.shutdown()
+
+    async def __aenter__(self) -> AsyncMemoryCondenser:
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+    def _pending(self, turns: Iterable[tuple[str, str]]) -> _PendingIngest:
+        if self._closed:
+            raise RuntimeError("AsyncMemoryCondenser is closed")
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write_loop())
+        loop = asyncio.get_running_loop()
+        return _PendingIngest(list(turns), loop.create_future())
+
+    @staticmethod
+    async def _first(future: asyncio.Future) -> tuple[Turn, list[Chunk]]:
+        return (await future)[0]
+
+    async def _write_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < self._max_write_batch and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            turns = [turn for pending in batch for turn in pending.turns]
+            try:
+                results = await loop.run_in_executor(
+                    self._write_executor, self._mc.ingest_many, turns
+                )
+            except Exception as exc:
+                if len(batch) == 1:
+                    if not batch[0].future.done():
+                        batch[0].future.set_exception(exc)
+                    continue
+                # The combined transaction rolled back; retry each caller on
+                # its own so one bad request only fails its own future.
+                for pending in batch:
+                    try:
+                        result = await loop.run_in_executor(
+                            self._write_executor, self._mc.ingest_many, pending.turns
+                        )
+                    except Exception as exc:
+                        if not pending.future.done():
+                            pending.future.set_exception(exc)
+                    else:
+                        if not pending.future.done():
+                            pending.future.set_result(result)
+                continue
+
+            pos = 0
+            for pending in batch:
+                n = len(pending.turns)
+                if not pending.future.done():
+                    pending.future.set_result(results[pos : pos + n])
+                pos += n
@@ -1,18 +1,58 @@
 from __future__ import annotations
 
+import multiprocessing
 import re
+from bisect import bisect_right
+from collections.abc import Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import NamedTuple
 
+import numpy as np
 import pysbd
 
-from memory_condense._tokenizer import count_tokens
+from memory_condense._tokenizer import token_end_offsets
 from memory_condense.schemas import Chunk
 
+_WORD_RE = re.compile(r"\S+")
+
+
+class _Piece(NamedTuple):
+    """A sentence (or sentence fragment) span and its token count."""
+
+    start: int
+    end: int
+    tokens: int
+
+
+class _SpanCounter:
+    """Token counts for arbitrary spans of one text, from a single encode."""
+
+    def __init__(self, text: str) -> None:
+        self._ends_arr = token_end_offsets(text)
+        self._ends = self._ends_arr.tolist()
+
+    def count(self, start: int, end: int) -> int:
+        return bisect_right(self._ends, end) - bisect_right(self._ends, start)
+
+    def count_many(self, starts: list[int], ends: list[int]) -> list[int]:
+        """Vectorized ``count`` over many spans."""
+        return (
+            np.searchsorted(self._ends_arr, ends, side="right")
+            - np.searchsorted(self._ends_arr, starts, side="right")
+        ).tolist()
+
 
 class Chunker:
     """Splits turn text into chunks using sentence boundary detection + merge.
 
     Sentences are detected with pySBD, then greedily merged into chunks
-    targeting the [min_tokens, max_tokens] range.
+    targeting the [min_tokens, max_tokens] range. Each turn is tokenized
+    once; sentence, clause and word token counts are derived from the
+    token offsets and reused through splitting and merging.
+
+    Sentence character spans are recovered once, in a single forward pass
+    over the text, and carried through every split and merge, so
+    ``chunk.text`` is always exactly ``text[chunk.start_char:chunk.end_char]``.
     """
 
     def __init__(
@@ -29,135 +69,140 @@ class Chunker:
         if not text or not text.strip():
             return []
 
-        sentences = self._split_sentences(text)
+        sentences = self._split_sentences(text, _SpanCounter(text))
         if not sentences:
             return []
 
-        offsets = self._compute_offsets(text, sentences)
-        return self._merge_sentences(sentences, offsets, turn_id)
-
-    def _split_sentences(self, text: str) -> list[str]:
-        """Split text into sentences using pySBD."""
-        segments = self._segmenter.segment(text)
-        result = []
-        for seg in segments:
-            seg = seg.strip()
-            if seg:
-                # Sub-split oversized sentences at clause boundaries
-                if count_tokens(seg) > self.max_tokens:
-                    result.extend(self._subsplit(seg))
-                else:
-                    result.append(seg)
+        return self._merge_sentences(text, sentences, turn_id)
+
+    def _segment(self, text: str) -> list[str]:
+        """Run pySBD's sentence processor, skipping its span-recovery pass."""
+        return self._segmenter.processor(text).process()
+
+    def _sentence_spans(self, text: str) -> list[tuple[int, int]]:
+        """Return whitespace-trimmed (start, end) spans of each sentence.
+
+        pySBD's own ``char_span`` mode re-searches the whole text with a
+        regex for every sentence, which is quadratic in turn length. With
+        ``clean=False`` the processed sentences are verbatim, in-order
+        substrings of the text, so one forward cursor recovers the same
+        spans in linear time.
+        """
+        spans: list[tuple[int, int]] = []
+        pos = 0
+        for sent in self._segment(text):
+            found = text.find(sent, pos)
+            if found < 0:
+                # pySBD drops sentences it cannot locate from its spans too
+                continue
+            pos = found + len(sent)
+            stripped = sent.strip()
+            if stripped:
+                start = found + len(sent) - len(sent.lstrip())
+                spans.append((start, start + len(stripped)))
+        return spans
+
+    def _split_sentences(self, text: str, counter: _SpanCounter) -> list[_Piece]:
+        """Split text into sentence spans using pySBD."""
+        result: list[_Piece] = []
+        for start, end in self._sentence_spans(text):
+            tokens = counter.count(start, end)
+            # Sub-split oversized sentences at clause boundaries
+            if tokens > self.max_tokens:
+                result.extend(self._subsplit(text, start, end, counter))
+            else:
+                result.append(_Piece(start, end, tokens))
         return result
 
-    def _subsplit(self, text: str) -> list[str]:
+    def _subsplit(
+        self, text: str, start: int, end: int, counter: _SpanCounter
+    ) -> list[_Piece]:
         """Split an oversized sentence at clause boundaries."""
+        sentence = text[start:end]
         # Try splitting at semicolons, then commas
         for delimiter in ["; ", ", "]:
-            parts = text.split(delimiter)
+            parts = sentence.split(delimiter)
             if len(parts) > 1:
-                # Re-attach delimiters to each part (except last)
-                restored = []
+                # Keep each delimiter with the part before it (except last)
+                restored: list[_Piece] = []
+                pos = start
                 for i, part in enumerate(parts):
-                    part = part.strip()
-                    if not part:
+                    part_start = pos
+                    pos += len(part) + len(delimiter)
+                    if not part.strip():
                         continue
+                    s = part_start + len(part) - len(part.lstrip())
                     if i < len(parts) - 1:
-                        restored.append(part + delimiter.rstrip())
+                        e = part_start + len(part) + len(delimiter.rstrip())
                     else:
-                        restored.append(part)
+                        e = part_start + len(part.rstrip())
+                    restored.append(_Piece(s, e, counter.count(s, e)))
                 # Check if all parts are within budget
-                if all(count_tokens(p) <= self.max_tokens for p in restored):
+                if all(p.tokens <= self.max_tokens for p in restored):
                     return restored
 
         # Last resort: hard split by token count
-        return self._hard_split(text)
+        return self._hard_split(text, start, end, counter)
 
-    def _hard_split(self, text: str) -> list[str]:
-        """Split text into roughly max_tokens-sized pieces by words."""
-        words = text.split()
-        parts: list[str] = []
-        current: list[str] = []
+    def _hard_split(
+        self, text: str, start: int, end: int, counter: _SpanCounter
+    ) -> list[_Piece]:
+        """Split a span into roughly max_tokens-sized pieces at word boundaries."""
+        parts: list[_Piece] = []
+        current_start = current_end = start
         current_tokens = 0
 
-        for word in words:
-            word_tokens = count_tokens(word)
-            if current_tokens + word_tokens > self.max_tokens and current:
-                parts.append(" ".join(current))
-                current = []
+        words = [(m.start(), m.end()) for m in _WORD_RE.finditer(text, start, end)]
+        counts = counter.count_many([w[0] for w in words], [w[1] for w in words])
+
+        for (word_start, word_end), word_tokens in zip(words, counts):
+            if current_tokens + word_tokens > self.max_tokens and current_tokens:
+                parts.append(_Piece(current_start, current_end, current_tokens))
                 current_tokens = 0
-            current.append(word)
+            if not current_tokens:
+                current_start = word_start
+            current_end = word_end
             current_tokens += word_tokens
 
-        if current:
-            parts.append(" ".join(current))
+        if current_tokens:
+            parts.append(_Piece(current_start, current_end, current_tokens))
         return parts
 
-    def _compute_offsets(
-        self, text: str, sentences: list[str]
-    ) -> list[tuple[int, int]]:
-        """Find (start_char, end_char) for each sentence in the original text."""
-        offsets: list[tuple[int, int]] = []
-        search_start = 0
-        for sent in sentences:
-            # Find the sentence in the original text, accounting for
-            # whitespace differences from pySBD stripping
-            # Use a simple word-based search to locate the span
-            idx = text.find(sent, search_start)
-            if idx == -1:
-                # Fallback: find first word match
-                first_word = sent.split()[0] if sent.split() else ""
-                idx = text.find(first_word, search_start)
-                if idx == -1:
-                    idx = search_start
-                end_idx = idx + len(sent)
-            else:
-                end_idx = idx + len(sent)
-            offsets.append((idx, end_idx))
-            search_start = end_idx
-        return offsets
-
     def _merge_sentences(
         self,
-        sentences: list[str],
-        offsets: list[tuple[int, int]],
+        text: str,
+        sentences: list[_Piece],
         turn_id: str,
     ) -> list[Chunk]:
-        """Greedily merge consecutive sentences into chunks."""
+        """Greedily merge consecutive sentence spans into chunks."""
         chunks: list[Chunk] = []
-        current_sents: list[str] = []
         current_tokens = 0
-        current_start = offsets[0][0] if offsets else 0
+        current_start = sentences[0].start if sentences else 0
 
-        for i, (sent, (start, end)) in enumerate(zip(sentences, offsets)):
-            sent_tokens = count_tokens(sent)
-
-            if current_tokens + sent_tokens > self.max_tokens and current_sents:
+        for i, sent in enumerate(sentences):
+            if current_tokens + sent.tokens > self.max_tokens and current_tokens:
                 # Emit current chunk
-                chunk_text = " ".join(current_sents)
+                end = sentences[i - 1].end
                 chunks.append(
                     Chunk(
                         turn_id=turn_id,
-                        text=chunk_text,
+                        text=text[current_start:end],
                         start_char=current_start,
-                        end_char=offsets[i - 1][1],
+                        end_char=end,
                         token_count=current_tokens,
                     )
                 )
-                current_sents = []
                 current_tokens = 0
-                current_start = start
+                current_start = sent.start
 
-            current_sents.append(sent)
-            current_tokens += sent_tokens
+            current_tokens += sent.tokens
 
         # Emit final chunk
-        if current_sents:
-            chunk_text = " ".join(current_sents)
-            last_end = offsets[-1][1]
+        if current_tokens:
+            last_end = sentences[-1].end
             chunk = Chunk(
                 turn_id=turn_id,
-                text=chunk_text,
+                text=text[current_start:last_end],
                 start_char=current_start,
                 end_char=last_end,
                 token_count=current_tokens,
@@ -170,18 +215,113 @@ class Chunker:
                 and chunks[-1].token_count + current_tokens <= self.max_tokens
             ):
                 prev = chunks.pop()
-                merged_text = prev.text + " " + chunk_text
-                merged_tokens = prev.token_count + current_tokens
                 chunks.append(
                     Chunk(
                         turn_id=turn_id,
-                        text=merged_text,
+                        text=text[prev.start_char:last_end],
                         start_char=prev.start_char,
                         end_char=last_end,
-                        token_count=merged_tokens,
+                        token_count=prev.token_count + current_tokens,
                     )
                 )
             else:
                 chunks.append(chunk)
 
         return chunks
+
+
+# Per-process Chunker used by ParallelChunker workers, built once by the
+# pool initializer so pySBD and the tokenizer are loaded once per worker.
+_worker_chunker: Chunker | None = None
+
+
+def _init_worker(min_tokens: int, max_tokens: int) -> None:
+    global _worker_chunker
+    _worker_chunker = Chunker(min_tokens=min_tokens, max_tokens=max_tokens)
+
+
+def _chunk_batch(turns: list[tuple[str, str]]) -> list[list[Chunk]]:
+    return [_worker_chunker.chunk_turn(turn_id, text) for turn_id, text in turns]
+
+
+class ParallelChunker:
+    """Chunks many turns across a pool of worker processes.
+
+    pySBD segmentation is pure Python, so a single Chunker keeps one core
+    busy during bulk imports. Turns are sent to workers in batches of
+    ``batch_size`` and each worker reuses one Chunker for its lifetime.
+    Results come back in input order, so chunking is deterministic
+    regardless of ``workers``.
+
+    With ``workers <= 1``, or when a call has no more than one batch of
+    turns, chunking runs in-process and no pool is started. The pool is
+    created on first use; call ``close()`` (or use as a context manager)
+    to shut it down.
+    """
+
+    def __init__(
+        self,
+        min_tokens: int = 120,
+        max_tokens: int = 250,
+        workers: int = 2,
+        batch_size: int = 32,
+    ) -> None:
+        self.min_tokens = min_tokens
+        self.max_tokens = max_tokens
+        self.workers = workers
+        self.batch_size = batch_size
+        self._local = Chunker(min_tokens=min_tokens, max_tokens=max_tokens)
+        self._pool: ProcessPoolExecutor | None = None
+
+    def chunk_turns(self, turns: Sequence[tuple[str, str]]) -> list[list[Chunk]]:
+        """Chunk (turn_id, text) pairs, returning one chunk list per turn."""
+        if self.workers <= 1 or len(turns) <= self.batch_size:
+            return [self._local.chunk_turn(turn_id, text) for turn_id, text in turns]
+
+        batches = [
+            list(turns[i : i + self.batch_size])
+            for i in range(0, len(turns), self.batch_size)
+        ]
+        # Executor.map yields results in submission order
+        return [
+            chunks
+            for batch in self._get_pool().map(_chunk_batch, batches)
+            for chunks in batch
+        ]
+
+    def submit(self, turns: Sequence[tuple[str, str]]) -> Future:
+        """Chunk one batch on a pool worker; the future holds ``chunk_turns`` output.
+
+        Lets several callers keep the pool busy with their own batches.
+        With ``workers <= 1`` the batch is chunked immediately in-process.
+        """
+        if self.workers <= 1:
+            future: Future = Future()
+            future.set_result(self.chunk_turns(turns))
+            return future
+        return self._get_pool().submit(_chunk_batch, list(turns))
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawn rather than fork: the parent may be running the index
+            # checkpoint thread, and forking a process with live threads
+            # can copy held locks into the children.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.min_tokens, self.max_tokens),
+            )
+        return self._pool
+
+    def close(self) -> None:
+        """Shut down the worker pool, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> ParallelChunker:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
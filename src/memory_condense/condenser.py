@@ -1,12 +1,30 @@
 from __future__ import annotations
 
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
-from memory_condense.chunker import Chunker
+import numpy as np
+
+from memory_condense.chunker import Chunker, ParallelChunker
 from memory_condense.db import Database
 from memory_condense.embedding import EmbeddingService
+from memory_condense.embedding_cache import EmbeddingCache
+from memory_condense.keyword_search import is_lexical_query, reciprocal_rank_fusion
 from memory_condense.retrieval import SimilarityRetriever
-from memory_condense.schemas import Chunk, RetrievalResult, Turn
+from memory_condense.schemas import (
+    BulkLoadReport,
+    Chunk,
+    CompactionReport,
+    EmbeddingCacheStats,
+    KeywordSearchStats,
+    RetrievalResult,
+    SearchCacheStats,
+    Turn,
+)
+from memory_condense.search_cache import SearchCache
 from memory_condense.transcript_store import TranscriptStore
 
 
@@ -21,6 +39,33 @@ class MemoryCondenser:
         for r in results:
             print(f"[{r.score:.3f}] {r.chunk.text}")
         mc.close()
+
+    An ``embedder`` can be passed in to share one ``EmbeddingService``
+    (and its cache) between condensers; ``model_name``, ``device``,
+    ``embedding_cache`` and the query-batching options then come from it,
+    and ``close`` leaves it open. Condensers that build their own
+    embedder still share the loaded model through the process-wide
+    ``ModelRegistry``.
+
+    With ``sparse``, chunks are also given bge-m3 lexical weights and
+    ``search(hybrid=True)`` fuses lexical and dense candidates.
+
+    ``search(keyword=...)`` brings in the SQLite FTS5 index: "fuse"
+    merges BM25 and dense results; "auto" answers queries that look like
+    lookups (identifiers, quoted phrases) from BM25 alone, skipping the
+    embedder, and everything else from dense search alone (BM25 over
+    common words is slow and adds little). ``keyword_stats`` counts how
+    often each path is taken.
+
+    ``vector_backend`` ("auto", "exact", "hnsw" or "ivfpq") selects the
+    retriever's search backend; "auto" searches exactly by brute force
+    until the store holds more than ``exact_threshold`` chunks, then
+    switches to HNSW.
+
+    ``delete_turns`` and ``delete_chunks`` remove content for retention
+    or erasure; it stops matching searches immediately, and once more
+    than ``compact_threshold`` of the index is deleted a background
+    compaction rebuilds it and vacuums SQLite.
     """
 
     def __init__(
@@ -30,6 +75,18 @@ class MemoryCondenser:
         chunker_min_tokens: int = 120,
         chunker_max_tokens: int = 250,
         device: str | None = None,
+        embedding_precision: str = "float32",
+        checkpoint_interval: float | None = 60.0,
+        chunk_workers: int = 1,
+        embedding_cache: bool = True,
+        query_batch_size: int = 1,
+        query_max_wait_ms: float = 2.0,
+        search_cache_size: int = 1024,
+        embedder: EmbeddingService | None = None,
+        sparse: bool = False,
+        vector_backend: str = "auto",
+        exact_threshold: int = 20_000,
+        compact_threshold: float | None = 0.2,
     ) -> None:
         data_dir = Path(data_dir)
         data_dir.mkdir(parents=True, exist_ok=True)
@@ -40,14 +97,54 @@ class MemoryCondenser:
             min_tokens=chunker_min_tokens,
             max_tokens=chunker_max_tokens,
         )
-        self._embedder = EmbeddingService(
-            model_name=model_name,
-            device=device,
+        # Only used by ingest_many; the pool starts on the first large batch
+        self._parallel_chunker = (
+            ParallelChunker(
+                min_tokens=chunker_min_tokens,
+                max_tokens=chunker_max_tokens,
+                workers=chunk_workers,
+            )
+            if chunk_workers > 1
+            else None
+        )
+        self._owns_embedder = embedder is None
+        if embedder is not None:
+            self._embedder = embedder
+            self._embedding_cache = embedder.cache
+        else:
+            self._embedding_cache = (
+                EmbeddingCache(data_dir / "embedding_cache.db")
+                if embedding_cache
+                else None
+            )
+            self._embedder = EmbeddingService(
+                model_name=model_name,
+                device=device,
+                cache=self._embedding_cache,
+                query_batch_size=query_batch_size,
+                query_max_wait_ms=query_max_wait_ms,
+                sparse=sparse,
+            )
+        # Query-embedding and result caches; results are keyed on the
+        # retriever's generation so new chunks invalidate them
+        self._search_cache = (
+            SearchCache(max_queries=search_cache_size, max_results=search_cache_size)
+            if search_cache_size > 0
+            else None
+        )
+        self._keyword_lock = threading.Lock()
+        self._keyword_counts = dict.fromkeys(
+            ("queries", "bm25_only", "fused", "dense_only"), 0
         )
         self._retriever = SimilarityRetriever(
             db=self._db,
             dim=self._embedder.dim,
             index_path=data_dir / "hnsw_index.bin",
+            precision=embedding_precision,
+            checkpoint_interval=checkpoint_interval,
+            backend=vector_backend,
+            exact_threshold=exact_threshold,
+            compact_threshold=compact_threshold,
         )
 
     def ingest(self, role: str, text: str) -> tuple[Turn, list[Chunk]]:
@@ -65,21 +162,351 @@ class MemoryCondenser:
 
         return turn, chunks
 
+    def ingest_many(
+        self, turns: Iterable[tuple[str, str]]
+    ) -> list[tuple[Turn, list[Chunk]]]:
+        """Ingest many (role, text) turns in one batch.
+
+        Chunks from every turn are embedded together in full-size model
+        batches before anything is written, then all turns and chunks go
+        in a single transaction and the ANN index receives a single
+        ``add_items`` call. With ``chunk_workers > 1`` chunking is spread
+        over a process pool. Returns one (turn, chunks) pair per input
+        turn, in order.
+        """
+        stored = [Turn(role=role, text=text) for role, text in turns]
+        per_turn = self._chunk_many(stored)
+
+        flat = [chunk for chunks in per_turn for chunk in chunks]
+        if flat:
+            flat = self._embedder.embed_chunks(flat)
+        self.ingest_embedded(stored, flat)
+
+        results: list[tuple[Turn, list[Chunk]]] = []
+        pos = 0
+        for turn, chunks in zip(stored, per_turn):
+            results.append((turn, flat[pos : pos + len(chunks)]))
+            pos += len(chunks)
+        return results
+
+    def ingest_embedded(self, turns: list[Turn], chunks: list[Chunk]) -> None:
+        """Store turns together with chunks already cut and embedded from them.
+
+        For pipelines that chunk and embed outside the condenser (see
+        ``ingest.IngestPipeline``). Turns keep their IDs; everything is
+        written in one transaction, as in ``ingest_many``.
+        """
+        with self._db.transaction():
+            self._transcript.insert_many(turns)
+            self._retriever.add_chunks(chunks)
+
+    @contextmanager
+    def bulk_load(self) -> Iterator[BulkLoadReport]:
+        """Load a large archive with relaxed durability and deferred indexing.
+
+        Usage::
+
+            with mc.bulk_load() as report:
+                for batch in batches:
+                    mc.ingest_many(batch)
+            print(report.turns, report.chunks, report.seconds)
+
+        Inside the block SQLite runs without fsync, foreign key checks or
+        secondary indexes (see ``Database.bulk_load``), and new chunks are
+        not searchable yet. On exit the HNSW index is built from all of
+        them in one pass, SQLite indexes and settings are restored, and
+        integrity is checked. Meant for data that can be reloaded if the
+        process dies mid-load.
+        """
+        start = time.perf_counter()
+        with self._db.bulk_load() as report:
+            with self._retriever.bulk_load(report):
+                yield report
+        report.seconds = time.perf_counter() - start
+
+    def _chunk_many(self, turns: list[Turn]) -> list[list[Chunk]]:
+        if self._parallel_chunker is not None:
+            return self._parallel_chunker.chunk_turns(
+                [(turn.turn_id, turn.text) for turn in turns]
+            )
+        return [self._chunker.chunk_turn(turn.turn_id, turn.text) for turn in turns]
+
     def search(
-        self, query: str, k: int = 10, ef_search: int = 50
+        self,
+        query: str,
+        k: int = 10,
+        ef_search: int = 50,
+        include_vectors: bool = False,
+        rescore: bool = False,
+        hybrid: bool = False,
+        sparse_weight: float = 0.3,
+        keyword: str = "off",
+    ) -> list[RetrievalResult]:
+        """Search for chunks similar to the query.
+
+        Result chunks carry embeddings only if ``include_vectors`` is set.
+        ``rescore`` re-ranks ANN candidates exactly against stored vectors.
+        ``hybrid`` (needs ``sparse=True``) also matches the query's lexical
+        weights and ranks by ``dense + sparse_weight * sparse`` (see
+        ``SimilarityRetriever.query_hybrid``). ``keyword`` is "off",
+        "fuse" or "auto" (see the class docstring); fused results are
+        scored by reciprocal rank. Repeated queries are served from the
+        search cache until new chunks are added.
+        """
+        if hybrid:
+            return self._search_hybrid(query, k, ef_search, include_vectors, sparse_weight)
+        if keyword != "off":
+            return self._search_keyword(
+                query, keyword, k, ef_search, include_vectors, rescore
+            )
+
+        params = dict(
+            k=k, ef_search=ef_search, include_vectors=include_vectors, rescore=rescore
+        )
+        results = self.cached_search(query, **params)
+        if results is not None:
+            return results
+        query_embedding = self.cached_query_embedding(query)
+        if query_embedding is None:
+            query_embedding = self._embedder.embed_query(query)
+        return self.search_by_embedding(query_embedding, query=query, **params)
+
+    def cached_search(
+        self,
+        query: str,
+        k: int = 10,
+        ef_search: int = 50,
+        include_vectors: bool = False,
+        rescore: bool = False,
+    ) -> list[RetrievalResult] | None:
+        """Results the search cache holds for this dense search, if still current."""
+        if self._search_cache is None:
+            return None
+        return self._search_cache.get_results(
+            query,
+            self._retriever.generation,
+            k=k,
+            ef_search=ef_search,
+            include_vectors=include_vectors,
+            rescore=rescore,
+        )
+
+    def cached_query_embedding(self, query: str) -> np.ndarray | None:
+        """The search cache's embedding of ``query``, if it has one."""
+        if self._search_cache is None:
+            return None
+        return self._search_cache.get_embedding(query)
+
+    def search_by_embedding(
+        self,
+        query_embedding: np.ndarray,
+        k: int = 10,
+        ef_search: int = 50,
+        include_vectors: bool = False,
+        rescore: bool = False,
+        query: str | None = None,
     ) -> list[RetrievalResult]:
-        """Search for chunks similar to the query."""
-        query_embedding = self._embedder.embed_query(query)
-        return self._retriever.query(query_embedding, k=k, ef_search=ef_search)
+        """Dense search with a query embedding computed by the caller.
+
+        For callers that encode queries themselves, e.g.
+        ``AsyncMemoryCondenser`` encoding off the event loop. Given
+        ``query``, the text the embedding came from, the embedding and
+        results go into the search cache, as with ``search``.
+        """
+        params = dict(
+            k=k, ef_search=ef_search, include_vectors=include_vectors, rescore=rescore
+        )
+        # Read before searching, so the results are at least this fresh
+        generation = self._retriever.generation
+        results = self._retriever.query(query_embedding, **params)
+        if self._search_cache is not None and query is not None:
+            self._search_cache.put_embedding(query, query_embedding)
+            self._search_cache.put_results(query, generation, results, **params)
+        return results
+
+    def _search_keyword(
+        self,
+        query: str,
+        keyword: str,
+        k: int,
+        ef_search: int,
+        include_vectors: bool,
+        rescore: bool,
+    ) -> list[RetrievalResult]:
+        if keyword not in ("fuse", "auto"):
+            raise ValueError(f"keyword must be 'off', 'fuse' or 'auto', not {keyword!r}")
+        lexical = keyword == "fuse" or is_lexical_query(query)
+        bm25 = (
+            self._retriever.query_bm25(query, k=k, include_vectors=include_vectors)
+            if lexical
+            else []
+        )
+        if keyword == "auto" and bm25:
+            self._count_keyword("bm25_only")
+            return bm25
+
+        dense = self.search(
+            query, k=k, ef_search=ef_search, include_vectors=include_vectors, rescore=rescore
+        )
+        if not lexical:
+            self._count_keyword("dense_only")
+            return dense
+        self._count_keyword("fused")
+        return reciprocal_rank_fusion([dense, bm25], k)
+
+    def _count_keyword(self, outcome: str) -> None:
+        with self._keyword_lock:
+            self._keyword_counts["queries"] += 1
+            self._keyword_counts[outcome] += 1
+
+    def _search_hybrid(
+        self,
+        query: str,
+        k: int,
+        ef_search: int,
+        include_vectors: bool,
+        sparse_weight: float,
+    ) -> list[RetrievalResult]:
+        if not self._embedder.sparse:
+            raise ValueError("hybrid search needs MemoryCondenser(sparse=True)")
+        params = dict(
+            k=k,
+            ef_search=ef_search,
+            include_vectors=include_vectors,
+            hybrid=True,
+            sparse_weight=sparse_weight,
+        )
+        cache = self._search_cache
+        generation = self._retriever.generation
+        if cache is not None:
+            results = cache.get_results(query, generation, **params)
+            if results is not None:
+                return results
+
+        # The embedding cache holds dense vectors only, so hybrid queries
+        # always run the encoder
+        vectors, weights = self._embedder.embed_queries_hybrid([query])
+        results = self._retriever.query_hybrid(
+            vectors[0],
+            weights[0],
+            k=k,
+            ef_search=ef_search,
+            sparse_weight=sparse_weight,
+            include_vectors=include_vectors,
+        )
+        if cache is not None:
+            cache.put_results(query, generation, results, **params)
+        return results
+
+    def search_many(
+        self,
+        queries: list[str],
+        k: int = 10,
+        ef_search: int = 50,
+        include_vectors: bool = False,
+        rescore: bool = False,
+        num_threads: int = -1,
+    ) -> list[list[RetrievalResult]]:
+        """Search for many queries at once; returns one result list per query.
+
+        Queries are embedded in one model batch, searched with a single
+        multi-threaded ``knn_query`` and hydrated in one database pass.
+        Meant for offline analytics and evaluation, so it bypasses the
+        search cache.
+        """
+        if not queries:
+            return []
+        query_embeddings = self._embedder.embed_queries(list(queries))
+        return self._retriever.query_many(
+            query_embeddings,
+            k=k,
+            ef_search=ef_search,
+            include_vectors=include_vectors,
+            rescore=rescore,
+            num_threads=num_threads,
+        )
+
+    def delete_turns(self, turn_ids: Iterable[str]) -> int:
+        """Delete turns and all their chunks; returns the turns deleted.
+
+        Runs in one transaction: the index, embedding store and caches are
+        only touched once it commits, so a failure leaves everything in
+        place. See ``delete_chunks`` for what deletion removes.
+        """
+        turn_ids = list(turn_ids)
+        with self._db.transaction():
+            self.delete_chunks(self._retriever.chunk_ids_for_turns(turn_ids))
+            return self._transcript.delete_turns(turn_ids)
+
+    def delete_chunks(self, chunk_ids: Iterable[str]) -> int:
+        """Delete individual chunks, keeping their turns; returns the count.
+
+        Deleted chunks are no longer searchable, and their embedding-store
+        rows, lexical postings and embedding-cache entries are removed.
+        Copies remain in the saved index file and in free SQLite pages
+        until the next ``compact()``; call it to rewrite both now.
+        """
+        chunk_ids = list(chunk_ids)
+        with self._db.transaction():
+            texts = self._retriever.chunk_texts(chunk_ids)
+            deleted = self._retriever.delete_chunks(chunk_ids)
+            self._db.after_commit(lambda: self._embedder.evict(texts))
+        return deleted
+
+    def compact(self) -> CompactionReport:
+        """Rebuild the index without deleted chunks and vacuum SQLite now."""
+        return self._retriever.compact()
 
     @property
     def transcript(self) -> TranscriptStore:
         """Access the transcript store directly."""
         return self._transcript
 
+    @property
+    def chunker(self) -> Chunker:
+        """The chunker that splits ingested turns."""
+        return self._chunker
+
+    @property
+    def embedder(self) -> EmbeddingService:
+        """The embedding service used for chunks and queries."""
+        return self._embedder
+
+    def embedding_cache_stats(self) -> EmbeddingCacheStats | None:
+        """Hit-rate counters for the embedding cache, if it is enabled."""
+        if self._embedding_cache is None:
+            return None
+        return self._embedding_cache.stats()
+
+    def keyword_stats(self) -> KeywordSearchStats:
+        """How many keyword-mode searches skipped the embedder."""
+        with self._keyword_lock:
+            counts = dict(self._keyword_counts)
+        return KeywordSearchStats(
+            **counts,
+            embedder_skip_rate=counts["bm25_only"] / counts["queries"]
+            if counts["queries"]
+            else 0.0,
+        )
+
+    def search_cache_stats(self) -> SearchCacheStats | None:
+        """Hit/miss counters for the search cache, if it is enabled."""
+        if self._search_cache is None:
+            return None
+        return self._search_cache.stats()
+
     def close(self) -> None:
-        """Persist index and close database."""
-        self._retriever.save()
+        """Checkpoint the index, stop chunking workers and close database.
+
+        An injected embedder and its cache are left open for their owner.
+        """
+        if self._parallel_chunker is not None:
+            self._parallel_chunker.close()
+        self._retriever.close()
+        if self._owns_embedder:
+            self._embedder.close()
+            if self._embedding_cache is not None:
+                self._embedding_cache.close()
         self._db.close()
 
     def __enter__(self) -> MemoryCondenser:
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
 import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
+from memory_condense.schemas import BulkLoadReport
+
 _SCHEMA_SQL = """
 CREATE TABLE IF NOT EXISTS turns (
     turn_id    TEXT PRIMARY KEY,
@@ -35,9 +41,77 @@ CREATE TABLE IF NOT EXISTS meta (
 INSERT OR IGNORE INTO meta (key, value) VALUES ('schema_version', '1');
 """
 
+# Keyword index over chunk text. External-content FTS5 table: it stores
+# only the inverted index and reads text from ``chunks`` by rowid. The
+# triggers keep it in step with every insert, delete and text update.
+_FTS_INSERT_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS chunks_fts_insert AFTER INSERT ON chunks BEGIN
+    INSERT INTO chunks_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+"""
+
+_FTS_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+    text, content='chunks', content_rowid='rowid'
+);
+
+CREATE TRIGGER IF NOT EXISTS chunks_fts_delete AFTER DELETE ON chunks BEGIN
+    INSERT INTO chunks_fts (chunks_fts, rowid, text)
+    VALUES ('delete', old.rowid, old.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS chunks_fts_update AFTER UPDATE OF text ON chunks BEGIN
+    INSERT INTO chunks_fts (chunks_fts, rowid, text)
+    VALUES ('delete', old.rowid, old.text);
+    INSERT INTO chunks_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+""" + _FTS_INSERT_TRIGGER
+
+# Chunks added during bulk_load() are not in chunks_fts until it exits, so
+# an FTS5 'delete' for one of them would corrupt the index. Deletes and
+# text updates are refused on the writer connection meanwhile.
+_BULK_GUARD_TRIGGERS = """
+CREATE TEMP TRIGGER IF NOT EXISTS bulk_guard_delete BEFORE DELETE ON chunks BEGIN
+    SELECT RAISE(ABORT, 'chunks cannot be deleted during bulk_load()');
+END;
+
+CREATE TEMP TRIGGER IF NOT EXISTS bulk_guard_update
+BEFORE UPDATE OF text ON chunks BEGIN
+    SELECT RAISE(ABORT, 'chunk text cannot be updated during bulk_load()');
+END;
+"""
+
+# Secondary indexes dropped during bulk_load() and rebuilt on exit.
+_SECONDARY_INDEXES = {
+    "idx_turns_created": (
+        "CREATE INDEX IF NOT EXISTS idx_turns_created ON turns(created_at)"
+    ),
+    "idx_chunks_turn": "CREATE INDEX IF NOT EXISTS idx_chunks_turn ON chunks(turn_id)",
+}
+
 
 class Database:
-    """Manages SQLite connection and schema initialization."""
+    """Manages SQLite connections and schema initialization.
+
+    Writes go through a single writer connection, serialized by a lock:
+    ``execute``/``executemany``/``commit`` hold it per call and
+    ``transaction()`` holds it for the whole block, so one thread's
+    transaction is never interleaved with another thread's writes.
+    Writes belong inside ``transaction()``: a bare ``execute`` followed
+    by ``commit`` leaves the write pending between the two calls, where
+    another thread's transaction would commit it or roll it back.
+
+    ``read()`` runs on a read-only connection owned by the calling
+    thread (opened on first use and reused after). In WAL mode these see
+    the last committed state and never wait for the writer, so searches
+    on many threads proceed during ingest. A thread inside its own
+    ``transaction()`` reads through the writer instead, so it sees its
+    uncommitted rows.
+
+    Chunk text is also indexed in the ``chunks_fts`` FTS5 table, kept in
+    sync by triggers; ``fts`` is False if this SQLite build lacks FTS5.
+    An existing database gets the table, and a backfill, on first open.
+    """
 
     def __init__(self, db_path: str | Path = "memory.db") -> None:
         self._path = Path(db_path)
@@ -49,22 +123,280 @@ class Database:
         self._conn.execute("PRAGMA journal_mode=WAL")
         self._conn.execute("PRAGMA foreign_keys=ON")
         self._conn.executescript(_SCHEMA_SQL)
+        self.fts = self._create_fts()
         self._conn.commit()
+        self._tx_depth = 0
+        self._write_lock = threading.RLock()
+        # Set while a bulk_load() block is open
+        self._bulk = False
+        # Hooks of the open transaction, run when its outermost block ends
+        self._on_commit: list[Callable[[], None]] = []
+        self._on_rollback: list[Callable[[], None]] = []
+
+        # In-memory databases are private to one connection
+        self._shared_reads = str(db_path) == ":memory:"
+        self._local = threading.local()
+        self._readers: list[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+    def _create_fts(self) -> bool:
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'chunks_fts'"
+        ).fetchone()
+        try:
+            self._conn.executescript(_FTS_SQL)
+        except sqlite3.OperationalError:
+            return False  # no FTS5 in this SQLite build
+        if not exists:
+            self._conn.execute("INSERT INTO chunks_fts (chunks_fts) VALUES ('rebuild')")
+        return True
 
     @property
     def connection(self) -> sqlite3.Connection:
+        """The writer connection."""
         return self._conn
 
     def execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
-        return self._conn.execute(sql, params)
+        with self._write_lock:
+            return self._conn.execute(sql, params)
 
     def executemany(self, sql: str, params_seq) -> sqlite3.Cursor:
-        return self._conn.executemany(sql, params_seq)
+        with self._write_lock:
+            return self._conn.executemany(sql, params_seq)
+
+    def read(self, sql: str, params: tuple = ()) -> list[tuple]:
+        """Run a read-only query and return all rows.
+
+        Uses the calling thread's pooled reader connection, or the writer
+        if this thread has a ``transaction()`` open.
+        """
+        if self._shared_reads or self._in_own_transaction():
+            with self._write_lock:
+                return self._conn.execute(sql, params).fetchall()
+        return self._reader().execute(sql, params).fetchall()
 
     def commit(self) -> None:
-        self._conn.commit()
+        """Commit pending writes, unless inside a ``transaction()`` block."""
+        with self._write_lock:
+            if self._tx_depth == 0:
+                self._conn.commit()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Group all writes in the block into a single transaction.
+
+        ``commit()`` calls made inside the block are deferred until the
+        outermost block exits; an exception rolls everything back.
+        Blocks may be nested. The writer stays locked to the calling
+        thread for the whole block. Hooks registered with ``after_commit``
+        / ``after_rollback`` run once the outermost block has ended.
+        """
+        with self._write_lock:
+            self._tx_depth += 1
+            try:
+                yield
+            except BaseException:
+                self._tx_depth -= 1
+                if self._tx_depth == 0:
+                    self._conn.rollback()
+                    self._run_hooks(self._on_rollback)
+                raise
+            self._tx_depth -= 1
+            if self._tx_depth == 0:
+                try:
+                    self._conn.commit()
+                except BaseException:
+                    self._conn.rollback()
+                    self._run_hooks(self._on_rollback)
+                    raise
+                self._run_hooks(self._on_commit)
+
+    def after_commit(self, hook: Callable[[], None]) -> None:
+        """Run ``hook`` once the calling thread's transaction commits.
+
+        Use it for in-memory state that must not be visible to other
+        threads before the rows it describes are (readers only see
+        committed data). Outside a ``transaction()`` it runs immediately.
+        Dropped if the transaction rolls back.
+        """
+        with self._write_lock:
+            if self._tx_depth == 0:
+                hook()
+            else:
+                self._on_commit.append(hook)
+
+    def after_rollback(self, hook: Callable[[], None]) -> None:
+        """Run ``hook`` if the calling thread's transaction rolls back.
+
+        Outside a ``transaction()`` there is nothing to undo, so it is
+        ignored.
+        """
+        with self._write_lock:
+            if self._tx_depth:
+                self._on_rollback.append(hook)
+
+    def _run_hooks(self, hooks: list[Callable[[], None]]) -> None:
+        # Called with the writer held and no transaction open
+        pending = list(hooks)
+        self._on_commit.clear()
+        self._on_rollback.clear()
+        for hook in pending:
+            hook()
+
+    @contextmanager
+    def bulk_load(
+        self, report: BulkLoadReport | None = None
+    ) -> Iterator[BulkLoadReport]:
+        """Relax durability and index maintenance for a large one-off load.
+
+        For the duration of the block:
+
+        * ``synchronous=OFF`` — commits are not fsynced, so a crash may
+          lose the load (but not corrupt the WAL database);
+        * ``foreign_keys=OFF`` — no per-row reference checks;
+        * the secondary indexes are dropped, so inserts only maintain
+          the primary keys;
+        * the FTS insert trigger is dropped, and the new chunks are
+          added to ``chunks_fts`` in one statement on exit. Until then
+          deleting chunks or updating their text raises
+          ``sqlite3.IntegrityError``, since ``chunks_fts`` does not yet
+          cover them.
+
+        The writer lock is only held while settings are changed and
+        restored, not across the block, so other threads (e.g. the index
+        stage of an ``IngestPipeline``) can run ``transaction()`` as
+        usual. Those transactions see the relaxed settings; ``vacuum()``
+        and a second ``bulk_load()`` are refused until the block exits.
+
+        On exit the indexes are rebuilt in one sort each, the original
+        pragmas are restored, and the data is verified with
+        ``PRAGMA foreign_key_check`` and ``PRAGMA quick_check``. Results
+        go into the yielded ``BulkLoadReport``; violations raise
+        ``sqlite3.IntegrityError`` after settings have been restored.
+        """
+        report = report if report is not None else BulkLoadReport()
+        start = time.perf_counter()
+        with self._write_lock:
+            if self._bulk:
+                raise RuntimeError("bulk_load() is already active")
+            if self._tx_depth:
+                raise RuntimeError("bulk_load() cannot start inside a transaction")
+            self._conn.commit()
+            turns_before, chunks_before = self._counts()
+            synchronous = self._conn.execute("PRAGMA synchronous").fetchone()[0]
+            last_rowid = self._conn.execute(
+                "SELECT COALESCE(MAX(rowid), 0) FROM chunks"
+            ).fetchone()[0]
+
+            self._conn.execute("PRAGMA synchronous=OFF")
+            self._conn.execute("PRAGMA foreign_keys=OFF")
+            for name in _SECONDARY_INDEXES:
+                self._conn.execute(f"DROP INDEX IF EXISTS {name}")
+            if self.fts:
+                self._conn.execute("DROP TRIGGER IF EXISTS chunks_fts_insert")
+                self._conn.executescript(_BULK_GUARD_TRIGGERS)
+            self._conn.commit()
+            self._bulk = True
+        try:
+            yield report
+        finally:
+            # Waits for any transaction still open on another thread
+            with self._write_lock:
+                self._bulk = False
+                self._conn.commit()
+                for sql in _SECONDARY_INDEXES.values():
+                    self._conn.execute(sql)
+                if self.fts:
+                    self._conn.execute(
+                        "INSERT INTO chunks_fts (rowid, text) "
+                        "SELECT rowid, text FROM chunks WHERE rowid > ?",
+                        (last_rowid,),
+                    )
+                    self._conn.executescript(_FTS_INSERT_TRIGGER)
+                    self._conn.execute("DROP TRIGGER IF EXISTS temp.bulk_guard_delete")
+                    self._conn.execute("DROP TRIGGER IF EXISTS temp.bulk_guard_update")
+                self._conn.commit()
+                self._conn.execute(f"PRAGMA synchronous={synchronous}")
+                self._conn.execute("PRAGMA foreign_keys=ON")
+
+        with self._write_lock:
+            violations = self._conn.execute("PRAGMA foreign_key_check").fetchall()
+            check = self._conn.execute("PRAGMA quick_check").fetchall()
+            turns_after, chunks_after = self._counts()
+
+        report.turns = turns_after - turns_before
+        report.chunks = chunks_after - chunks_before
+        report.foreign_key_violations = len(violations)
+        report.integrity_check = "; ".join(row[0] for row in check)
+        report.seconds = time.perf_counter() - start
+        if violations or report.integrity_check != "ok":
+            raise sqlite3.IntegrityError(
+                f"bulk load left {len(violations)} foreign key violation(s); "
+                f"quick_check: {report.integrity_check}"
+            )
+
+    def vacuum(self) -> None:
+        """Rewrite the database file to reclaim the space of deleted rows.
+
+        VACUUM may renumber the rowids of ``chunks``, which the external
+        content ``chunks_fts`` index refers to, so that index is rebuilt
+        afterwards.
+        """
+        with self._write_lock:
+            if self._tx_depth:
+                raise RuntimeError("vacuum() cannot run inside a transaction")
+            if self._bulk:
+                raise RuntimeError("vacuum() cannot run during bulk_load()")
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+            if self.fts:
+                self._conn.execute(
+                    "INSERT INTO chunks_fts (chunks_fts) VALUES ('rebuild')"
+                )
+                self._conn.commit()
+            # VACUUM goes through the WAL; fold it back and truncate it
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+
+    def size_bytes(self) -> int:
+        """Size of the main database file, from its page count."""
+        with self._write_lock:
+            pages = self._conn.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+        return pages * page_size
+
+    def _counts(self) -> tuple[int, int]:
+        return (
+            self._conn.execute("SELECT COUNT(*) FROM turns").fetchone()[0],
+            self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0],
+        )
+
+    def _in_own_transaction(self) -> bool:
+        # _tx_depth is only non-zero while some thread holds the write
+        # lock, so try-acquiring it tells whether that thread is us.
+        if self._tx_depth == 0:
+            return False
+        if not self._write_lock.acquire(blocking=False):
+            return False
+        try:
+            return self._tx_depth > 0
+        finally:
+            self._write_lock.release()
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self._path), check_same_thread=False)
+            conn.execute("PRAGMA query_only=ON")
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
 
     def close(self) -> None:
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
         self._conn.close()
 
     def __enter__(self) -> Database:
@@ -1,19 +1,101 @@
 from __future__ import annotations
 
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import Future
+from pathlib import Path
 from typing import TYPE_CHECKING
 
 import numpy as np
 
+from memory_condense.embedding_cache import EmbeddingCache, cache_key
+from memory_condense.model_registry import ModelRegistry, default_registry
+from memory_condense.query_batcher import QueryBatcher
 from memory_condense.schemas import Chunk
 
 if TYPE_CHECKING:
     from sentence_transformers import SentenceTransformer
 
 
+def _numpy(value) -> np.ndarray:
+    """A model output (torch tensor or array) as a float32/int numpy array."""
+    if hasattr(value, "detach"):
+        value = value.detach().cpu()
+        if value.is_floating_point():
+            value = value.float()
+        return value.numpy()
+    return np.asarray(value)
+
+
+class SparseHead:
+    """bge-m3's lexical-weight head, applied to the encoder's token states.
+
+    A token's weight is ``relu(hidden @ weight + bias)``; repeated tokens
+    keep their largest weight and special tokens are dropped, as in
+    FlagEmbedding's ``BGEM3FlagModel``. Returns {token_id: weight} with
+    token ids as strings, the form ``Chunk.lexical_weights`` uses.
+    """
+
+    def __init__(
+        self, weight: np.ndarray, bias: float, skip_ids: Iterable[int] = ()
+    ) -> None:
+        self.weight = np.asarray(weight, dtype=np.float32).reshape(-1)
+        self.bias = float(bias)
+        self._skip_ids = np.array(sorted(set(skip_ids)), dtype=np.int64)
+
+    @classmethod
+    def from_pretrained(cls, model: SentenceTransformer, model_name: str) -> SparseHead:
+        """Load ``sparse_linear.pt`` from a local model dir or the HF hub."""
+        import torch
+
+        path = Path(model_name) / "sparse_linear.pt"
+        if not path.exists():
+            from huggingface_hub import hf_hub_download
+
+            path = hf_hub_download(model_name, "sparse_linear.pt")
+        state = torch.load(path, map_location="cpu")
+        return cls(
+            _numpy(state["weight"]),
+            _numpy(state["bias"]).item(),
+            model.tokenizer.all_special_ids,
+        )
+
+    def __call__(
+        self, input_ids: np.ndarray, token_embeddings: np.ndarray
+    ) -> dict[str, float]:
+        ids = np.asarray(input_ids, dtype=np.int64)
+        weights = np.maximum(
+            np.asarray(token_embeddings, dtype=np.float32) @ self.weight + self.bias, 0.0
+        )
+        keep = (weights > 0) & ~np.isin(ids, self._skip_ids)
+        result: dict[str, float] = {}
+        for token, weight in zip(ids[keep].tolist(), weights[keep].tolist()):
+            key = str(token)
+            if weight > result.get(key, 0.0):
+                result[key] = weight
+        return result
+
+
 class EmbeddingService:
     """Wraps BAAI/bge-m3 via sentence-transformers for dense embeddings.
 
-    The model is loaded lazily on first use to keep imports fast.
+    The model is loaded lazily on first use to keep imports fast, through
+    a ``ModelRegistry`` (the process-wide one by default), so services
+    with the same model name and device share one loaded copy. With a
+    ``cache``, chunk texts that were embedded before (by the same model)
+    are served from it instead of being re-encoded.
+
+    With ``query_batch_size > 1``, concurrent ``embed_query`` calls are
+    coalesced by a ``QueryBatcher`` into shared ``encode`` calls of up to
+    that many queries, waiting at most ``query_max_wait_ms`` for a batch
+    to fill.
+
+    With ``sparse``, chunks also get bge-m3 lexical weights
+    (``Chunk.lexical_weights``) from the same forward pass, and
+    ``embed_queries_hybrid`` returns both representations for queries.
+    Every chunk text is then encoded, since cached dense vectors carry no
+    sparse weights; new vectors are still written to the cache.
     """
 
     def __init__(
@@ -21,21 +103,42 @@ class EmbeddingService:
         model_name: str = "BAAI/bge-m3",
         device: str | None = None,
         batch_size: int = 32,
+        cache: EmbeddingCache | None = None,
+        query_batch_size: int = 1,
+        query_max_wait_ms: float = 2.0,
+        registry: ModelRegistry | None = None,
+        sparse: bool = False,
     ) -> None:
         self._model_name = model_name
         self._device = device
         self._batch_size = batch_size
+        self._registry = registry or default_registry()
+        # A pinned model bypasses the registry (used by tests and benchmarks)
         self._model: SentenceTransformer | None = None
+        self._cache = cache
+        self._sparse = sparse
+        self._sparse_head: SparseHead | None = None
+        self._query_batch_size = query_batch_size
+        self._query_max_wait_ms = query_max_wait_ms
+        self._batcher: QueryBatcher | None = None
+        self._batcher_lock = threading.Lock()
 
     def _load_model(self) -> SentenceTransformer:
-        if self._model is None:
-            from sentence_transformers import SentenceTransformer
+        if self._model is not None:
+            return self._model
+        return self._registry.get(self._model_name, self._device)
 
-            kwargs: dict = {}
-            if self._device is not None:
-                kwargs["device"] = self._device
-            self._model = SentenceTransformer(self._model_name, **kwargs)
-        return self._model
+    def _load_sparse_head(self) -> SparseHead:
+        if self._sparse_head is None:
+            self._sparse_head = SparseHead.from_pretrained(
+                self._load_model(), self._model_name
+            )
+        return self._sparse_head
+
+    @property
+    def sparse(self) -> bool:
+        """Whether this service computes lexical weights."""
+        return self._sparse
 
     def embed_chunks(self, chunks: list[Chunk]) -> list[Chunk]:
         """Compute dense embeddings for chunks.
@@ -45,12 +148,17 @@ class EmbeddingService:
         if not chunks:
             return []
 
-        model = self._load_model()
         texts = [c.text for c in chunks]
-
-        dense_vecs: np.ndarray = model.encode(
-            texts, batch_size=self._batch_size, normalize_embeddings=False
-        )
+        lexical: list[dict[str, float] | None] = [None] * len(chunks)
+        if self._sparse:
+            dense_vecs, lexical = self._encode_hybrid(texts)
+            if self._cache is not None:
+                keys = [cache_key(self._model_name, text) for text in texts]
+                self._cache.put_many(zip(keys, dense_vecs))
+        elif self._cache is None:
+            dense_vecs = self._encode(texts)
+        else:
+            dense_vecs = self._encode_cached(texts)
 
         result: list[Chunk] = []
         for i, chunk in enumerate(chunks):
@@ -63,18 +171,143 @@ class EmbeddingService:
                     end_char=chunk.end_char,
                     token_count=chunk.token_count,
                     embedding=dense_vecs[i].tolist(),
+                    lexical_weights=lexical[i],
                 )
             )
 
         return result
 
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        model = self._load_model()
+        return model.encode(
+            texts, batch_size=self._batch_size, normalize_embeddings=False
+        )
+
+    def _encode_hybrid(
+        self, texts: list[str]
+    ) -> tuple[np.ndarray, list[dict[str, float]]]:
+        """Dense vectors and lexical weights from one forward pass."""
+        model = self._load_model()
+        head = self._load_sparse_head()
+        outputs = model.encode(
+            texts,
+            batch_size=self._batch_size,
+            output_value=None,
+            normalize_embeddings=False,
+        )
+        dense = np.stack(
+            [_numpy(out["sentence_embedding"]) for out in outputs]
+        ).astype(np.float32)
+        lexical: list[dict[str, float]] = []
+        for out in outputs:
+            # Token outputs are padded to the longest text in the batch
+            mask = _numpy(out["attention_mask"]).astype(bool)
+            lexical.append(
+                head(_numpy(out["input_ids"])[mask], _numpy(out["token_embeddings"])[mask])
+            )
+        return dense, lexical
+
+    def _encode_cached(self, texts: list[str]) -> np.ndarray:
+        """Encode only texts missing from the cache, each unique text once."""
+        keys = [cache_key(self._model_name, text) for text in texts]
+        vectors = self._cache.get_many(set(keys))
+
+        missing: dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+
+        seconds = 0.0
+        if missing:
+            start = time.perf_counter()
+            encoded = self._encode(list(missing.values()))
+            seconds = time.perf_counter() - start
+            new = dict(zip(missing, np.asarray(encoded, dtype=np.float32)))
+            self._cache.put_many(new.items())
+            vectors.update(new)
+
+        self._cache.record(
+            hits=len(texts) - len(missing), misses=len(missing), encode_seconds=seconds
+        )
+        return np.stack([vectors[key] for key in keys])
+
+    @property
+    def cache(self) -> EmbeddingCache | None:
+        return self._cache
+
+    def evict(self, texts: list[str]) -> int:
+        """Drop cached vectors of ``texts`` (for this model); returns the count."""
+        if self._cache is None or not texts:
+            return 0
+        return self._cache.delete_many(
+            {cache_key(self._model_name, text) for text in texts}
+        )
+
     def embed_query(self, query: str) -> np.ndarray:
         """Compute a dense embedding for a single query string.
 
         Returns a 1-D numpy array of shape (dim,).
         """
+        if self._query_batch_size > 1:
+            return self.submit_query(query).result()
+        return self.embed_queries([query])[0]
+
+    def embed_queries(self, queries: list[str]) -> np.ndarray:
+        """Compute dense embeddings for several queries in one encode call."""
         model = self._load_model()
-        return model.encode([query], normalize_embeddings=False)[0]
+        return model.encode(
+            queries, batch_size=self._batch_size, normalize_embeddings=False
+        )
+
+    def embed_queries_hybrid(
+        self, queries: list[str]
+    ) -> tuple[np.ndarray, list[dict[str, float]]]:
+        """Dense embeddings and lexical weights for queries, in one pass.
+
+        Requires ``sparse``. Bypasses the query micro-batcher.
+        """
+        if not self._sparse:
+            raise ValueError("EmbeddingService was created without sparse=True")
+        return self._encode_hybrid(list(queries))
+
+    def submit_query(self, query: str) -> Future:
+        """Queue a query for micro-batched encoding; returns a future vector.
+
+        Without query batching the query is encoded immediately and the
+        returned future is already resolved.
+        """
+        if self._query_batch_size <= 1:
+            future: Future = Future()
+            future.set_result(self.embed_queries([query])[0])
+            return future
+        return self._get_batcher().submit(query)
+
+    @property
+    def batches_queries(self) -> bool:
+        """Whether ``embed_query`` goes through the micro-batcher."""
+        return self._query_batch_size > 1
+
+    @property
+    def query_batcher(self) -> QueryBatcher | None:
+        """The active query micro-batcher, once one has been started."""
+        return self._batcher
+
+    def _get_batcher(self) -> QueryBatcher:
+        with self._batcher_lock:
+            if self._batcher is None:
+                self._batcher = QueryBatcher(
+                    self.embed_queries,
+                    max_batch_size=self._query_batch_size,
+                    max_wait_ms=self._query_max_wait_ms,
+                )
+            return self._batcher
+
+    def close(self) -> None:
+        """Stop the query batcher thread, if one was started."""
+        with self._batcher_lock:
+            if self._batcher is not None:
+                self._batcher.close()
+                self._batcher = None
 
     @property
     def dim(self) -> int:
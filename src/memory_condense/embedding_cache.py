@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+
+from memory_condense.schemas import EmbeddingCacheStats
+
+_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key    BLOB PRIMARY KEY,
+    vector BLOB NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Keys per SELECT ... IN (...) statement, below SQLite's variable limit.
+_SQL_BATCH = 500
+
+
+def cache_key(model_name: str, text: str) -> bytes:
+    """Content address of ``text`` embedded by ``model_name``."""
+    return hashlib.blake2b(
+        f"{model_name}\0{text}".encode(), digest_size=16
+    ).digest()
+
+
+class EmbeddingCache:
+    """Persistent content-addressed cache of dense chunk embeddings.
+
+    Vectors are keyed by a hash of (model name, text), so identical chunk
+    text — pasted code, repeated error messages, re-sent prompts — is
+    encoded once per model no matter how often it is ingested. Entries
+    live in their own SQLite file (``embedding_cache.db`` next to
+    ``memory.db`` when used through MemoryCondenser) so the cache can be
+    deleted or shared without touching the memory store.
+
+    Hit and miss counters cover the lifetime of this object; ``stats()``
+    also estimates the encoder time saved from the measured cost of the
+    misses.
+    """
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        self._path = Path(path) if path else None
+        if self._path is not None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(self._path) if self._path else ":memory:",
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA_SQL)
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.encode_seconds = 0.0
+
+    @property
+    def path(self) -> Path | None:
+        return self._path
+
+    def get_many(self, keys: Iterable[bytes]) -> dict[bytes, np.ndarray]:
+        """Return cached float32 vectors for whichever keys are present."""
+        keys = list(keys)
+        found: dict[bytes, np.ndarray] = {}
+        with self._lock:
+            for i in range(0, len(keys), _SQL_BATCH):
+                batch = keys[i : i + _SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items: Iterable[tuple[bytes, np.ndarray]]) -> None:
+        """Store (key, vector) pairs, keeping any existing entry for a key."""
+        rows = [
+            (key, np.asarray(vec, dtype=np.float32).tobytes()) for key, vec in items
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector) VALUES (?, ?)", rows
+            )
+            self._conn.commit()
+
+    def delete_many(self, keys: Iterable[bytes]) -> int:
+        """Remove entries, e.g. for the text of deleted chunks; returns the count."""
+        keys = list(keys)
+        deleted = 0
+        with self._lock:
+            for i in range(0, len(keys), _SQL_BATCH):
+                batch = keys[i : i + _SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                deleted += self._conn.execute(
+                    f"DELETE FROM embeddings WHERE key IN ({placeholders})", batch
+                ).rowcount
+            self._conn.commit()
+        return deleted
+
+    def record(self, hits: int, misses: int, encode_seconds: float) -> None:
+        """Add one lookup's outcome to the running counters."""
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.encode_seconds += encode_seconds
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> EmbeddingCacheStats:
+        lookups = self.hits + self.misses
+        per_miss = self.encode_seconds / self.misses if self.misses else 0.0
+        return EmbeddingCacheStats(
+            entries=len(self),
+            hits=self.hits,
+            misses=self.misses,
+            hit_rate=self.hits / lookups if lookups else 0.0,
+            encode_seconds=self.encode_seconds,
+            est_seconds_saved=self.hits * per_miss,
+        )
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+PRECISIONS = ("float32", "float16", "int8")
+
+# Rows re-encoded per step when an int8 scale is widened.
+_REQUANTIZE_BLOCK = 65_536
+
+# Initial per-dimension bound of an int8 scale. Components of an
+# L2-normalised vector lie in [-1, 1], so the scale never has to grow
+# for them; other vectors may still widen it.
+_SCALE_BOUND = 1.0
+
+# Headroom applied when an int8 scale has to grow, so that a few slightly
+# larger values do not trigger a requantization on every append.
+_SCALE_HEADROOM = 1.25
+
+
+class EmbeddingStore:
+    """Append-only embedding matrix, one row per hnsw_label.
+
+    Rows live in a flat binary file that is memory-mapped with numpy, so
+    reading a range of rows is a zero-copy slice. With no path the matrix
+    is kept in memory (useful for tests and throwaway indexes).
+
+    ``precision`` selects the on-disk encoding:
+
+    * ``float32`` — full precision (default).
+    * ``float16`` — half precision, 2 bytes per dimension.
+    * ``int8`` — symmetric scalar quantization with one scale per
+      dimension, 1 byte per dimension. The scale starts at a bound of
+      1.0 per dimension, which covers any L2-normalised vector, and is
+      stored in a sidecar ``<path>.scale`` file. A vector outside it
+      widens the scale: existing rows are requantized into a new file
+      that replaces the old one together with the scale, so a crash
+      leaves either the old or the new pair and readers never mix them.
+
+    ``vectors()`` always returns float32, so callers never see the codes.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        path: str | Path | None = None,
+        precision: str = "float32",
+    ) -> None:
+        if precision not in PRECISIONS:
+            raise ValueError(
+                f"precision must be one of {PRECISIONS}, got {precision!r}"
+            )
+        self._dim = dim
+        self._precision = precision
+        self._dtype = np.dtype(precision)
+        self._row_bytes = dim * self._dtype.itemsize
+        self._path = Path(path) if path else None
+
+        self._memory = np.empty((0, dim), dtype=self._dtype)
+        self._mmap: np.ndarray | None = None
+        self._count = 0
+        self._scale: np.ndarray | None = None
+        # Held while rows and scale are swapped by a requantization
+        self._swap_lock = threading.Lock()
+
+        if self._path is not None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            if precision == "int8":
+                self._recover_requantize()
+            self._path.touch(exist_ok=True)
+            size = self._path.stat().st_size
+            # Drop a partially written trailing row left by a crash
+            if size % self._row_bytes:
+                with open(self._path, "r+b") as f:
+                    f.truncate(size - size % self._row_bytes)
+            self._count = size // self._row_bytes
+
+            if precision == "int8" and self._scale_path.exists():
+                self._scale = np.fromfile(self._scale_path, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def dim(self) -> int:
+        return self._dim
+
+    @property
+    def path(self) -> Path | None:
+        return self._path
+
+    @property
+    def precision(self) -> str:
+        return self._precision
+
+    @property
+    def bytes_per_vector(self) -> int:
+        """Storage cost of one row, excluding the shared int8 scale."""
+        return self._row_bytes
+
+    @property
+    def _scale_path(self) -> Path:
+        return self._path.with_name(self._path.name + ".scale")
+
+    @property
+    def _requantize_path(self) -> Path:
+        return self._path.with_name(self._path.name + ".requantize")
+
+    @property
+    def _pending_scale_path(self) -> Path:
+        return self._path.with_name(self._path.name + ".scale.pending")
+
+    def _recover_requantize(self) -> None:
+        """Finish or discard a requantization interrupted by a crash.
+
+        The rows file is replaced first, consuming ``.requantize``; so a
+        leftover ``.requantize`` means the old pair is intact, and a
+        pending scale without it means only the scale is left to move.
+        """
+        if self._requantize_path.exists():
+            self._requantize_path.unlink()
+            self._pending_scale_path.unlink(missing_ok=True)
+        elif self._pending_scale_path.exists():
+            os.replace(self._pending_scale_path, self._scale_path)
+
+    def append(self, vectors: np.ndarray) -> int:
+        """Append rows and return the row index of the first one."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self._dim)
+        codes = np.ascontiguousarray(self._encode(vectors))
+        first = self._count
+
+        if self._path is None:
+            self._memory = np.concatenate([self._memory, codes])
+        else:
+            with open(self._path, "ab") as f:
+                f.write(codes.tobytes())
+            self._mmap = None
+
+        self._count += len(codes)
+        return first
+
+    def matrix(self) -> np.ndarray:
+        """Return a read-only (len, dim) view over all stored rows (raw codes)."""
+        return self._view()[0]
+
+    def _view(self) -> tuple[np.ndarray, np.ndarray | None]:
+        """All stored rows and the int8 scale they are encoded with.
+
+        Read together, so a concurrent requantization cannot pair old
+        rows with the new scale.
+        """
+        with self._swap_lock:
+            return self._rows(), self._scale
+
+    def _rows(self) -> np.ndarray:
+        if self._path is None:
+            return self._memory
+        if self._count == 0:
+            return np.empty((0, self._dim), dtype=self._dtype)
+        if self._mmap is None or len(self._mmap) != self._count:
+            self._mmap = np.memmap(
+                self._path, dtype=self._dtype, mode="r", shape=(self._count, self._dim)
+            )
+        return self._mmap
+
+    def take(self, rows: np.ndarray) -> np.ndarray:
+        """Return the raw codes for rows, as a zero-copy slice when contiguous."""
+        return self._take(self.matrix(), rows)
+
+    def _take(self, codes: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return np.empty((0, self._dim), dtype=self._dtype)
+        first, last = int(rows[0]), int(rows[-1])
+        if last - first + 1 == len(rows) and np.all(np.diff(rows) == 1):
+            return codes[first : last + 1]
+        return codes[rows]
+
+    def vectors(self, rows: np.ndarray) -> np.ndarray:
+        """Return rows decoded to float32 (zero-copy for contiguous float32)."""
+        codes, scale = self._view()
+        return self._decode(self._take(codes, rows), scale)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Convert raw stored codes to float32 vectors."""
+        return self._decode(codes, self._scale)
+
+    def _decode(self, codes: np.ndarray, scale: np.ndarray | None) -> np.ndarray:
+        if self._precision == "float32":
+            return codes
+        if self._precision == "float16":
+            return codes.astype(np.float32)
+        return codes.astype(np.float32) * scale
+
+    def score(self, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Exact cosine similarity between ``query`` and the given rows.
+
+        Computed directly on the stored encoding, so the result reflects
+        the configured precision.
+        """
+        codes, scale = self._view()
+        codes = self._take(codes, rows)
+        if len(codes) == 0:
+            return np.empty(0, dtype=np.float32)
+
+        query = np.asarray(query, dtype=np.float32).ravel()
+        if self._precision == "int8":
+            # Fold the per-dimension scale into the query instead of
+            # decoding every row.
+            codes = codes.astype(np.float32)
+            dots = codes @ (query * scale)
+            norms = np.sqrt((codes * codes) @ (scale * scale))
+        else:
+            codes = codes.astype(np.float32, copy=False)
+            dots = codes @ query
+            norms = np.linalg.norm(codes, axis=1)
+
+        denom = norms * np.linalg.norm(query)
+        return np.divide(dots, denom, out=np.zeros_like(dots), where=denom > 0)
+
+    def dot(
+        self, queries: np.ndarray, start: int = 0, stop: int | None = None
+    ) -> np.ndarray:
+        """Dot products of ``queries`` (n, dim) with rows ``start:stop``.
+
+        Returns an (n, stop - start) float32 matrix. float32 rows are
+        multiplied in place on the memory map; float16 rows are widened
+        one slice at a time and int8 rows have the scale folded into the
+        queries, so no decoded copy of the matrix is made.
+        """
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self._dim)
+        codes, scale = self._view()
+        codes = codes[start:stop]
+        if self._precision == "int8":
+            queries = queries * scale
+        return (codes.astype(np.float32, copy=False) @ queries.T).T
+
+    def erase(self, rows: np.ndarray) -> None:
+        """Overwrite rows with zeros in place, e.g. for deleted chunks.
+
+        Row numbers (labels) of every other row are unchanged.
+        """
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        rows = rows[rows < self._count]
+        if not len(rows):
+            return
+        if self._path is None:
+            self._memory[rows] = 0
+            return
+        codes = np.memmap(
+            self._path, dtype=self._dtype, mode="r+", shape=(self._count, self._dim)
+        )
+        codes[rows] = 0
+        codes.flush()
+        del codes
+
+    def flush(self) -> None:
+        """Force appended rows to stable storage."""
+        if self._path is not None:
+            with open(self._path, "rb+") as f:
+                os.fsync(f.fileno())
+
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        if self._precision != "int8":
+            return vectors.astype(self._dtype)
+
+        if self._scale is None:
+            self._set_scale(np.full(self._dim, _SCALE_BOUND / 127.0))
+        needed = np.abs(vectors).max(axis=0, initial=0.0) / 127.0
+        if np.any(needed > self._scale):
+            self._requantize(np.maximum(self._scale, needed * _SCALE_HEADROOM))
+
+        return np.clip(np.rint(vectors / self._scale), -127, 127).astype(np.int8)
+
+    def _set_scale(self, scale: np.ndarray) -> None:
+        scale = scale.astype(np.float32)
+        if self._path is not None:
+            tmp_path = self._scale_path.with_name(self._scale_path.name + ".tmp")
+            _write_synced(tmp_path, scale.tobytes())
+            os.replace(tmp_path, self._scale_path)
+        self._scale = scale
+
+    def _requantize(self, new_scale: np.ndarray) -> None:
+        """Re-encode existing int8 rows under a wider per-dimension scale.
+
+        On disk the rows are re-encoded into ``<path>.requantize`` and
+        the new scale into ``<path>.scale.pending``; both are then moved
+        into place (see ``_recover_requantize`` for crash recovery).
+        Searches keep reading the old file and scale until the swap.
+        """
+        new_scale = new_scale.astype(np.float32)
+        if not self._count:
+            self._set_scale(new_scale)
+            return
+        ratio = self._scale / new_scale
+        if self._path is None:
+            memory = np.rint(self._memory * ratio).astype(np.int8)
+            with self._swap_lock:
+                self._memory, self._scale = memory, new_scale
+            return
+
+        codes = self.matrix()
+        with open(self._requantize_path, "wb") as f:
+            for i in range(0, self._count, _REQUANTIZE_BLOCK):
+                block = codes[i : i + _REQUANTIZE_BLOCK]
+                f.write(np.rint(block * ratio).astype(np.int8).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        _write_synced(self._pending_scale_path, new_scale.tobytes())
+        with self._swap_lock:
+            os.replace(self._requantize_path, self._path)
+            os.replace(self._pending_scale_path, self._scale_path)
+            self._mmap = None
+            self._scale = new_scale
+
+
+def _write_synced(path: Path, data: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
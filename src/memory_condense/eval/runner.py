@@ -7,6 +7,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 
 from memory_condense.condenser import MemoryCondenser
+from memory_condense.embedding import EmbeddingService
 from memory_condense.eval.judge import judge_response
 from memory_condense.eval.responder import generate_response
 from memory_condense.eval.schemas import (
@@ -22,9 +23,13 @@ def replay_conversation(
     turns: list[tuple[str, str]],
     config: EvalConfig,
     data_dir: Path,
+    embedder: EmbeddingService | None = None,
 ) -> ConversationResult:
     """Replay a single conversation and score each assistant turn.
 
+    Pass ``embedder`` to reuse one embedding service across replays
+    instead of building a new one per conversation.
+
     Walks through turns in order. On each user turn:
     1. Retrieve relevant chunks from memory
     2. Build context (retrieved + recent turns)
@@ -38,6 +43,7 @@ def replay_conversation(
         data_dir=data_dir,
         chunker_min_tokens=config.chunker.min_tokens,
         chunker_max_tokens=config.chunker.max_tokens,
+        embedder=embedder,
     ) as mc:
         # Process turns in pairs: (user, assistant)
         i = 0
@@ -131,8 +137,13 @@ def run_eval(
     config: EvalConfig,
     conversations: dict[str, list[tuple[str, str]]],
 ) -> EvalRunResult:
-    """Run evaluation across multiple conversations with one config."""
+    """Run evaluation across multiple conversations with one config.
+
+    Every conversation replays into a fresh store but shares one
+    embedding service, so the model is loaded once per run.
+    """
     results: list[ConversationResult] = []
+    embedder = EmbeddingService()
 
     with tempfile.TemporaryDirectory() as tmpdir:
         for i, (filename, turns) in enumerate(sorted(conversations.items())):
@@ -141,7 +152,9 @@ def run_eval(
 
             print(f"  [{i + 1}] {filename} ({len(turns)} turns)...")
             convo_dir = Path(tmpdir) / f"convo_{i}"
-            result = replay_conversation(filename, turns, config, convo_dir)
+            result = replay_conversation(
+                filename, turns, config, convo_dir, embedder=embedder
+            )
             results.append(result)
             print(f"       Mean score: {result.mean_score:.2f}")
 
@@ -0,0 +1,349 @@
+"""Streaming, staged ingest of a directory of conversation exports.
+
+Usage:
+    pixi run python -m memory_condense.ingest <dir> [--data-dir ./data]
+    pixi run python -m memory_condense.ingest <dir> --chunk-workers 4 --bulk
+    pixi run python -m memory_condense.ingest <dir> --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable
+from itertools import islice
+from pathlib import Path
+
+from memory_condense.chunker import ParallelChunker
+from memory_condense.condenser import MemoryCondenser
+from memory_condense.json_export import JSON_SUFFIXES
+from memory_condense.loader import iter_conversation
+from memory_condense.schemas import Chunk, IngestReport, StageStats, Turn
+
+# Sentinel passed down a queue once every worker of the stage above is done.
+_DONE = object()
+
+
+class _Stage:
+    """A pool of worker threads applying ``fn`` to items from ``inbox``.
+
+    ``fn`` returns an iterable of items for ``outbox`` (possibly empty).
+    When the ``_DONE`` sentinel arrives, each worker re-queues it for its
+    siblings and the last one to exit forwards it downstream.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[object], Iterable[object]],
+        workers: int,
+        inbox: queue.Queue,
+        outbox: queue.Queue | None,
+        abort: threading.Event,
+        count: Callable[[object], int] = lambda item: 1,
+    ) -> None:
+        self.name = name
+        self._fn = fn
+        self._inbox = inbox
+        self._outbox = outbox
+        self._abort = abort
+        self._count = count
+        self._lock = threading.Lock()
+        self._running = workers
+        self.error: BaseException | None = None
+
+        self.batches = 0
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.depth_samples: list[int] = []
+        self._threads = [
+            threading.Thread(target=self._work, name=f"ingest-{name}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+
+    @property
+    def workers(self) -> int:
+        return len(self._threads)
+
+    def start(self) -> None:
+        for thread in self._threads:
+            thread.start()
+
+    def join(self) -> None:
+        for thread in self._threads:
+            thread.join()
+
+    def sample_depth(self) -> None:
+        self.depth_samples.append(self._inbox.qsize())
+
+    def _work(self) -> None:
+        try:
+            while not self._abort.is_set():
+                item = _get(self._inbox, self._abort)
+                if item is _DONE:
+                    _put(self._inbox, _DONE, self._abort)
+                    break
+                # Outputs are forwarded as they are produced, so a large
+                # file streams downstream; time blocked on a full outbox
+                # is not counted as busy.
+                outputs = iter(self._fn(item))
+                elapsed = 0.0
+                while True:
+                    start = time.perf_counter()
+                    out = next(outputs, _DONE)
+                    elapsed += time.perf_counter() - start
+                    if out is _DONE:
+                        break
+                    _put(self._outbox, out, self._abort)
+                with self._lock:
+                    self.batches += 1
+                    self.items += self._count(item)
+                    self.busy_seconds += elapsed
+        except BaseException as exc:
+            self.error = exc
+            self._abort.set()
+        finally:
+            with self._lock:
+                self._running -= 1
+                last = self._running == 0
+            if last and self._outbox is not None and not self._abort.is_set():
+                _put(self._outbox, _DONE, self._abort)
+
+    def stats(self, queue_size: int) -> StageStats:
+        depths = self.depth_samples or [0]
+        return StageStats(
+            name=self.name,
+            workers=self.workers,
+            batches=self.batches,
+            items=self.items,
+            busy_seconds=self.busy_seconds,
+            items_per_second=self.items / self.busy_seconds * self.workers
+            if self.busy_seconds
+            else 0.0,
+            mean_queue_depth=sum(depths) / len(depths),
+            max_queue_depth=max(depths),
+            queue_size=queue_size,
+        )
+
+
+def _get(q: queue.Queue, abort: threading.Event) -> object:
+    while True:
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            if abort.is_set():
+                return _DONE
+
+
+def _put(q: queue.Queue, item: object, abort: threading.Event) -> None:
+    while not abort.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            pass
+
+
+class IngestPipeline:
+    """parse -> chunk -> embed -> index, connected by bounded queues.
+
+    * parse — ``parse_workers`` threads read files and emit batches of
+      up to ``batch_turns`` Turns.
+    * chunk — ``chunk_workers`` threads. With more than one worker each
+      thread hands its batch to a shared process pool (see
+      ``ParallelChunker``), since pySBD is pure Python and holds the GIL.
+    * embed — ``embed_workers`` threads calling the condenser's
+      ``EmbeddingService`` (so the embedding cache applies).
+    * index — a single thread writing each batch's turns and chunks in
+      one transaction with ``MemoryCondenser.ingest_embedded``.
+
+    Every queue holds at most ``queue_size`` batches, so a slow stage
+    applies backpressure upstream instead of buffering the whole
+    directory. The returned ``IngestReport`` has per-stage throughput and
+    sampled queue depths; the bottleneck is the stage whose input queue
+    stays full while its own queue downstream stays empty.
+
+    Batches may be indexed out of file order when a stage has more than
+    one worker; turns within a batch keep their order.
+    """
+
+    def __init__(
+        self,
+        condenser: MemoryCondenser,
+        parse_workers: int = 1,
+        chunk_workers: int = 1,
+        embed_workers: int = 1,
+        batch_turns: int = 256,
+        queue_size: int = 8,
+        sample_interval: float = 0.05,
+    ) -> None:
+        self._mc = condenser
+        self.parse_workers = parse_workers
+        self.chunk_workers = chunk_workers
+        self.embed_workers = embed_workers
+        self.batch_turns = batch_turns
+        self.queue_size = queue_size
+        self.sample_interval = sample_interval
+
+    def run(self, paths: Iterable[str | Path]) -> IngestReport:
+        """Ingest every file in ``paths`` and return the stage report."""
+        paths = [Path(p) for p in paths]
+        abort = threading.Event()
+        chunker = ParallelChunker(
+            min_tokens=self._mc.chunker.min_tokens,
+            max_tokens=self._mc.chunker.max_tokens,
+            workers=self.chunk_workers,
+            batch_size=self.batch_turns,
+        )
+
+        files_q: queue.Queue = queue.Queue()
+        parsed_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        chunked_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        embedded_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        for path in paths:
+            files_q.put(path)
+        files_q.put(_DONE)
+
+        def parse(path: Path) -> Iterable[list[Turn]]:
+            turns = (Turn(role=role, text=text) for role, text in iter_conversation(path))
+            while batch := list(islice(turns, self.batch_turns)):
+                yield batch
+
+        def chunk(turns: list[Turn]) -> Iterable[tuple[list[Turn], list[Chunk]]]:
+            per_turn = chunker.submit([(t.turn_id, t.text) for t in turns]).result()
+            yield turns, [c for chunks in per_turn for c in chunks]
+
+        def embed(batch: tuple[list[Turn], list[Chunk]]):
+            turns, chunks = batch
+            yield turns, self._mc.embedder.embed_chunks(chunks)
+
+        totals = {"turns": 0, "chunks": 0}
+
+        def index(batch: tuple[list[Turn], list[Chunk]]):
+            turns, chunks = batch
+            if not turns:
+                return ()
+            self._mc.ingest_embedded(turns, chunks)
+            totals["turns"] += len(turns)
+            totals["chunks"] += len(chunks)
+            return ()
+
+        def n_chunks(batch) -> int:
+            return len(batch[1])
+
+        stages = [
+            _Stage("parse", parse, self.parse_workers, files_q, parsed_q, abort),
+            _Stage("chunk", chunk, self.chunk_workers, parsed_q, chunked_q, abort, len),
+            _Stage("embed", embed, self.embed_workers, chunked_q, embedded_q, abort, n_chunks),
+            _Stage("index", index, 1, embedded_q, None, abort, n_chunks),
+        ]
+
+        start = time.perf_counter()
+        try:
+            for stage in stages:
+                stage.start()
+            while any(t.is_alive() for s in stages for t in s._threads):
+                for stage in stages:
+                    stage.sample_depth()
+                time.sleep(self.sample_interval)
+            for stage in stages:
+                stage.join()
+        finally:
+            abort.set()
+            chunker.close()
+
+        for stage in stages:
+            if stage.error is not None:
+                raise stage.error
+
+        return IngestReport(
+            files=len(paths),
+            turns=totals["turns"],
+            chunks=totals["chunks"],
+            seconds=time.perf_counter() - start,
+            stages=[
+                s.stats(self.queue_size if s.name != "parse" else len(paths))
+                for s in stages
+            ],
+        )
+
+
+def ingest_directory(
+    condenser: MemoryCondenser,
+    directory: str | Path,
+    extensions: tuple[str, ...] = (".txt", ".md"),
+    **pipeline_kwargs,
+) -> IngestReport:
+    """Run an ``IngestPipeline`` over every matching file in ``directory``."""
+    paths = sorted(
+        p for p in Path(directory).iterdir() if p.is_file() and p.suffix in extensions
+    )
+    return IngestPipeline(condenser, **pipeline_kwargs).run(paths)
+
+
+def print_report(report: IngestReport) -> None:
+    """Print per-stage throughput and queue depths."""
+    print(
+        f"{report.files} files, {report.turns} turns, {report.chunks} chunks "
+        f"in {report.seconds:.2f}s ({report.turns / max(report.seconds, 1e-9):.1f} turns/s)"
+    )
+    print(
+        f"{'stage':<7} {'workers':>7} {'batches':>8} {'items':>8} {'busy s':>8} "
+        f"{'items/s':>9} {'queue mean':>11} {'queue max':>10}"
+    )
+    for s in report.stages:
+        print(
+            f"{s.name:<7} {s.workers:>7} {s.batches:>8} {s.items:>8} "
+            f"{s.busy_seconds:>8.2f} {s.items_per_second:>9.1f} "
+            f"{s.mean_queue_depth:>11.1f} {s.max_queue_depth:>6}/{s.queue_size:<3}"
+        )
+    print(f"bottleneck: {report.bottleneck}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Ingest a directory of conversation exports through a staged pipeline"
+    )
+    parser.add_argument("directory", help="Directory of .txt/.md conversation files")
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Also stream .json/.zip chat exports (ChatGPT or Claude conversations.json)",
+    )
+    parser.add_argument("--data-dir", default="./data", help="MemoryCondenser data dir")
+    parser.add_argument("--model", default="BAAI/bge-m3")
+    parser.add_argument("--device", default=None)
+    parser.add_argument("--parse-workers", type=int, default=1)
+    parser.add_argument("--chunk-workers", type=int, default=1)
+    parser.add_argument("--embed-workers", type=int, default=1)
+    parser.add_argument("--batch-turns", type=int, default=256)
+    parser.add_argument("--queue-size", type=int, default=8)
+    parser.add_argument(
+        "--bulk", action="store_true", help="Wrap the import in MemoryCondenser.bulk_load()"
+    )
+    args = parser.parse_args()
+
+    with MemoryCondenser(
+        data_dir=args.data_dir, model_name=args.model, device=args.device
+    ) as mc:
+        kwargs = dict(
+            parse_workers=args.parse_workers,
+            chunk_workers=args.chunk_workers,
+            embed_workers=args.embed_workers,
+            batch_turns=args.batch_turns,
+            queue_size=args.queue_size,
+        )
+        if args.json:
+            kwargs["extensions"] = (".txt", ".md", *JSON_SUFFIXES)
+        if args.bulk:
+            with mc.bulk_load():
+                report = ingest_directory(mc, args.directory, **kwargs)
+        else:
+            report = ingest_directory(mc, args.directory, **kwargs)
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
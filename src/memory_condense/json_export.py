@@ -0,0 +1,211 @@
+"""Stream conversations out of JSON chat exports without loading them whole.
+
+Two layouts are recognized, per conversation:
+
+* ChatGPT ``conversations.json`` — ``mapping`` is a tree of message
+  nodes; the active branch is followed from ``current_node`` back to
+  the root.
+* Claude ``conversations.json`` — ``chat_messages`` is a flat list with
+  ``sender`` set to ``human`` or ``assistant``.
+
+Either file may be passed directly or inside the export's ``.zip``.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import zipfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, TextIO
+
+JSON_SUFFIXES = (".json", ".zip")
+
+_ROLE_MAP = {
+    "user": "user",
+    "human": "user",
+    "assistant": "assistant",
+}
+
+# ChatGPT content types that carry conversational text in ``parts``.
+_TEXT_CONTENT_TYPES = {"text", "multimodal_text"}
+
+_WHITESPACE = " \t\r\n"
+
+# Characters that can extend a JSON number.
+_NUMBER_CHARS = frozenset("0123456789+-.eE")
+
+
+def iter_json_array(f: TextIO, chunk_size: int = 1 << 20) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array one at a time.
+
+    Reads ``f`` in ``chunk_size`` pieces and decodes each element as soon
+    as it is complete, so memory is bounded by the largest element (one
+    conversation) rather than the file. Raises ValueError if the stream
+    is not a JSON array.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill(min_size: int) -> None:
+        nonlocal buf, pos, eof
+        buf = buf[pos:]
+        pos = 0
+        while not eof and len(buf) < min_size:
+            data = f.read(max(chunk_size, min_size - len(buf)))
+            if not data:
+                eof = True
+            buf += data
+
+    def skip_whitespace() -> str:
+        """Advance past whitespace; return the next char ("" at EOF)."""
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if eof:
+                return ""
+            fill(1)
+
+    fill(1)
+    if skip_whitespace() != "[":
+        raise ValueError("JSON export must be a top-level array")
+    pos += 1
+    if skip_whitespace() == "]":
+        return
+
+    while True:
+        want = chunk_size
+        while True:
+            try:
+                element, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as exc:
+                if eof:
+                    raise ValueError(f"Malformed JSON export: {exc}") from None
+                end = None
+            # A number cut at the buffer edge decodes as a shorter one
+            # ("1" from "1.5", "2" from "2e3"), so a value only counts
+            # once a character that cannot continue it is buffered.
+            if end is not None and (
+                eof or (end < len(buf) and buf[end] not in _NUMBER_CHARS)
+            ):
+                break
+            want = max(want * 2, len(buf) - pos + chunk_size)
+            fill(want)
+        yield element
+        pos = end
+        sep = skip_whitespace()
+        if sep == "]":
+            return
+        if sep != ",":
+            raise ValueError(f"Malformed JSON export: expected ',' or ']', got {sep!r}")
+        pos += 1
+        skip_whitespace()
+
+
+def conversation_turns(conversation: dict) -> list[tuple[str, str]]:
+    """Map one exported conversation to (role, text) tuples.
+
+    Only user and assistant messages with non-blank text are kept, the
+    same turns ``load_conversation`` yields for .txt/.md exports.
+    """
+    if "mapping" in conversation:
+        messages = _chatgpt_messages(conversation)
+    elif "chat_messages" in conversation:
+        messages = _claude_messages(conversation)
+    else:
+        return []
+
+    turns: list[tuple[str, str]] = []
+    for raw_role, text in messages:
+        role = _ROLE_MAP.get(raw_role)
+        text = text.strip()
+        if role is not None and text:
+            turns.append((role, text))
+    return turns
+
+
+def _chatgpt_messages(conversation: dict) -> Iterator[tuple[str, str]]:
+    mapping: dict[str, dict] = conversation.get("mapping") or {}
+    node_id = conversation.get("current_node")
+    if node_id not in mapping:
+        # No active branch recorded: fall back to the last node that has
+        # no children.
+        leaves = [nid for nid, node in mapping.items() if not node.get("children")]
+        node_id = leaves[-1] if leaves else None
+
+    branch: list[dict] = []
+    seen: set[str] = set()
+    while node_id is not None and node_id in mapping and node_id not in seen:
+        seen.add(node_id)
+        node = mapping[node_id]
+        branch.append(node)
+        node_id = node.get("parent")
+
+    for node in reversed(branch):
+        message = node.get("message") or {}
+        content = message.get("content") or {}
+        if content.get("content_type", "text") not in _TEXT_CONTENT_TYPES:
+            continue
+        parts = [p for p in content.get("parts") or [] if isinstance(p, str)]
+        role = (message.get("author") or {}).get("role", "")
+        yield role, "\n".join(parts)
+
+
+def _claude_messages(conversation: dict) -> Iterator[tuple[str, str]]:
+    for message in conversation.get("chat_messages") or []:
+        text = message.get("text") or ""
+        if not text:
+            text = "\n".join(
+                block.get("text", "")
+                for block in message.get("content") or []
+                if block.get("type") == "text"
+            )
+        yield message.get("sender", ""), text
+
+
+@contextmanager
+def _open_export(path: Path) -> Iterator[TextIO]:
+    if path.suffix != ".zip":
+        with path.open(encoding="utf-8", errors="replace") as f:
+            yield f
+        return
+    with zipfile.ZipFile(path) as archive:
+        members = [
+            name for name in archive.namelist() if Path(name).name == "conversations.json"
+        ]
+        if not members:
+            raise ValueError(f"{path} has no conversations.json")
+        with archive.open(members[0]) as raw:
+            yield io.TextIOWrapper(raw, encoding="utf-8", errors="replace")
+
+
+def iter_json_conversations(
+    path: str | Path,
+) -> Iterator[tuple[str, list[tuple[str, str]]]]:
+    """Lazily yield (name, turns) for each conversation in a JSON export.
+
+    ``name`` is the conversation's title, or its position in the export
+    if untitled. Conversations with no turns are skipped.
+    """
+    path = Path(path)
+    with _open_export(path) as f:
+        for i, conversation in enumerate(iter_json_array(f)):
+            if not isinstance(conversation, dict):
+                continue
+            turns = conversation_turns(conversation)
+            if turns:
+                name = conversation.get("title") or conversation.get("name") or str(i)
+                yield name, turns
+
+
+def iter_json_turns(path: str | Path) -> Iterator[tuple[str, str]]:
+    """All turns of a JSON export in order, for ingest."""
+    for _, turns in iter_json_conversations(path):
+        yield from turns
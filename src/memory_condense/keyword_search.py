@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import re
+
+from memory_condense.schemas import RetrievalResult
+
+# Tokens that read as identifiers rather than prose: anything mixing
+# letters and digits (ZX-4471, v2, sha256), numbers of three or more
+# digits (#4471), snake_case, dotted or namespaced names (os.path,
+# std::vector), camelCase and ALL-CAPS codes.
+_IDENTIFIER = re.compile(
+    r"""
+    ^(?=.*[A-Za-z])(?=.*\d)
+    | ^\#?\d{3,}$
+    | [A-Za-z0-9]_[A-Za-z0-9]
+    | [A-Za-z0-9](?:\.|::|/)[A-Za-z_]
+    | ^[a-z]+[A-Z]
+    | ^[A-Z]{2,}\d*$
+    """,
+    re.VERBOSE,
+)
+
+# Longest query still considered a lookup rather than a question.
+_MAX_LEXICAL_TERMS = 4
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 MATCH expression.
+
+    Each whitespace-separated term becomes a quoted phrase (so FTS5
+    syntax characters in the query are literal, and ``ZX-4471`` matches
+    the adjacent tokens ``zx 4471``), and terms are OR-ed so BM25 ranks
+    partial matches too. Returns "" for a query with no terms.
+    """
+    terms = [t.strip("\"'`.,;:!?()[]{}") for t in text.split()]
+    return " OR ".join('"' + t.replace('"', '""') + '"' for t in terms if t)
+
+
+def is_lexical_query(text: str) -> bool:
+    """Whether ``text`` looks like a keyword lookup BM25 can answer alone.
+
+    True for short queries (at most four terms) that quote a phrase or
+    contain an identifier-like term.
+    """
+    terms = text.split()
+    if not terms or len(terms) > _MAX_LEXICAL_TERMS:
+        return False
+    if text.count('"') >= 2 or text.count("`") >= 2:
+        return True
+    return any(_IDENTIFIER.search(t.strip("\"'`.,;:!?()[]{}")) for t in terms)
+
+
+def reciprocal_rank_fusion(
+    result_lists: list[list[RetrievalResult]], k: int, c: int = 60
+) -> list[RetrievalResult]:
+    """Merge ranked lists by reciprocal rank fusion.
+
+    A chunk's fused score is the sum of ``1 / (c + rank)`` over the lists
+    it appears in (rank starting at 1), which needs no calibration
+    between BM25 and cosine scores. Returns the top ``k``, each carrying
+    its fused score.
+    """
+    fused: dict[str, float] = {}
+    first_seen: dict[str, RetrievalResult] = {}
+    for results in result_lists:
+        for rank, result in enumerate(results, start=1):
+            chunk_id = result.chunk.chunk_id
+            fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (c + rank)
+            first_seen.setdefault(chunk_id, result)
+
+    ranked = sorted(fused, key=fused.__getitem__, reverse=True)[:k]
+    return [
+        first_seen[chunk_id].model_copy(update={"score": fused[chunk_id]})
+        for chunk_id in ranked
+    ]
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import json
+import threading
+from array import array
+from collections.abc import Iterable
+
+import numpy as np
+
+# Packed lexical weights: n uint32 token ids, then n float16 weights.
+_ID_DTYPE = np.dtype("<u4")
+_WEIGHT_DTYPE = np.dtype("<f2")
+_BYTES_PER_TERM = _ID_DTYPE.itemsize + _WEIGHT_DTYPE.itemsize
+
+
+def encode_weights(weights: dict[str, float]) -> bytes:
+    """Pack {token_id: weight} into 6 bytes per term for ``chunks.lexical_weights``."""
+    ids = np.fromiter((int(t) for t in weights), dtype=_ID_DTYPE, count=len(weights))
+    values = np.fromiter(weights.values(), dtype=np.float32, count=len(weights))
+    order = np.argsort(ids)
+    return ids[order].tobytes() + values[order].astype(_WEIGHT_DTYPE).tobytes()
+
+
+def _unpack(blob: bytes | str) -> tuple[np.ndarray, np.ndarray]:
+    """Token ids and float32 weights of a stored row.
+
+    Rows written before weights were packed hold JSON text.
+    """
+    if isinstance(blob, str):
+        weights = json.loads(blob)
+        ids = np.fromiter((int(t) for t in weights), dtype=np.int64, count=len(weights))
+        return ids, np.fromiter(weights.values(), dtype=np.float32, count=len(weights))
+    n = len(blob) // _BYTES_PER_TERM
+    ids = np.frombuffer(blob, dtype=_ID_DTYPE, count=n).astype(np.int64)
+    values = np.frombuffer(blob, dtype=_WEIGHT_DTYPE, count=n, offset=n * 4)
+    return ids, values.astype(np.float32)
+
+
+def decode_weights(blob: bytes | str) -> dict[str, float]:
+    """Inverse of ``encode_weights`` (weights come back at float16 precision)."""
+    ids, values = _unpack(blob)
+    return {str(t): w for t, w in zip(ids.tolist(), values.tolist())}
+
+
+class LexicalIndex:
+    """In-memory inverted index over bge-m3 lexical (sparse) weights.
+
+    Each token id maps to a postings list of (label, weight) pairs kept
+    in typed arrays, 8 bytes per posting. A document's score for a query
+    is bge-m3's lexical matching score: the sum over shared tokens of
+    query weight times document weight. Labels are the retriever's
+    ``hnsw_label``s, so sparse and dense hits can be fused directly.
+
+    Postings may be appended from one thread while others search.
+    """
+
+    def __init__(self) -> None:
+        self._postings: dict[int, tuple[array, array]] = {}
+        self._lock = threading.Lock()
+        self._docs = 0
+        self._terms = 0
+
+    def add(
+        self,
+        labels: Iterable[int],
+        weights: Iterable[dict[str, float] | bytes | str | None],
+    ) -> None:
+        """Index the weights of each label; ``None`` entries are skipped.
+
+        Weights may be dicts or the packed form stored in SQLite.
+        """
+        with self._lock:
+            for label, doc in zip(labels, weights):
+                if not doc:
+                    continue
+                if isinstance(doc, dict):
+                    ids = [int(t) for t in doc]
+                    values = list(doc.values())
+                else:
+                    ids_arr, values_arr = _unpack(doc)
+                    ids, values = ids_arr.tolist(), values_arr.tolist()
+                for token, weight in zip(ids, values):
+                    entry = self._postings.get(token)
+                    if entry is None:
+                        entry = self._postings[token] = (array("i"), array("f"))
+                    entry[0].append(label)
+                    entry[1].append(weight)
+                self._docs += 1
+                self._terms += len(ids)
+
+    def remove(
+        self,
+        labels: Iterable[int],
+        weights: Iterable[dict[str, float] | bytes | str | None],
+    ) -> None:
+        """Drop the postings of each label, given the weights it was added with.
+
+        Only the postings lists of those documents' tokens are rewritten.
+        """
+        drop: dict[int, set[int]] = {}
+        docs = 0
+        for label, doc in zip(labels, weights):
+            if not doc:
+                continue
+            if isinstance(doc, dict):
+                ids = [int(t) for t in doc]
+            else:
+                ids = _unpack(doc)[0].tolist()
+            for token in ids:
+                drop.setdefault(token, set()).add(label)
+            docs += 1
+        if not drop:
+            return
+        with self._lock:
+            for token, dropped in drop.items():
+                entry = self._postings.get(token)
+                if entry is None:
+                    continue
+                posting_labels = np.frombuffer(entry[0], dtype=np.int32)
+                keep = ~np.isin(posting_labels, list(dropped))
+                self._terms -= len(keep) - int(keep.sum())
+                if not keep.any():
+                    del self._postings[token]
+                    continue
+                posting_weights = np.frombuffer(entry[1], dtype=np.float32)
+                self._postings[token] = (
+                    array("i", posting_labels[keep].tobytes()),
+                    array("f", posting_weights[keep].tobytes()),
+                )
+            self._docs -= docs
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._docs = 0
+            self._terms = 0
+
+    def __len__(self) -> int:
+        """Number of documents indexed."""
+        return self._docs
+
+    @property
+    def postings(self) -> int:
+        """Total number of (token, document) postings."""
+        return self._terms
+
+    def scores(self, query_weights: dict[str, float]) -> tuple[np.ndarray, np.ndarray]:
+        """Score every document sharing a token with the query.
+
+        Returns (labels, scores), labels ascending. Cost is proportional
+        to the postings of the query's tokens, not to the index size.
+        """
+        label_parts: list[np.ndarray] = []
+        score_parts: list[np.ndarray] = []
+        with self._lock:
+            for token, q_weight in query_weights.items():
+                entry = self._postings.get(int(token))
+                if entry is None:
+                    continue
+                label_parts.append(np.array(entry[0], dtype=np.int64))
+                score_parts.append(np.array(entry[1], dtype=np.float32) * q_weight)
+        if not label_parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        labels, inverse = np.unique(np.concatenate(label_parts), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+        return labels, scores.astype(np.float32)
+
+    def search(
+        self, query_weights: dict[str, float], k: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Top-``k`` (labels, scores) by lexical score, best first."""
+        labels, scores = self.scores(query_weights)
+        if len(labels) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            labels, scores = labels[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return labels[order], scores[order]
@@ -1,30 +1,62 @@
-"""Parse LLM conversation exports from .txt and .md files into Turn objects."""
+"""Parse LLM conversation exports from .txt and .md files into Turn objects.
+
+JSON exports (``.json`` or the export ``.zip``) are streamed by
+``memory_condense.json_export``.
+"""
 
 from __future__ import annotations
 
-import re
+import io
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 
-from memory_condense.schemas import Turn
+from memory_condense.json_export import JSON_SUFFIXES, iter_json_turns
 
+# Header lines, after stripping trailing whitespace, mapped to roles.
 # .txt format: "User:\n<text>" / "Claude:\n <text>"
-_TXT_TURN_RE = re.compile(
-    r"^(User|Claude):\s*\n(.*?)(?=^(?:User|Claude):\s*\n|\Z)",
-    re.MULTILINE | re.DOTALL,
-)
+_TXT_HEADERS = {"User:": "user", "Claude:": "assistant"}
 
 # .md format: "**User:**\n<text>" / "**Assistant:**\n<text>"
 # Note: colon is inside the bold markers: **User:** not **User**:
-_MD_TURN_RE = re.compile(
-    r"^\*\*(User|Assistant):\*\*\s*\n(.*?)(?=^\*\*(?:User|Assistant):\*\*\s*\n|\Z)",
-    re.MULTILINE | re.DOTALL,
-)
+_MD_HEADERS = {"**User:**": "user", "**Assistant:**": "assistant"}
+
+
+def iter_turns(
+    lines: Iterable[str], headers: dict[str, str]
+) -> Iterator[tuple[str, str]]:
+    """Scan newline-terminated lines for turn headers in a single pass.
 
-_ROLE_MAP = {
-    "User": "user",
-    "Claude": "assistant",
-    "Assistant": "assistant",
-}
+    A header is a whole line (trailing whitespace allowed) found in
+    ``headers``; everything up to the next header is the turn body.
+    Text before the first header is ignored, as are turns whose body is
+    blank. Yields (role, text) tuples as each turn ends, so memory is
+    bounded by the longest turn rather than the whole export.
+    """
+    role: str | None = None
+    body: list[str] = []
+    starts = frozenset(header[:1] for header in headers)
+    for line in lines:
+        # The first-character check skips the rstrip for almost every
+        # body line; a header line must also end in a newline.
+        if line[:1] in starts and line.endswith("\n"):
+            header = headers.get(line.rstrip())
+            if header is not None:
+                if role is not None:
+                    text = "".join(body).strip()
+                    if text:
+                        yield role, text
+                role, body = header, []
+                continue
+        if role is not None:
+            body.append(line)
+    if role is not None:
+        text = "".join(body).strip()
+        if text:
+            yield role, text
+
+
+def _headers_for(path: Path) -> dict[str, str]:
+    return _MD_HEADERS if path.suffix == ".md" else _TXT_HEADERS
 
 
 def parse_txt(text: str) -> list[tuple[str, str]]:
@@ -32,14 +64,7 @@ def parse_txt(text: str) -> list[tuple[str, str]]:
 
     Returns a list of (role, text) tuples.
     """
-    turns: list[tuple[str, str]] = []
-    for match in _TXT_TURN_RE.finditer(text):
-        raw_role = match.group(1)
-        body = match.group(2).strip()
-        if body:
-            role = _ROLE_MAP.get(raw_role, raw_role.lower())
-            turns.append((role, body))
-    return turns
+    return list(iter_turns(io.StringIO(text), _TXT_HEADERS))
 
 
 def parse_md(text: str) -> list[tuple[str, str]]:
@@ -47,29 +72,48 @@ def parse_md(text: str) -> list[tuple[str, str]]:
 
     Returns a list of (role, text) tuples.
     """
-    turns: list[tuple[str, str]] = []
-    for match in _MD_TURN_RE.finditer(text):
-        raw_role = match.group(1)
-        body = match.group(2).strip()
-        if body:
-            role = _ROLE_MAP.get(raw_role, raw_role.lower())
-            turns.append((role, body))
-    return turns
+    return list(iter_turns(io.StringIO(text), _MD_HEADERS))
+
+
+def iter_conversation(path: str | Path) -> Iterator[tuple[str, str]]:
+    """Lazily yield (role, text) turns from a .txt, .md or JSON export.
+
+    The file is read line by line through a buffered reader and stays
+    open until the generator is exhausted or closed. JSON exports yield
+    the turns of every conversation they contain, one conversation
+    decoded at a time.
+    """
+    path = Path(path)
+    if path.suffix in JSON_SUFFIXES:
+        yield from iter_json_turns(path)
+        return
+    with path.open(encoding="utf-8", errors="replace") as f:
+        yield from iter_turns(f, _headers_for(path))
 
 
 def load_conversation(path: str | Path) -> list[tuple[str, str]]:
-    """Load a conversation from a .txt or .md file.
+    """Load a conversation from a .txt, .md or JSON export.
 
     Auto-detects format based on file extension.
     Returns a list of (role, text) tuples.
     """
-    path = Path(path)
-    text = path.read_text(encoding="utf-8", errors="replace")
+    return list(iter_conversation(path))
 
-    if path.suffix == ".md":
-        return parse_md(text)
-    else:
-        return parse_txt(text)
+
+def iter_directory(
+    directory: str | Path,
+    extensions: tuple[str, ...] = (".txt", ".md"),
+) -> Iterator[tuple[str, list[tuple[str, str]]]]:
+    """Generator form of ``load_directory``: one (filename, turns) at a time.
+
+    Only a single file's turns are held in memory. Skips files that
+    yield no turns.
+    """
+    for path in sorted(Path(directory).iterdir()):
+        if path.is_file() and path.suffix in extensions:
+            turns = load_conversation(path)
+            if turns:
+                yield path.name, turns
 
 
 def load_directory(
@@ -81,13 +125,4 @@ def load_directory(
     Returns a dict mapping filename -> list of (role, text) tuples.
     Skips files that yield no turns.
     """
-    directory = Path(directory)
-    conversations: dict[str, list[tuple[str, str]]] = {}
-
-    for path in sorted(directory.iterdir()):
-        if path.is_file() and path.suffix in extensions:
-            turns = load_conversation(path)
-            if turns:
-                conversations[path.name] = turns
-
-    return conversations
+    return dict(iter_directory(directory, extensions))
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from memory_condense.schemas import ModelRegistryStats
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+ModelKey = tuple[str, "str | None"]
+
+
+def _load_sentence_transformer(model_name: str, device: str | None) -> SentenceTransformer:
+    from sentence_transformers import SentenceTransformer
+
+    kwargs: dict = {}
+    if device is not None:
+        kwargs["device"] = device
+    return SentenceTransformer(model_name, **kwargs)
+
+
+class _Entry:
+    __slots__ = ("model", "last_used", "lock")
+
+    def __init__(self) -> None:
+        self.model: SentenceTransformer | None = None
+        self.last_used = time.monotonic()
+        # Held while the model loads so concurrent callers wait for one
+        # load instead of starting their own
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    """Shares loaded embedding models across ``EmbeddingService`` instances.
+
+    Models are keyed on (model name, device) and loaded once, on the
+    first ``get``; every later ``get`` for the same key returns the same
+    instance. A model that has not been requested for ``idle_timeout``
+    seconds is dropped by a background reaper thread so its memory can be
+    reclaimed once no caller still holds it. ``idle_timeout=None`` keeps
+    models until ``evict`` or ``clear``.
+
+    Callers should ``get`` the model for each encode rather than keep it,
+    otherwise eviction cannot release it.
+    """
+
+    def __init__(
+        self,
+        idle_timeout: float | None = 600.0,
+        loader: Callable[[str, str | None], SentenceTransformer] = _load_sentence_transformer,
+    ) -> None:
+        self.idle_timeout = idle_timeout
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._entries: dict[ModelKey, _Entry] = {}
+        self._reaper: threading.Thread | None = None
+        self._stop = threading.Event()
+
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def get(self, model_name: str, device: str | None = None) -> SentenceTransformer:
+        """Return the shared model for (model_name, device), loading it once."""
+        key = (model_name, device)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+            entry.last_used = time.monotonic()
+            if self.idle_timeout is not None and self._reaper is None:
+                self._start_reaper()
+
+        with entry.lock:
+            if entry.model is None:
+                entry.model = self._loader(model_name, device)
+                with self._lock:
+                    self.loads += 1
+            else:
+                with self._lock:
+                    self.hits += 1
+            return entry.model
+
+    def evict_idle(self, now: float | None = None) -> list[ModelKey]:
+        """Drop models idle for at least ``idle_timeout``; returns their keys."""
+        if self.idle_timeout is None:
+            return []
+        now = time.monotonic() if now is None else now
+        evicted: list[ModelKey] = []
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if now - entry.last_used < self.idle_timeout:
+                    continue
+                # Skip models that are still loading
+                if not entry.lock.acquire(blocking=False):
+                    continue
+                try:
+                    del self._entries[key]
+                    if entry.model is not None:
+                        evicted.append(key)
+                    entry.model = None
+                finally:
+                    entry.lock.release()
+            self.evictions += len(evicted)
+        return evicted
+
+    def evict(self, model_name: str, device: str | None = None) -> bool:
+        """Drop one model now; returns whether it was loaded."""
+        with self._lock:
+            entry = self._entries.pop((model_name, device), None)
+            if entry is None or entry.model is None:
+                return False
+            self.evictions += 1
+            return True
+
+    def clear(self) -> None:
+        """Drop every loaded model."""
+        with self._lock:
+            self.evictions += sum(e.model is not None for e in self._entries.values())
+            self._entries.clear()
+
+    def loaded(self) -> list[ModelKey]:
+        """Keys of the models currently held."""
+        with self._lock:
+            return [key for key, e in self._entries.items() if e.model is not None]
+
+    def stats(self) -> ModelRegistryStats:
+        with self._lock:
+            return ModelRegistryStats(
+                models=sum(e.model is not None for e in self._entries.values()),
+                loads=self.loads,
+                hits=self.hits,
+                evictions=self.evictions,
+            )
+
+    def close(self) -> None:
+        """Stop the reaper thread and drop every model."""
+        self._stop.set()
+        if self._reaper is not None:
+            self._reaper.join()
+            self._reaper = None
+        self.clear()
+
+    def _start_reaper(self) -> None:
+        self._stop.clear()
+        self._reaper = threading.Thread(
+            target=self._reap, name="model-registry-reaper", daemon=True
+        )
+        self._reaper.start()
+
+    def _reap(self) -> None:
+        while True:
+            timeout = self.idle_timeout
+            # Check a few times per timeout so a model outlives it by at
+            # most about a quarter of it
+            interval = min(max(timeout / 4, 0.01), 60.0) if timeout is not None else 60.0
+            if self._stop.wait(interval):
+                return
+            self.evict_idle()
+
+
+_default_registry: ModelRegistry | None = None
+_default_lock = threading.Lock()
+
+
+def default_registry() -> ModelRegistry:
+    """The process-wide registry ``EmbeddingService`` uses unless given one.
+
+    Its idle timeout can be changed at any time via ``idle_timeout``.
+    """
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = ModelRegistry()
+        return _default_registry
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class QueryBatcher:
+    """Coalesces concurrent single-query encodes into batched model calls.
+
+    Callers ``submit`` one query at a time from any thread and get a
+    future for its vector. A worker thread takes the first waiting query,
+    keeps collecting until ``max_batch_size`` queries are in hand or
+    ``max_wait_ms`` has passed since the first one arrived, encodes them
+    with a single ``encode`` call and fans the rows back out.
+
+    ``max_wait_ms`` bounds the latency added to a query that arrives
+    alone; under load, batches fill before the window closes.
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[list[str]], np.ndarray],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+    ) -> None:
+        self._encode = encode
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue: queue.Queue[tuple[str, Future] | None] = queue.Queue()
+        self._closed = False
+        # Makes the closed check and the enqueue one step, so nothing is
+        # queued behind the stop sentinel
+        self._lock = threading.Lock()
+
+        self.batches = 0
+        self.queries = 0
+
+        self._thread = threading.Thread(
+            target=self._run, name="query-batcher", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, query: str) -> Future:
+        """Queue a query; the future resolves to its 1-D embedding."""
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("QueryBatcher is closed")
+            self._queue.put((query, future))
+        return future
+
+    def embed(self, query: str) -> np.ndarray:
+        """Blocking form of ``submit``."""
+        return self.submit(query).result()
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.queries / self.batches if self.batches else 0.0
+
+    def close(self) -> None:
+        """Encode anything still queued, then stop the worker thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stopping = False
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=max(remaining, 0.0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+            if stopping:
+                return
+
+    def _flush(self, batch: list[tuple[str, Future]]) -> None:
+        live = [(q, f) for q, f in batch if f.set_running_or_notify_cancel()]
+        if not live:
+            return
+        try:
+            vectors = self._encode([q for q, _ in live])
+        except Exception as exc:
+            for _, future in live:
+                future.set_exception(exc)
+            return
+        for (_, future), vector in zip(live, vectors):
+            future.set_result(vector)
+        self.batches += 1
+        self.queries += len(live)
@@ -1,18 +1,97 @@
 from __future__ import annotations
 
 import json
+import os
 import struct
+import threading
+import time
+import warnings
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
-import hnswlib
 import numpy as np
 
 from memory_condense.db import Database
-from memory_condense.schemas import Chunk, RetrievalResult, Turn
+from memory_condense.embedding_store import EmbeddingStore
+from memory_condense.keyword_search import fts_query
+from memory_condense.lexical_index import LexicalIndex, decode_weights, encode_weights
+from memory_condense.schemas import (
+    BulkLoadReport,
+    Chunk,
+    CompactionReport,
+    IndexRepairReport,
+    RetrievalResult,
+    Turn,
+)
+from memory_condense.vector_backend import (
+    BACKENDS,
+    ExactBackend,
+    HnswBackend,
+    IvfPqBackend,
+    VectorBackend,
+)
+
+# Max bound parameters per IN (...) clause, well under SQLite's limit.
+_SQL_BATCH = 500
+
+# Stored vectors searched to measure latency around a compaction.
+_PROBE_QUERIES = 20
 
 
 class SimilarityRetriever:
-    """Dense cosine similarity retrieval using hnswlib."""
+    """Dense cosine similarity retrieval over a pluggable vector backend.
+
+    Embeddings are kept in an append-only memory-mapped matrix
+    (``EmbeddingStore``) whose row number is the chunk's ``hnsw_label``;
+    SQLite only holds chunk metadata. By default the matrix file sits next
+    to the index file with a ``.vectors`` suffix.
+
+    ``precision`` ("float32", "float16" or "int8") sets how that matrix is
+    stored; it is recorded in the ``meta`` table and cannot change for an
+    existing store. ``query(rescore=True)`` over-fetches ``rescore_factor``
+    times k candidates from HNSW and re-ranks them exactly against the
+    stored vectors.
+
+    Persistence is incremental: the embedding store doubles as an
+    append-only delta log, and ``save()`` writes a checkpoint (the index
+    file plus a ``.checkpoint`` high-water label). On startup the last
+    checkpoint is loaded and only labels past it are replayed from the
+    store. With ``checkpoint_interval`` set, checkpoints are also taken
+    periodically on a background thread.
+
+    With ``verify_on_load`` (the default) the loaded index is instead
+    checked against every label in SQLite: missing vectors are replayed
+    and orphaned labels are marked deleted (see ``verify_index``).
+
+    Chunks carrying bge-m3 lexical weights have them packed into
+    ``chunks.lexical_weights`` and indexed in a ``LexicalIndex``;
+    ``query_hybrid`` fuses its candidates with the dense ones.
+    ``query_bm25`` ranks chunks by BM25 over the ``chunks_fts`` keyword
+    index with no embedding at all.
+
+    ``backend`` picks the ``VectorBackend`` doing the search: "hnsw" (an
+    hnswlib graph), "exact" (brute force over the embedding store, which
+    is exact and faster for small stores) or "auto", which starts exact
+    and promotes to HNSW once more than ``exact_threshold`` chunks are
+    stored; an existing index file is always loaded as HNSW. The exact
+    backend keeps nothing on disk beyond the store and is rebuilt from
+    it on load, so ``save`` writes no checkpoint for it. "ivfpq" is an
+    ``IvfPqBackend``, configured by ``backend_options``, for stores too
+    large to hold as a graph plus full vectors in RAM; it checkpoints to
+    its own ``.ivfpq`` file and is trained from the stored embeddings
+    (``train_index``).
+
+    ``delete_chunks`` removes chunks from SQLite and tombstones their
+    labels in the index, so they drop out of results at once; their
+    stored vectors are zeroed. The tombstoned labels still occupy the
+    index until ``compact`` rebuilds it and vacuums SQLite, which starts
+    on a background thread once ``deleted_fraction`` exceeds
+    ``compact_threshold``.
+
+    ``query`` may run on several threads at once, alongside one thread
+    adding chunks; index resizes wait for in-flight searches to finish.
+    """
 
     def __init__(
         self,
@@ -22,62 +101,357 @@ class SimilarityRetriever:
         ef_construction: int = 200,
         M: int = 16,
         max_elements: int = 100_000,
+        vectors_path: str | Path | None = None,
+        precision: str = "float32",
+        rescore_factor: int = 4,
+        checkpoint_interval: float | None = None,
+        verify_on_load: bool = True,
+        backend: str = "hnsw",
+        exact_threshold: int = 20_000,
+        backend_options: dict | None = None,
+        compact_threshold: float | None = 0.2,
     ) -> None:
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
         self._db = db
         self._dim = dim
         self._index_path = Path(index_path) if index_path else None
+        if vectors_path is None and self._index_path is not None:
+            vectors_path = self._index_path.with_suffix(".vectors")
+        self._check_precision(precision, vectors_path)
+        self._store = EmbeddingStore(dim=dim, path=vectors_path, precision=precision)
+        self._rescore_factor = rescore_factor
         self._ef_construction = ef_construction
         self._M = M
         self._max_elements = max_elements
+        self._backend = backend
+        self._exact_threshold = exact_threshold
+        self._backend_options = backend_options or {}
 
         # label <-> chunk_id mapping
         self._label_to_chunk_id: dict[int, str] = {}
         self._chunk_id_to_label: dict[str, int] = {}
         self._next_label = 0
 
-        self._index: hnswlib.Index | None = None
+        # Guards index mutation and checkpointing
+        self._lock = threading.RLock()
+        self._dirty = False
+        # Bumped whenever the set of searchable chunks changes
+        self._generation = 0
+        # First label of a bulk_load() block, whose chunks skip the index
+        self._deferred_from: int | None = None
+        self._deferred_lexical: list[tuple[list[int], list[dict | None]]] = []
+        self._checkpoint_path = (
+            self._index_path.with_suffix(".checkpoint") if self._index_path else None
+        )
+        if backend == "ivfpq" and self._index_path is not None:
+            # Kept apart from any HNSW checkpoint of the same store
+            self._checkpoint_path = self._index_path.with_suffix(".ivfpq.checkpoint")
+            self._index_path = self._index_path.with_suffix(".ivfpq")
+
+        self._verify_on_load = verify_on_load
+        self.repair_report: IndexRepairReport | None = None
+
+        # Labels marked deleted in the index but not yet compacted away
+        self._tombstones = 0
+        self._compact_threshold = compact_threshold
+        self._compaction_lock = threading.Lock()
+        self._compaction_thread: threading.Thread | None = None
+        self.compaction_report: CompactionReport | None = None
+
+        self._index: VectorBackend | None = None
+        self._lexical = LexicalIndex()
+        self._load_label_mapping()
+        self._migrate_blob_embeddings()
+        self._load_lexical_index()
         self._load_or_create_index()
 
+        self._checkpoint_interval = checkpoint_interval
+        self._stop_checkpoints = threading.Event()
+        self._checkpoint_thread: threading.Thread | None = None
+        if checkpoint_interval and self._index_path:
+            self._checkpoint_thread = threading.Thread(
+                target=self._checkpoint_loop, name="hnsw-checkpoint", daemon=True
+            )
+            self._checkpoint_thread.start()
+
+    def _check_precision(
+        self, precision: str, vectors_path: str | Path | None
+    ) -> None:
+        """Record the store precision, or verify it matches the recorded one.
+
+        Stores written before precision was recorded are float32.
+        """
+        row = self._db.execute(
+            "SELECT value FROM meta WHERE key = 'embedding_precision'"
+        ).fetchone()
+        if row is None:
+            existing = vectors_path is not None and Path(vectors_path).exists()
+            recorded = (
+                "float32"
+                if existing and Path(vectors_path).stat().st_size
+                else precision
+            )
+            with self._db.transaction():
+                self._db.execute(
+                    "INSERT INTO meta (key, value) VALUES ('embedding_precision', ?)",
+                    (recorded,),
+                )
+        else:
+            recorded = row[0]
+
+        if recorded != precision:
+            raise ValueError(
+                f"Embedding store was created with precision {recorded!r}, "
+                f"not {precision!r}"
+            )
+
     def _load_or_create_index(self) -> None:
-        """Load index from file if it exists, otherwise create empty."""
-        self._index = hnswlib.Index(space="cosine", dim=self._dim)
+        """Load index from file if it exists, otherwise create empty.
 
-        if self._index_path and self._index_path.exists():
-            self._index.load_index(str(self._index_path))
-            self._load_label_mapping()
+        A saved file is only used if the configured backend would pick a
+        persistent index for the current chunk count; otherwise it is
+        stale (e.g. left from before an ``auto`` compaction shrank the
+        store below ``exact_threshold``) and is deleted.
+        """
+        saved = self._index_path is not None and self._index_path.exists()
+        if saved and self._uses_exact(len(self._label_to_chunk_id)):
+            self._discard_saved_index()
+            saved = False
+        if saved:
+            if self._backend == "ivfpq":
+                self._index = IvfPqBackend.load(
+                    self._index_path, self._store, **self._backend_options
+                )
+            else:
+                self._index = HnswBackend(
+                    self._dim, self._max_elements, path=self._index_path
+                )
+            if self._verify_on_load:
+                self.repair_report = self.verify_index()
+            else:
+                self._replay_tail(self._read_checkpoint())
         else:
-            self._index.init_index(
-                max_elements=self._max_elements,
-                ef_construction=self._ef_construction,
-                M=self._M,
+            self._index = self._new_backend(len(self._label_to_chunk_id))
+            self._replay_tail(0)
+
+        # Labels left in a saved index by deletions are tombstones
+        db_labels = np.fromiter(self._label_to_chunk_id, dtype=np.int64)
+        self._tombstones = len(np.setdiff1d(self._index.labels(), db_labels))
+
+    def _new_backend(self, size: int) -> VectorBackend:
+        """An empty backend of the configured kind for ``size`` chunks."""
+        if self._backend == "ivfpq":
+            return IvfPqBackend(self._store, **self._backend_options)
+        if self._uses_exact(size):
+            return ExactBackend(self._store)
+        return HnswBackend(
+            self._dim,
+            max(size, self._max_elements),
+            ef_construction=self._ef_construction,
+            M=self._M,
+        )
+
+    def _uses_exact(self, size: int) -> bool:
+        return self._backend == "exact" or (
+            self._backend == "auto" and size <= self._exact_threshold
+        )
+
+    def _discard_saved_index(self) -> None:
+        """Delete the saved index file and checkpoint, if any.
+
+        Used when the serving backend keeps nothing on disk, so that an
+        older file (still holding deleted chunks' vectors) is neither
+        kept nor loaded again.
+        """
+        for path in (self._index_path, self._checkpoint_path):
+            if path is not None:
+                path.unlink(missing_ok=True)
+
+    def _maybe_promote(self) -> None:
+        """Swap the exact backend for HNSW once the store outgrows it.
+
+        The graph is built from the embedding store under the index lock;
+        searches keep using the exact backend until the swap.
+        """
+        if (
+            self._backend != "auto"
+            or not self._index.exact
+            or len(self._index) <= self._exact_threshold
+        ):
+            return
+        labels = np.array(sorted(self._label_to_chunk_id), dtype=np.int64)
+        labels = labels[labels < len(self._store)]
+        index = self._new_backend(len(labels))
+        index.add(self._store.vectors(labels), labels)
+        self._index = index
+        self._dirty = True
+        self._generation += 1
+
+    def _read_checkpoint(self) -> int | None:
+        """Return the high-water label of the saved index, if recorded."""
+        if self._checkpoint_path is None or not self._checkpoint_path.exists():
+            return None
+        return json.loads(self._checkpoint_path.read_text())["next_label"]
+
+    def _replay_tail(self, checkpoint: int | None) -> None:
+        """Add vectors logged after ``checkpoint`` to the in-memory index.
+
+        With no recorded checkpoint (an index saved before checkpoints
+        existed), every label missing from the index is replayed.
+        """
+        if checkpoint is None:
+            present = set(self._index.labels().tolist())
+            pending = [l for l in self._label_to_chunk_id if l not in present]
+        else:
+            pending = [l for l in self._label_to_chunk_id if l >= checkpoint]
+
+        lost = sum(l >= len(self._store) for l in pending)
+        if lost:
+            warnings.warn(
+                f"Embedding store is missing vectors for {lost} chunks",
+                RuntimeWarning,
+                stacklevel=3,
             )
-            # Load mapping from DB if available
-            self._load_label_mapping()
+        labels = np.array(
+            sorted(l for l in pending if l < len(self._store)), dtype=np.int64
+        )
+        if len(labels):
+            self._index.add(self._store.vectors(labels), labels)
+            self._dirty = True
+            self._maybe_promote()
+
+    def verify_index(self) -> IndexRepairReport:
+        """Reconcile the index with the ``hnsw_label``s recorded in SQLite.
+
+        Labels present in SQLite but absent from the index are replayed
+        from the embedding store, or counted as ``missing_vectors`` when
+        the store has no row for them; labels in the index with no chunk
+        row (e.g. from a rolled-back transaction) are marked deleted. Only
+        the difference is touched, so this is far cheaper than
+        ``rebuild_index()``.
+        """
+        start = time.perf_counter()
+        with self._lock:
+            db_labels = np.fromiter(self._label_to_chunk_id, dtype=np.int64)
+            index_labels = self._index.labels()
+
+            missing = np.setdiff1d(db_labels, index_labels)
+            lost = int(np.count_nonzero(missing >= len(self._store)))
+            missing = missing[missing < len(self._store)]
+            if len(missing):
+                self._index.add(self._store.vectors(missing), missing)
+                self._dirty = True
+
+            orphans = np.setdiff1d(index_labels, db_labels)
+            # False when already marked deleted by an earlier repair
+            deleted = sum(self._index.mark_deleted(l) for l in orphans.tolist())
+            self._tombstones = len(orphans)
+            if deleted:
+                self._dirty = True
+            if len(missing) or deleted:
+                self._generation += 1
+
+        return IndexRepairReport(
+            db_labels=len(db_labels),
+            index_labels=len(index_labels),
+            replayed=len(missing),
+            orphans_deleted=deleted,
+            missing_vectors=lost,
+            seconds=time.perf_counter() - start,
+        )
 
     def _load_label_mapping(self) -> None:
         """Load label<->chunk_id mapping from the chunks table."""
-        cur = self._db.execute(
+        self._label_to_chunk_id.clear()
+        self._chunk_id_to_label.clear()
+        self._next_label = len(self._store)
+
+        rows = self._db.read(
             "SELECT chunk_id, hnsw_label FROM chunks WHERE hnsw_label IS NOT NULL"
         )
-        for chunk_id, label in cur.fetchall():
+        for chunk_id, label in rows:
             self._label_to_chunk_id[label] = chunk_id
             self._chunk_id_to_label[chunk_id] = label
             if label >= self._next_label:
                 self._next_label = label + 1
 
-    def _assign_label(self, chunk_id: str) -> int:
-        """Assign a new integer label for a chunk."""
-        label = self._next_label
-        self._next_label += 1
-        self._label_to_chunk_id[label] = chunk_id
-        self._chunk_id_to_label[chunk_id] = label
-        return label
+    def _load_lexical_index(self) -> None:
+        """Rebuild the in-memory lexical index from the packed SQLite rows."""
+        self._lexical.clear()
+        rows = self._db.read(
+            "SELECT hnsw_label, lexical_weights FROM chunks "
+            "WHERE lexical_weights IS NOT NULL AND hnsw_label IS NOT NULL"
+        )
+        if rows:
+            labels, weights = zip(*rows)
+            self._lexical.add(labels, weights)
+
+    def _migrate_blob_embeddings(self) -> None:
+        """Move legacy ``chunks.embedding`` BLOBs into the embedding store.
+
+        Rows already covered by the store are left alone; rows without a
+        label are given fresh ones. The BLOBs are cleared afterwards.
+        """
+        cur = self._db.execute(
+            "SELECT chunk_id, hnsw_label, embedding FROM chunks "
+            "WHERE embedding IS NOT NULL ORDER BY hnsw_label"
+        )
+        rows = cur.fetchall()
+        if not rows:
+            return
+
+        start = len(self._store)
+        labeled = [(label, blob) for _, label, blob in rows if label is not None]
+        end = max([label + 1 for label, _ in labeled if label >= start], default=start)
+
+        block = np.zeros((end - start, self._dim), dtype=np.float32)
+        for label, blob in labeled:
+            if label >= start:
+                block[label - start] = np.frombuffer(blob, dtype=np.float32)
+        self._store.append(block)
+
+        unlabeled = [(chunk_id, blob) for chunk_id, label, blob in rows if label is None]
+        first = len(self._store)
+        if unlabeled:
+            self._store.append(
+                np.stack([np.frombuffer(blob, dtype=np.float32) for _, blob in unlabeled])
+            )
+        self._store.flush()
+
+        with self._db.transaction():
+            self._db.executemany(
+                "UPDATE chunks SET hnsw_label = ? WHERE chunk_id = ?",
+                [(first + i, chunk_id) for i, (chunk_id, _) in enumerate(unlabeled)],
+            )
+            self._db.execute(
+                "UPDATE chunks SET embedding = NULL WHERE embedding IS NOT NULL"
+            )
+        self._load_label_mapping()
+
+    def _append_vectors(self, data: np.ndarray) -> int:
+        """Append vectors to the store, returning the first new label."""
+        missing = self._next_label - len(self._store)
+        if missing > 0:
+            warnings.warn(
+                f"Embedding store is missing {missing} rows; padding with zeros",
+                RuntimeWarning,
+                stacklevel=3,
+            )
+            self._store.append(np.zeros((missing, self._dim), dtype=np.float32))
+
+        first = self._store.append(data)
+        self._next_label = first + len(data)
+        return first
 
     def add_chunks(self, chunks: list[Chunk]) -> None:
-        """Add embedded chunks to the ANN index and persist to SQLite.
+        """Add embedded chunks to the ANN index and persist them.
 
-        Chunks must have non-None embedding fields. Idempotent:
-        chunks already in the index are skipped.
+        Vectors are appended to the embedding store, metadata goes to
+        SQLite. Chunks must have non-None embedding fields. Idempotent:
+        chunks already in the index are skipped. Inside an enclosing
+        ``Database.transaction()`` the chunks become searchable (and
+        ``generation`` moves) only when it commits.
         """
         if not chunks:
             return
@@ -90,30 +464,24 @@ class SimilarityRetriever:
         if not new_chunks:
             return
 
-        # Resize index if needed
-        current_count = self._index.get_current_count()
-        needed = current_count + len(new_chunks)
-        if needed > self._index.get_max_elements():
-            self._index.resize_index(max(needed * 2, self._max_elements))
+        # Lock order is always database writer, then index
+        with self._db.transaction(), self._lock:
+            self._add_new_chunks(new_chunks)
 
-        labels: list[int] = []
-        vectors: list[np.ndarray] = []
+    def _add_new_chunks(self, new_chunks: list[Chunk]) -> None:
+        data = np.array([c.embedding for c in new_chunks], dtype=np.float32)
+        first = self._append_vectors(data)
+        labels = np.arange(first, first + len(new_chunks), dtype=np.int64)
 
-        for chunk in new_chunks:
-            label = self._assign_label(chunk.chunk_id)
-            labels.append(label)
-            vectors.append(np.array(chunk.embedding, dtype=np.float32))
+        rows: list[tuple] = []
+        for chunk, label in zip(new_chunks, labels.tolist()):
+            self._label_to_chunk_id[label] = chunk.chunk_id
+            self._chunk_id_to_label[chunk.chunk_id] = label
 
-            # Persist chunk + embedding to SQLite
-            embedding_blob = np.array(chunk.embedding, dtype=np.float32).tobytes()
-            lexical_json = (
-                json.dumps(chunk.lexical_weights) if chunk.lexical_weights else None
+            lexical_blob = (
+                encode_weights(chunk.lexical_weights) if chunk.lexical_weights else None
             )
-            self._db.execute(
-                "INSERT OR IGNORE INTO chunks "
-                "(chunk_id, turn_id, text, start_char, end_char, "
-                "token_count, embedding, lexical_weights, hnsw_label) "
-                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows.append(
                 (
                     chunk.chunk_id,
                     chunk.turn_id,
@@ -121,143 +489,604 @@ class SimilarityRetriever:
                     chunk.start_char,
                     chunk.end_char,
                     chunk.token_count,
-                    embedding_blob,
-                    lexical_json,
+                    lexical_blob,
                     label,
-                ),
+                )
             )
 
+        if self._deferred_from is None:
+            # The rows must be durable before SQLite points at them;
+            # bulk_load() relaxes this and flushes once on exit.
+            self._store.flush()
+
+        # Persist chunk metadata to SQLite in one statement
+        self._db.executemany(
+            "INSERT OR IGNORE INTO chunks "
+            "(chunk_id, turn_id, text, start_char, end_char, "
+            "token_count, lexical_weights, hnsw_label) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
         self._db.commit()
 
-        data = np.stack(vectors)
-        self._index.add_items(data, np.array(labels, dtype=np.int64))
+        lexical = (labels.tolist(), [c.lexical_weights for c in new_chunks])
+
+        def publish() -> None:
+            # Readers cannot see the rows until the transaction commits,
+            # so the labels only become searchable then.
+            with self._lock:
+                if self._deferred_from is not None:
+                    # indexed in one pass when bulk_load() exits
+                    self._deferred_lexical.append(lexical)
+                    return
+                self._index.add(data, labels)
+                self._lexical.add(*lexical)
+                self._dirty = True
+                self._generation += 1
+                self._maybe_promote()
+
+        def forget() -> None:
+            with self._lock:
+                for chunk, label in zip(new_chunks, labels.tolist()):
+                    self._label_to_chunk_id.pop(label, None)
+                    if self._chunk_id_to_label.get(chunk.chunk_id) == label:
+                        del self._chunk_id_to_label[chunk.chunk_id]
+
+        self._db.after_commit(publish)
+        self._db.after_rollback(forget)
 
     def query(
         self,
         query_embedding: np.ndarray,
         k: int = 10,
         ef_search: int = 50,
+        include_vectors: bool = False,
+        rescore: bool = False,
     ) -> list[RetrievalResult]:
-        """Find the k most similar chunks to the query embedding."""
-        if self._index.get_current_count() == 0:
+        """Find the k most similar chunks to the query embedding.
+
+        Hits are hydrated with one batched SQLite query. Embeddings and
+        lexical weights are only loaded when ``include_vectors`` is set.
+        With ``rescore``, candidates are re-ranked by exact cosine
+        similarity against the embedding store.
+        """
+        query_vec = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)
+        return self.query_many(
+            query_vec,
+            k=k,
+            ef_search=ef_search,
+            include_vectors=include_vectors,
+            rescore=rescore,
+            num_threads=1,
+        )[0]
+
+    def query_many(
+        self,
+        query_embeddings: np.ndarray,
+        k: int = 10,
+        ef_search: int = 50,
+        include_vectors: bool = False,
+        rescore: bool = False,
+        num_threads: int = -1,
+    ) -> list[list[RetrievalResult]]:
+        """Run ``query`` for every row of an (n, dim) matrix at once.
+
+        All rows go to the backend in a single search call (hnswlib
+        searches them in parallel on ``num_threads`` threads, -1 = all
+        cores; the exact backend does one matrix product), and the hits of
+        every row are hydrated together in one pass. Returns one result
+        list per row, in order. ``rescore`` is a no-op on the exact
+        backend, whose scores are already exact.
+        """
+        query_vecs = np.asarray(query_embeddings, dtype=np.float32)
+        query_vecs = query_vecs.reshape(-1, self._dim)
+        index = self._index
+        count = len(index) - self._tombstones
+        if count <= 0 or len(query_vecs) == 0:
+            return [[] for _ in range(len(query_vecs))]
+
+        rescore = rescore and not index.exact
+        k = min(k, count)
+        fetch = min(k * self._rescore_factor, count) if rescore else k
+        labels_arr, scores_arr = index.search(query_vecs, fetch, ef_search, num_threads)
+
+        per_query: list[list[tuple[str, float]]] = []
+        for row, (labels, scores) in enumerate(zip(labels_arr, scores_arr)):
+            if rescore:
+                scores = self._store.score(query_vecs[row], labels)
+                order = np.argsort(-scores, kind="stable")[:k]
+                labels, scores = labels[order], scores[order]
+            per_query.append(self._hits(labels, scores))
+
+        return self._results(per_query, include_vectors)
+
+    def query_hybrid(
+        self,
+        query_embedding: np.ndarray,
+        query_weights: dict[str, float],
+        k: int = 10,
+        ef_search: int = 50,
+        sparse_weight: float = 0.3,
+        candidates: int | None = None,
+        include_vectors: bool = False,
+    ) -> list[RetrievalResult]:
+        """Fuse dense ANN candidates with lexical-index candidates.
+
+        The top ``candidates`` (default ``rescore_factor`` x k) of each
+        list are pooled, and every pooled chunk is scored exactly as
+        ``dense + sparse_weight * sparse``: cosine similarity against the
+        embedding store plus bge-m3's lexical matching score. Chunks
+        found only by exact token overlap (identifiers, error codes) thus
+        surface without raising k for the dense search.
+        """
+        query_vec = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        fetch = candidates or k * self._rescore_factor
+        sparse_labels, sparse_scores = self._lexical.scores(query_weights)
+
+        index = self._index
+        count = len(index) - self._tombstones
+        dense_labels = np.empty(0, dtype=np.int64)
+        if count > 0:
+            found, _ = index.search(
+                query_vec.reshape(1, -1), min(fetch, count), ef_search, num_threads=1
+            )
+            dense_labels = found[0][found[0] >= 0]
+
+        top_sparse = sparse_labels
+        if len(sparse_labels) > fetch:
+            top_sparse = sparse_labels[np.argpartition(-sparse_scores, fetch - 1)[:fetch]]
+        pool = np.union1d(dense_labels, top_sparse)
+        pool = pool[pool < len(self._store)]
+        if not len(pool):
             return []
 
-        k = min(k, self._index.get_current_count())
-        self._index.set_ef(max(ef_search, k))
+        scores = self._store.score(query_vec, pool)
+        if len(sparse_labels):
+            pos = np.searchsorted(sparse_labels, pool).clip(max=len(sparse_labels) - 1)
+            matched = sparse_labels[pos] == pool
+            scores = scores + sparse_weight * np.where(matched, sparse_scores[pos], 0.0)
 
-        query_vec = query_embedding.reshape(1, -1).astype(np.float32)
-        labels_arr, distances_arr = self._index.knn_query(query_vec, k=k)
+        order = np.argsort(-scores, kind="stable")[:k]
+        hits = self._hits(pool[order], scores[order].astype(np.float32))
+        return self._results([hits], include_vectors)[0]
 
-        results: list[RetrievalResult] = []
-        for label, distance in zip(labels_arr[0], distances_arr[0]):
-            label = int(label)
-            chunk_id = self._label_to_chunk_id.get(label)
-            if chunk_id is None:
-                continue
+    def query_bm25(
+        self, query: str, k: int = 10, include_vectors: bool = False
+    ) -> list[RetrievalResult]:
+        """Rank chunks by BM25 keyword relevance to ``query``.
 
-            # Hydrate chunk from SQLite
-            chunk = self._load_chunk(chunk_id)
-            if chunk is None:
-                continue
+        Every query term is matched literally (see ``fts_query``) and any
+        of them may match. Scores are negated FTS5 ``bm25()`` values, so
+        higher is better, but are not comparable to cosine scores.
+        Returns [] if the database has no FTS5 support.
+        """
+        match = fts_query(query)
+        if not match or not self._db.fts:
+            return []
+        rows = self._db.read(
+            "SELECT c.chunk_id, -bm25(chunks_fts) AS score FROM chunks_fts "
+            "JOIN chunks c ON c.rowid = chunks_fts.rowid "
+            "WHERE chunks_fts MATCH ? ORDER BY bm25(chunks_fts) LIMIT ?",
+            (match, k),
+        )
+        # Only chunks this retriever knows about are searchable
+        hits = [(cid, score) for cid, score in rows if cid in self._chunk_id_to_label]
+        return self._results([hits], include_vectors)[0]
 
-            # Hydrate turn
-            turn = self._load_turn(chunk.turn_id)
+    def _hits(self, labels: np.ndarray, scores: np.ndarray) -> list[tuple[str, float]]:
+        """(chunk_id, score) pairs for labels that still map to a chunk."""
+        hits: list[tuple[str, float]] = []
+        for label, score in zip(labels.tolist(), scores.tolist()):
+            chunk_id = self._label_to_chunk_id.get(label)
+            if chunk_id is not None:
+                hits.append((chunk_id, score))
+        return hits
 
-            # hnswlib cosine distance = 1 - cosine_similarity
-            score = 1.0 - float(distance)
+    def _results(
+        self, per_query: list[list[tuple[str, float]]], include_vectors: bool
+    ) -> list[list[RetrievalResult]]:
+        """Hydrate the hits of every query together in one pass."""
+        unique_ids = dict.fromkeys(cid for hits in per_query for cid, _ in hits)
+        hydrated = self._hydrate(list(unique_ids), include_vectors)
 
-            results.append(RetrievalResult(chunk=chunk, score=score, turn=turn))
+        all_results: list[list[RetrievalResult]] = []
+        for hits in per_query:
+            results: list[RetrievalResult] = []
+            for chunk_id, score in hits:
+                if chunk_id in hydrated:
+                    chunk, turn = hydrated[chunk_id]
+                    results.append(RetrievalResult(chunk=chunk, score=score, turn=turn))
+            all_results.append(results)
 
-        return results
+        return all_results
 
     def rebuild_index(self) -> None:
-        """Rebuild the hnswlib index from all embeddings in SQLite."""
-        cur = self._db.execute(
-            "SELECT chunk_id, embedding, hnsw_label FROM chunks "
-            "WHERE embedding IS NOT NULL"
-        )
-        rows = cur.fetchall()
+        """Rebuild the vector index from the embedding store.
 
-        self._index = hnswlib.Index(space="cosine", dim=self._dim)
-        max_el = max(len(rows), self._max_elements)
-        self._index.init_index(
-            max_elements=max_el,
-            ef_construction=self._ef_construction,
-            M=self._M,
-        )
+        Vectors are passed to the backend as slices of the memory-mapped
+        matrix, with no per-row decoding. With ``backend="auto"`` the
+        store's current size picks exact or HNSW afresh. A trained IVF-PQ
+        index is retrained on the live chunks, since its replacement only
+        trains itself once ``train_size`` vectors have been added.
+        """
+        with self._lock:
+            self._load_label_mapping()
+            self._load_lexical_index()
+            labels = np.array(sorted(self._label_to_chunk_id), dtype=np.int64)
+            labels = labels[labels < len(self._store)]
 
-        self._label_to_chunk_id.clear()
-        self._chunk_id_to_label.clear()
-        self._next_label = 0
+            retrain = isinstance(self._index, IvfPqBackend) and self._index.trained
+            self._index = self._new_backend(len(labels))
+            self._index.add(self._store.vectors(labels), labels)
+            if retrain and not self._index.trained:
+                self.train_index()
+            self._tombstones = 0
+            self._dirty = True
+            self._generation += 1
 
-        if not rows:
+    def chunk_ids_for_turns(self, turn_ids: list[str]) -> list[str]:
+        """IDs of every stored chunk belonging to the given turns."""
+        chunk_ids: list[str] = []
+        for i in range(0, len(turn_ids), _SQL_BATCH):
+            batch = turn_ids[i : i + _SQL_BATCH]
+            rows = self._db.read(
+                "SELECT chunk_id FROM chunks "
+                f"WHERE turn_id IN ({', '.join('?' * len(batch))})",
+                tuple(batch),
+            )
+            chunk_ids.extend(row[0] for row in rows)
+        return chunk_ids
+
+    def chunk_texts(self, chunk_ids: list[str]) -> list[str]:
+        """Text of each stored chunk among ``chunk_ids`` (missing ones skipped)."""
+        texts: list[str] = []
+        for i in range(0, len(chunk_ids), _SQL_BATCH):
+            batch = chunk_ids[i : i + _SQL_BATCH]
+            rows = self._db.read(
+                "SELECT text FROM chunks "
+                f"WHERE chunk_id IN ({', '.join('?' * len(batch))})",
+                tuple(batch),
+            )
+            texts.extend(row[0] for row in rows)
+        return texts
+
+    def delete_chunks(self, chunk_ids: list[str]) -> int:
+        """Delete chunks and tombstone them in the index.
+
+        Chunk rows (and their FTS entries) are removed from SQLite. Once
+        that commits (the enclosing ``Database.transaction()``, if any),
+        the labels are marked deleted in the vector backend so no query
+        returns them from then on, their lexical postings are dropped and
+        their rows in the embedding store are zeroed; a rollback leaves
+        all of these untouched. Returns the number of chunk rows deleted.
+
+        A saved HNSW or IVF-PQ index file, and the free pages of the
+        SQLite file, still hold the deleted data until ``compact`` next
+        rewrites them. That may start in the background (see
+        ``compact_threshold``).
+        """
+        if not chunk_ids:
+            return 0
+        with self._db.transaction(), self._lock:
+            lexical: list[tuple[int, bytes | str]] = []
+            deleted = 0
+            for i in range(0, len(chunk_ids), _SQL_BATCH):
+                batch = chunk_ids[i : i + _SQL_BATCH]
+                placeholders = ", ".join("?" * len(batch))
+                lexical.extend(
+                    self._db.read(
+                        "SELECT hnsw_label, lexical_weights FROM chunks "
+                        f"WHERE chunk_id IN ({placeholders}) "
+                        "AND lexical_weights IS NOT NULL",
+                        tuple(batch),
+                    )
+                )
+                deleted += self._db.execute(
+                    f"DELETE FROM chunks WHERE chunk_id IN ({placeholders})",
+                    tuple(batch),
+                ).rowcount
+
+            def tombstone() -> None:
+                with self._lock:
+                    labels = [
+                        self._chunk_id_to_label.pop(cid)
+                        for cid in chunk_ids
+                        if cid in self._chunk_id_to_label
+                    ]
+                    for label in labels:
+                        del self._label_to_chunk_id[label]
+                        # False for chunks still deferred by bulk_load()
+                        self._tombstones += self._index.mark_deleted(label)
+                    # Postings of chunks deferred by bulk_load() are not
+                    # indexed yet; they are filtered when it exits.
+                    indexed = [
+                        (label, weights)
+                        for label, weights in lexical
+                        if self._deferred_from is None or label < self._deferred_from
+                    ]
+                    self._lexical.remove(
+                        [label for label, _ in indexed], [w for _, w in indexed]
+                    )
+                    self._store.erase(np.array(labels, dtype=np.int64))
+                    if labels:
+                        self._dirty = True
+                        self._generation += 1
+                self._maybe_compact()
+
+            self._db.after_commit(tombstone)
+        return deleted
+
+    @property
+    def deleted_fraction(self) -> float:
+        """Share of indexed labels that are tombstones awaiting compaction."""
+        size = len(self._index)
+        return self._tombstones / size if size else 0.0
+
+    def _maybe_compact(self) -> None:
+        """Start a background compaction if enough of the index is dead."""
+        if (
+            self._compact_threshold is None
+            or self.deleted_fraction <= self._compact_threshold
+        ):
             return
+        with self._lock:
+            running = self._compaction_thread
+            if running is not None and running.is_alive():
+                return
+            self._compaction_thread = threading.Thread(
+                target=self.compact, name="index-compaction", daemon=True
+            )
+            self._compaction_thread.start()
 
-        labels: list[int] = []
-        vectors: list[np.ndarray] = []
+    def compact(self, vacuum: bool = True) -> CompactionReport:
+        """Drop tombstones from the index and reclaim database space.
 
-        for chunk_id, emb_blob, hnsw_label in rows:
-            vec = np.frombuffer(emb_blob, dtype=np.float32)
-            label = hnsw_label if hnsw_label is not None else self._assign_label(chunk_id)
+        The index is rebuilt from the live chunks and checkpointed, then
+        (with ``vacuum``) SQLite is vacuumed. Writers wait during the
+        rebuild; searches carry on against the old index until the swap.
+        The report includes the mean latency of a fixed set of probe
+        queries before and after, also kept as ``compaction_report``.
+        """
+        with self._compaction_lock:
+            probes = self._probe_vectors()
+            query_ms_before = self._probe_latency(probes)
+            db_bytes_before = self._db.size_bytes()
 
-            if hnsw_label is not None:
-                self._label_to_chunk_id[label] = chunk_id
-                self._chunk_id_to_label[chunk_id] = label
-                if label >= self._next_label:
-                    self._next_label = label + 1
-            else:
-                self._assign_label(chunk_id)
+            start = time.perf_counter()
+            # Lock order is always database writer, then index
+            with self._db.transaction(), self._lock:
+                tombstones = self._tombstones
+                deleted_fraction = self.deleted_fraction
+                self.rebuild_index()
+            self.save()
+            index_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            if vacuum:
+                self._db.vacuum()
+            vacuum_seconds = time.perf_counter() - start
 
-            labels.append(label)
-            vectors.append(vec)
+            report = CompactionReport(
+                tombstones=tombstones,
+                live_chunks=len(self._label_to_chunk_id),
+                deleted_fraction=deleted_fraction,
+                db_bytes_before=db_bytes_before,
+                db_bytes_after=self._db.size_bytes(),
+                query_ms_before=query_ms_before,
+                query_ms_after=self._probe_latency(probes),
+                index_seconds=index_seconds,
+                vacuum_seconds=vacuum_seconds,
+            )
+            self.compaction_report = report
+            return report
+
+    def _probe_vectors(self) -> np.ndarray:
+        """Stored vectors of a few live chunks, used as probe queries."""
+        labels = np.array(sorted(self._label_to_chunk_id), dtype=np.int64)
+        labels = labels[labels < len(self._store)]
+        if len(labels) > _PROBE_QUERIES:
+            rng = np.random.default_rng(0)
+            labels = np.sort(rng.choice(labels, _PROBE_QUERIES, replace=False))
+        return np.array(self._store.vectors(labels), dtype=np.float32)
+
+    def _probe_latency(self, probes: np.ndarray) -> float:
+        """Mean milliseconds per single-query ``query_many`` over ``probes``."""
+        if not len(probes):
+            return 0.0
+        start = time.perf_counter()
+        for probe in probes:
+            self.query_many(probe.reshape(1, -1), k=10, num_threads=1)
+        return (time.perf_counter() - start) * 1000 / len(probes)
+
+    def train_index(self, sample_size: int = 50_000, seed: int = 0) -> None:
+        """Train the IVF-PQ quantizers on stored embeddings and re-encode.
+
+        A random sample of up to ``sample_size`` indexed chunks is read
+        back from the embedding store (legacy ``chunks.embedding`` rows
+        are migrated there on load). Only valid with ``backend="ivfpq"``.
+        """
+        if not isinstance(self._index, IvfPqBackend):
+            raise ValueError("train_index() requires backend='ivfpq'")
+        with self._lock:
+            labels = np.array(sorted(self._label_to_chunk_id), dtype=np.int64)
+            labels = labels[labels < len(self._store)]
+            if not len(labels):
+                return
+            if len(labels) > sample_size:
+                rng = np.random.default_rng(seed)
+                labels = np.sort(rng.choice(labels, sample_size, replace=False))
+            self._index.train(self._store.vectors(labels))
+            self._dirty = True
+            self._generation += 1
 
-        data = np.stack(vectors)
-        self._index.add_items(data, np.array(labels, dtype=np.int64))
+    @contextmanager
+    def bulk_load(
+        self, report: BulkLoadReport | None = None
+    ) -> Iterator[BulkLoadReport]:
+        """Defer HNSW insertion for chunks added inside the block.
+
+        Vectors and metadata are still persisted by ``add_chunks``, but
+        the chunks are not searchable until the block exits, when all of
+        them go into the index in a single multi-threaded ``add_items``
+        call after one resize. Checkpoints are skipped meanwhile, since
+        the index does not yet cover the store.
+        """
+        report = report if report is not None else BulkLoadReport()
+        with self._lock:
+            if self._deferred_from is not None:
+                raise RuntimeError("bulk_load() is already active")
+            self._deferred_from = self._next_label
+        try:
+            yield report
+        finally:
+            start = time.perf_counter()
+            with self._lock:
+                self._store.flush()
+                first, self._deferred_from = self._deferred_from, None
+                for labels, weights in self._deferred_lexical:
+                    # Skip chunks deleted before the block ended
+                    live = [
+                        (label, w)
+                        for label, w in zip(labels, weights)
+                        if label in self._label_to_chunk_id
+                    ]
+                    self._lexical.add([l for l, _ in live], [w for _, w in live])
+                self._deferred_lexical.clear()
+                labels = np.array(
+                    sorted(l for l in self._label_to_chunk_id if l >= first),
+                    dtype=np.int64,
+                )
+                if len(labels):
+                    self._index.add(self._store.vectors(labels), labels)
+                    self._dirty = True
+                    self._generation += 1
+                    self._maybe_promote()
+            report.indexed = len(labels)
+            report.index_build_seconds = time.perf_counter() - start
 
     def save(self) -> None:
-        """Persist the hnswlib index to disk."""
-        if self._index_path and self._index is not None:
+        """Write a checkpoint of the index, if anything changed since the last.
+
+        The index file is replaced atomically, then the checkpoint label
+        is recorded; a crash in between only causes a harmless re-replay.
+        The exact backend has no file of its own: only the store is
+        flushed, and any index file saved by an earlier backend is removed.
+        """
+        with self._lock:
+            self._store.flush()
+            if not self._index_path or self._index is None or not self._dirty:
+                return
+            if not self._index.persistent:
+                self._discard_saved_index()
+                self._dirty = False
+                return
+            if self._deferred_from is not None:
+                return  # the index lags the store until bulk_load() exits
+
             self._index_path.parent.mkdir(parents=True, exist_ok=True)
-            self._index.save_index(str(self._index_path))
+            tmp_path = self._index_path.with_name(self._index_path.name + ".tmp")
+            self._index.save(tmp_path)
+            os.replace(tmp_path, self._index_path)
 
-    def _load_chunk(self, chunk_id: str) -> Chunk | None:
-        """Load a chunk from SQLite by ID."""
-        cur = self._db.execute(
-            "SELECT chunk_id, turn_id, text, start_char, end_char, "
-            "token_count, embedding, lexical_weights "
-            "FROM chunks WHERE chunk_id = ?",
-            (chunk_id,),
-        )
-        row = cur.fetchone()
-        if row is None:
-            return None
+            tmp_path = self._checkpoint_path.with_name(
+                self._checkpoint_path.name + ".tmp"
+            )
+            tmp_path.write_text(json.dumps({"next_label": self._next_label}))
+            os.replace(tmp_path, self._checkpoint_path)
+            self._dirty = False
 
-        embedding = None
-        if row[6] is not None:
-            embedding = np.frombuffer(row[6], dtype=np.float32).tolist()
-
-        lexical_weights = None
-        if row[7] is not None:
-            lexical_weights = json.loads(row[7])
-
-        return Chunk(
-            chunk_id=row[0],
-            turn_id=row[1],
-            text=row[2],
-            start_char=row[3],
-            end_char=row[4],
-            token_count=row[5],
-            embedding=embedding,
-            lexical_weights=lexical_weights,
-        )
+    def _checkpoint_loop(self) -> None:
+        while not self._stop_checkpoints.wait(self._checkpoint_interval):
+            self.save()
 
-    def _load_turn(self, turn_id: str) -> Turn | None:
-        """Load a turn from SQLite by ID."""
-        cur = self._db.execute(
-            "SELECT turn_id, role, text, created_at FROM turns WHERE turn_id = ?",
-            (turn_id,),
+    def close(self) -> None:
+        """Stop background work and write a final checkpoint."""
+        self._stop_checkpoints.set()
+        if self._checkpoint_thread is not None:
+            self._checkpoint_thread.join()
+            self._checkpoint_thread = None
+        if self._compaction_thread is not None:
+            self._compaction_thread.join()
+            self._compaction_thread = None
+        self.save()
+
+    @property
+    def generation(self) -> int:
+        """Counter bumped whenever chunks are added to or removed from the index.
+
+        Anything derived from search results can be cached against it.
+        """
+        return self._generation
+
+    @property
+    def backend(self) -> str:
+        """Name of the vector backend currently serving searches."""
+        return self._index.name
+
+    @property
+    def lexical_index(self) -> LexicalIndex:
+        """The inverted index over chunks' lexical weights."""
+        return self._lexical
+
+    @property
+    def embedding_store(self) -> EmbeddingStore:
+        """The label-indexed embedding matrix backing this retriever."""
+        return self._store
+
+    def _hydrate(
+        self, chunk_ids: list[str], include_vectors: bool = False
+    ) -> dict[str, tuple[Chunk, Turn | None]]:
+        """Load chunks and their turns for many chunk IDs in one pass.
+
+        Returns a dict keyed by chunk_id; IDs missing from SQLite are absent.
+        """
+        columns = (
+            "c.chunk_id, c.turn_id, c.text, c.start_char, c.end_char, "
+            "c.token_count, t.role, t.text, t.created_at"
         )
-        row = cur.fetchone()
-        if row is None:
-            return None
-        return Turn(turn_id=row[0], role=row[1], text=row[2], created_at=row[3])
+        if include_vectors:
+            columns += ", c.hnsw_label, c.lexical_weights"
+
+        hydrated: dict[str, tuple[Chunk, Turn | None]] = {}
+        for i in range(0, len(chunk_ids), _SQL_BATCH):
+            batch = chunk_ids[i : i + _SQL_BATCH]
+            rows = self._db.read(
+                f"SELECT {columns} FROM chunks c "
+                "LEFT JOIN turns t ON t.turn_id = c.turn_id "
+                f"WHERE c.chunk_id IN ({', '.join('?' * len(batch))})",
+                tuple(batch),
+            )
+            vectors: dict[int, list[float]] = {}
+            if include_vectors:
+                labels = [
+                    row[9]
+                    for row in rows
+                    if row[9] is not None and row[9] < len(self._store)
+                ]
+                vectors = dict(zip(labels, self._store.vectors(labels).tolist()))
+            for row in rows:
+                embedding = None
+                lexical_weights = None
+                if include_vectors:
+                    embedding = vectors.get(row[9])
+                    if row[10] is not None:
+                        lexical_weights = decode_weights(row[10])
+
+                chunk = Chunk(
+                    chunk_id=row[0],
+                    turn_id=row[1],
+                    text=row[2],
+                    start_char=row[3],
+                    end_char=row[4],
+                    token_count=row[5],
+                    embedding=embedding,
+                    lexical_weights=lexical_weights,
+                )
+                turn = None
+                if row[6] is not None:
+                    turn = Turn(
+                        turn_id=row[1], role=row[6], text=row[7], created_at=row[8]
+                    )
+                hydrated[row[0]] = (chunk, turn)
+
+        return hydrated
@@ -47,3 +47,112 @@ class RetrievalResult(BaseModel):
     chunk: Chunk
     score: float
     turn: Optional[Turn] = None
+
+
+class IndexRepairReport(BaseModel):
+    """Outcome of comparing the ANN index with the chunks table."""
+
+    db_labels: int
+    index_labels: int
+    replayed: int  # labels in SQLite that were missing from the index
+    orphans_deleted: int  # labels in the index with no chunk row
+    missing_vectors: int = 0  # labels in SQLite with no embedding store row
+    seconds: float
+
+
+class CompactionReport(BaseModel):
+    """Outcome of dropping tombstoned chunks from the index and database."""
+
+    tombstones: int  # deleted labels dropped from the index
+    live_chunks: int
+    deleted_fraction: float  # tombstones / indexed labels before compaction
+    db_bytes_before: int
+    db_bytes_after: int
+    query_ms_before: float  # mean latency of probe queries
+    query_ms_after: float
+    index_seconds: float
+    vacuum_seconds: float
+
+
+class EmbeddingCacheStats(BaseModel):
+    """Hit-rate counters for the content-addressed embedding cache."""
+
+    entries: int
+    hits: int  # texts served without running the encoder
+    misses: int  # unique texts that had to be encoded
+    hit_rate: float
+    encode_seconds: float  # encoder time spent on misses
+    est_seconds_saved: float  # hits x mean encoder time per miss
+
+
+class SearchCacheStats(BaseModel):
+    """Hit/miss counters for the query-embedding and search-result caches."""
+
+    embedding_hits: int
+    embedding_misses: int
+    embedding_entries: int
+    result_hits: int
+    result_misses: int
+    result_entries: int
+
+
+class KeywordSearchStats(BaseModel):
+    """How often keyword-mode searches were answered by BM25 alone."""
+
+    queries: int  # searches with keyword="fuse" or "auto"
+    bm25_only: int  # answered from the FTS index without the embedder
+    fused: int  # BM25 and dense results merged
+    dense_only: int  # "auto" queries that did not look lexical
+    embedder_skip_rate: float
+
+
+class ModelRegistryStats(BaseModel):
+    """Sharing counters for the process-wide embedding model registry."""
+
+    models: int  # models currently loaded
+    loads: int  # times a model was loaded from disk
+    hits: int  # requests served by an already-loaded model
+    evictions: int
+
+
+class BulkLoadReport(BaseModel):
+    """What a ``bulk_load()`` block loaded and how the exit checks went."""
+
+    turns: int = 0
+    chunks: int = 0
+    indexed: int = 0  # vectors added to HNSW in the final one-pass build
+    index_build_seconds: float = 0.0
+    integrity_check: str = ""  # result of PRAGMA quick_check ("ok" if clean)
+    foreign_key_violations: int = 0
+    seconds: float = 0.0
+
+
+class StageStats(BaseModel):
+    """Throughput and input-queue depth of one ingest pipeline stage."""
+
+    name: str
+    workers: int
+    batches: int
+    items: int  # files for parse, turns for chunk, chunks for embed/index
+    busy_seconds: float  # summed over workers
+    items_per_second: float  # per busy second, scaled by worker count
+    mean_queue_depth: float  # sampled depth of the queue feeding this stage
+    max_queue_depth: int
+    queue_size: int
+
+
+class IngestReport(BaseModel):
+    """Totals and per-stage stats from one ``IngestPipeline.run``."""
+
+    files: int
+    turns: int
+    chunks: int
+    seconds: float
+    stages: list[StageStats]
+
+    @property
+    def bottleneck(self) -> str:
+        """The stage with the most busy time per worker."""
+        if not self.stages:
+            return ""
+        return max(self.stages, key=lambda s: s.busy_seconds / s.workers).name
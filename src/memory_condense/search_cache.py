@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import threading
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+import numpy as np
+
+from memory_condense.schemas import RetrievalResult, SearchCacheStats
+
+
+def normalize_query(query: str) -> str:
+    """Canonical cache form of a query: NFC, trimmed, single-spaced.
+
+    Case is kept, since the embedding model is case-sensitive.
+    """
+    return " ".join(unicodedata.normalize("NFC", query).split())
+
+
+class _LRU:
+    """Thread-safe bounded mapping that evicts the least recently used key."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SearchCache:
+    """Two-level cache in front of query embedding and ANN search.
+
+    * Embeddings: normalized query text -> query vector, LRU-bounded to
+      ``max_queries`` entries. Valid for as long as the model is.
+    * Results: (query, k, ef_search, options, index generation) -> hits,
+      LRU-bounded to ``max_results`` entries. The retriever bumps its
+      generation whenever chunks are added or removed; results from an
+      older generation are dropped as soon as a newer one is seen, so a
+      cached result is never served after the index has changed.
+    """
+
+    def __init__(self, max_queries: int = 1024, max_results: int = 1024) -> None:
+        self._embeddings = _LRU(max_queries)
+        self._results = _LRU(max_results)
+        self._generation: int | None = None
+        self._generation_lock = threading.Lock()
+
+    def get_embedding(self, query: str) -> np.ndarray | None:
+        return self._embeddings.get(normalize_query(query))
+
+    def put_embedding(self, query: str, embedding: np.ndarray) -> None:
+        self._embeddings.put(normalize_query(query), embedding)
+
+    def get_results(
+        self, query: str, generation: int, **params: Hashable
+    ) -> list[RetrievalResult] | None:
+        self._observe(generation)
+        cached = self._results.get(self._result_key(query, generation, params))
+        return list(cached) if cached is not None else None
+
+    def put_results(
+        self,
+        query: str,
+        generation: int,
+        results: list[RetrievalResult],
+        **params: Hashable,
+    ) -> None:
+        if self._observe(generation):
+            key = self._result_key(query, generation, params)
+            self._results.put(key, list(results))
+
+    def clear(self) -> None:
+        self._embeddings.clear()
+        self._results.clear()
+
+    def stats(self) -> SearchCacheStats:
+        return SearchCacheStats(
+            embedding_hits=self._embeddings.hits,
+            embedding_misses=self._embeddings.misses,
+            embedding_entries=len(self._embeddings),
+            result_hits=self._results.hits,
+            result_misses=self._results.misses,
+            result_entries=len(self._results),
+        )
+
+    def _observe(self, generation: int) -> bool:
+        """Track the newest generation; False if ``generation`` is stale."""
+        with self._generation_lock:
+            if self._generation is None or generation > self._generation:
+                if self._generation is not None:
+                    self._results.clear()
+                self._generation = generation
+            return generation == self._generation
+
+    @staticmethod
+    def _result_key(query: str, generation: int, params: dict) -> tuple:
+        return (normalize_query(query), generation, tuple(sorted(params.items())))
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
+
 from memory_condense.db import Database
 from memory_condense.schemas import Turn
 
 
 class TranscriptStore:
-    """Append-only store for conversation transcript turns."""
+    """Store for conversation transcript turns.
+
+    Turns are appended as they happen and only removed by
+    ``delete_turns`` (retention, erasure requests).
+    """
 
     def __init__(self, db: Database) -> None:
         self._db = db
@@ -13,45 +19,75 @@ class TranscriptStore:
     def append(self, role: str, text: str) -> Turn:
         """Create and persist a new turn. Returns the Turn with generated ID."""
         turn = Turn(role=role, text=text)
-        self._db.execute(
-            "INSERT INTO turns (turn_id, role, text, created_at) VALUES (?, ?, ?, ?)",
-            (turn.turn_id, turn.role, turn.text, turn.created_at.isoformat()),
-        )
-        self._db.commit()
+        with self._db.transaction():
+            self._db.execute(
+                "INSERT INTO turns (turn_id, role, text, created_at) VALUES (?, ?, ?, ?)",
+                (turn.turn_id, turn.role, turn.text, turn.created_at.isoformat()),
+            )
         return turn
 
+    def append_many(self, turns: Iterable[tuple[str, str]]) -> list[Turn]:
+        """Create and persist several (role, text) turns with one commit.
+
+        Returns the Turns in input order.
+        """
+        created = [Turn(role=role, text=text) for role, text in turns]
+        self.insert_many(created)
+        return created
+
+    def insert_many(self, turns: Iterable[Turn]) -> None:
+        """Persist already-constructed Turns (e.g. built ahead by a pipeline)."""
+        with self._db.transaction():
+            self._db.executemany(
+                "INSERT INTO turns (turn_id, role, text, created_at) VALUES (?, ?, ?, ?)",
+                [
+                    (t.turn_id, t.role, t.text, t.created_at.isoformat())
+                    for t in turns
+                ],
+            )
+
     def get_turn(self, turn_id: str) -> Turn | None:
         """Retrieve a single turn by ID."""
-        cur = self._db.execute(
+        rows = self._db.read(
             "SELECT turn_id, role, text, created_at FROM turns WHERE turn_id = ?",
             (turn_id,),
         )
-        row = cur.fetchone()
-        if row is None:
+        if not rows:
             return None
-        return self._row_to_turn(row)
+        return self._row_to_turn(rows[0])
 
     def get_recent(self, n: int = 20) -> list[Turn]:
         """Return the N most recent turns, ordered oldest-first."""
-        cur = self._db.execute(
+        rows = self._db.read(
             "SELECT turn_id, role, text, created_at FROM turns "
             "ORDER BY created_at DESC LIMIT ?",
             (n,),
         )
-        rows = cur.fetchall()
         return [self._row_to_turn(r) for r in reversed(rows)]
 
     def get_all(self) -> list[Turn]:
         """Return all turns, ordered by created_at."""
-        cur = self._db.execute(
+        rows = self._db.read(
             "SELECT turn_id, role, text, created_at FROM turns ORDER BY created_at"
         )
-        return [self._row_to_turn(r) for r in cur.fetchall()]
+        return [self._row_to_turn(r) for r in rows]
+
+    def delete_turns(self, turn_ids: Iterable[str]) -> int:
+        """Delete turns by ID, returning how many existed.
+
+        Their chunks must be deleted first, through the retriever;
+        otherwise the foreign key check fails with
+        ``sqlite3.IntegrityError``.
+        """
+        with self._db.transaction():
+            cur = self._db.executemany(
+                "DELETE FROM turns WHERE turn_id = ?", [(t,) for t in turn_ids]
+            )
+        return cur.rowcount
 
     def count(self) -> int:
         """Return total number of stored turns."""
-        cur = self._db.execute("SELECT COUNT(*) FROM turns")
-        return cur.fetchone()[0]
+        return self._db.read("SELECT COUNT(*) FROM turns")[0][0]
 
     @staticmethod
     def _row_to_turn(row: tuple) -> Turn:
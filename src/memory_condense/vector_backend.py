@@ -0,0 +1,572 @@
+from __future__ import annotations
+
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import hnswlib
+import numpy as np
+
+from memory_condense.embedding_store import EmbeddingStore
+
+BACKENDS = ("hnsw", "exact", "auto", "ivfpq")
+
+# Rows assigned or encoded per step, bounding scratch memory.
+_ENCODE_BLOCK = 16_384
+
+
+class _ReadWriteLock:
+    """Many concurrent readers or one exclusive writer (writer-preferring)."""
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._readers = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        with self._cond:
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        # Holding the condition blocks new readers until the write is done
+        with self._cond:
+            self._cond.wait_for(lambda: not self._readers)
+            yield
+
+
+class VectorBackend(ABC):
+    """Cosine nearest-neighbour search over vectors addressed by label.
+
+    Labels are rows of the retriever's ``EmbeddingStore``. Writes come
+    from one thread at a time (the retriever's lock); ``search`` may run
+    concurrently with them and with other searches.
+    """
+
+    name: str
+    # Whether search scores are exact cosine similarities
+    exact: bool
+    # Whether ``save`` writes anything (otherwise rebuilt from the store)
+    persistent: bool
+
+    @abstractmethod
+    def add(self, vectors: np.ndarray, labels: np.ndarray) -> None:
+        """Index ``vectors`` (n, dim) under ``labels`` (n,)."""
+
+    @abstractmethod
+    def mark_deleted(self, label: int) -> bool:
+        """Exclude ``label`` from results; False if it was not searchable."""
+
+    @abstractmethod
+    def labels(self) -> np.ndarray:
+        """Every label added, including ones marked deleted."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of labels added, including ones marked deleted."""
+
+    @abstractmethod
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        ef_search: int = 50,
+        num_threads: int = -1,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Top-``k`` (labels, cosine similarities) per query row, best first.
+
+        Both arrays are (n_queries, k); ``k`` must not exceed the number
+        of labels not marked deleted. Slots with no match carry label -1.
+        """
+
+    def save(self, path: Path) -> None:
+        """Write the index to ``path``, for backends that persist one."""
+
+
+class HnswBackend(VectorBackend):
+    """Approximate search with an hnswlib graph.
+
+    Capacity starts at ``max_elements`` and doubles as needed; resizes
+    wait for in-flight searches to finish.
+    """
+
+    name = "hnsw"
+    exact = False
+    persistent = True
+
+    def __init__(
+        self,
+        dim: int,
+        max_elements: int = 100_000,
+        ef_construction: int = 200,
+        M: int = 16,
+        path: Path | None = None,
+    ) -> None:
+        self._max_elements = max_elements
+        self._index = hnswlib.Index(space="cosine", dim=dim)
+        if path is not None:
+            self._index.load_index(str(path))
+        else:
+            self._index.init_index(
+                max_elements=max_elements, ef_construction=ef_construction, M=M
+            )
+        # Lets searches run concurrently but never during an index resize
+        self._resize_guard = _ReadWriteLock()
+
+    def add(self, vectors: np.ndarray, labels: np.ndarray) -> None:
+        if not len(labels):
+            return
+        needed = self._index.get_current_count() + len(labels)
+        if needed > self._index.get_max_elements():
+            with self._resize_guard.write():
+                self._index.resize_index(max(needed * 2, self._max_elements))
+        self._index.add_items(vectors, labels)
+
+    def mark_deleted(self, label: int) -> bool:
+        try:
+            self._index.mark_deleted(label)
+        except RuntimeError:
+            return False  # unknown, or already marked deleted
+        return True
+
+    def labels(self) -> np.ndarray:
+        return np.array(self._index.get_ids_list(), dtype=np.int64)
+
+    def __len__(self) -> int:
+        return self._index.get_current_count()
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        ef_search: int = 50,
+        num_threads: int = -1,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        with self._resize_guard.read():
+            self._index.set_ef(max(ef_search, k))
+            try:
+                labels, distances = self._index.knn_query(
+                    queries, k=k, num_threads=num_threads
+                )
+            except RuntimeError:
+                # Too few reachable undeleted neighbours; search exhaustively
+                self._index.set_ef(len(self))
+                labels, distances = self._index.knn_query(
+                    queries, k=k, num_threads=num_threads
+                )
+        # hnswlib cosine distance = 1 - cosine_similarity
+        return labels.astype(np.int64), 1.0 - distances
+
+    def save(self, path: Path) -> None:
+        self._index.save_index(str(path))
+
+
+class ExactBackend(VectorBackend):
+    """Brute-force cosine search straight over the embedding store.
+
+    Nothing is copied: a search is one matrix product against the
+    store's contiguous rows (in blocks of ``block_rows``), divided by
+    per-row norms computed when labels are added. Labels that were never
+    added or were deleted are masked out. Exact, and for small stores
+    faster than walking an HNSW graph; cost grows linearly with size.
+    """
+
+    name = "exact"
+    exact = True
+    persistent = False
+
+    def __init__(self, store: EmbeddingStore, block_rows: int = 16_384) -> None:
+        self._store = store
+        self._block_rows = block_rows
+        # Indexed by label; a norm of 0 marks a label as not searchable
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._added = np.zeros(0, dtype=bool)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def add(self, vectors: np.ndarray, labels: np.ndarray) -> None:
+        if not len(labels):
+            return
+        labels = np.asarray(labels, dtype=np.int64)
+        norms = np.linalg.norm(np.asarray(vectors, dtype=np.float32), axis=1)
+        with self._lock:
+            end = int(labels.max()) + 1
+            if end > len(self._norms):
+                size = max(end, 2 * len(self._norms))
+                self._norms = np.concatenate(
+                    [self._norms, np.zeros(size - len(self._norms), dtype=np.float32)]
+                )
+                self._added = np.concatenate(
+                    [self._added, np.zeros(size - len(self._added), dtype=bool)]
+                )
+            self._count += int((~self._added[labels]).sum())
+            self._added[labels] = True
+            # Zero vectors can never score above 0; keep them unmatchable
+            self._norms[labels] = np.where(norms > 0, norms, 0.0)
+
+    def mark_deleted(self, label: int) -> bool:
+        with self._lock:
+            if label >= len(self._norms) or not self._norms[label]:
+                return False
+            self._norms[label] = 0.0
+            return True
+
+    def labels(self) -> np.ndarray:
+        return np.flatnonzero(self._added).astype(np.int64)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        ef_search: int = 50,
+        num_threads: int = -1,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        queries = np.asarray(queries, dtype=np.float32)
+        queries = queries / np.maximum(
+            np.linalg.norm(queries, axis=1, keepdims=True), 1e-12
+        )
+        norms = self._norms  # replaced, never resized in place
+        end = min(len(norms), len(self._store))
+        sims = np.full((len(queries), end), -np.inf, dtype=np.float32)
+        for start in range(0, end, self._block_rows):
+            stop = min(start + self._block_rows, end)
+            block_norms = norms[start:stop]
+            dots = self._store.dot(queries, start, stop)
+            np.divide(
+                dots, block_norms, out=sims[:, start:stop], where=block_norms > 0
+            )
+
+        k = min(k, end)
+        if k == 0:
+            empty = np.empty((len(queries), 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        top_sims = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_sims, axis=1, kind="stable")
+        labels = np.take_along_axis(top, order, axis=1).astype(np.int64)
+        top_sims = np.take_along_axis(top_sims, order, axis=1)
+        # Deleted and never-added labels were left at -inf
+        labels[~np.isfinite(top_sims)] = -1
+        return labels, top_sims
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+
+
+def _kmeans(
+    data: np.ndarray, k: int, iterations: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Lloyd's k-means; returns (k, dim) centroids.
+
+    Empty clusters are reseeded from random points.
+    """
+    centroids = data[rng.choice(len(data), k, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _nearest(data, centroids)
+        counts = np.bincount(assign, minlength=k)
+        order = np.argsort(assign, kind="stable")
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        filled = counts > 0
+        centroids[filled] = (
+            np.add.reduceat(data[order], starts[filled]) / counts[filled, None]
+        )
+        empty = ~filled
+        if empty.any():
+            centroids[empty] = data[rng.choice(len(data), int(empty.sum()))]
+    return centroids.astype(np.float32)
+
+
+def _nearest(data: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the nearest centroid (squared L2) for every row of ``data``."""
+    half_norms = 0.5 * (centroids * centroids).sum(axis=1)
+    out = np.empty(len(data), dtype=np.int64)
+    for start in range(0, len(data), _ENCODE_BLOCK):
+        block = data[start : start + _ENCODE_BLOCK]
+        out[start : start + len(block)] = np.argmax(
+            block @ centroids.T - half_norms, axis=1
+        )
+    return out
+
+
+class IvfPqBackend(VectorBackend):
+    """Inverted-file index over product-quantized codes, NumPy only.
+
+    Vectors are normalized, assigned to the nearest of ``nlist`` coarse
+    k-means centroids, and their residual is encoded as ``m`` one-byte
+    codes (one per ``dim / m``-wide subspace, 256 centroids each). RAM
+    holds only the codes, a 4-byte label and a tombstone byte per chunk;
+    full vectors stay in the memory-mapped store. A search scans the
+    ``nprobe`` closest lists with a per-query lookup table, then re-ranks
+    the best ``rerank`` x k candidates by exact cosine against the store,
+    so returned scores are exact even though recall is approximate.
+
+    The quantizers need training. Until ``train`` is called, or
+    ``train_size`` vectors have been added (which trains on a sample of
+    them), added labels are searched exactly; training encodes them all.
+    ``nlist`` defaults to about 4 x sqrt(n) of the training sample and
+    ``m`` to dim / 16.
+    """
+
+    name = "ivfpq"
+    exact = True
+    persistent = True
+
+    def __init__(
+        self,
+        store: EmbeddingStore,
+        nlist: int | None = None,
+        m: int | None = None,
+        nprobe: int = 16,
+        rerank: int = 10,
+        train_size: int = 50_000,
+        iterations: int = 15,
+        seed: int = 0,
+    ) -> None:
+        m = m or max(store.dim // 16, 1)
+        if store.dim % m:
+            raise ValueError(f"m must divide dim {store.dim}, got {m}")
+        self._store = store
+        self._nlist = nlist
+        self._m = m
+        self._nprobe = nprobe
+        self._rerank = rerank
+        self._train_size = train_size
+        self._iterations = iterations
+        self._seed = seed
+
+        self._centroids: np.ndarray | None = None  # (nlist, dim)
+        self._codebooks: np.ndarray | None = None  # (m, 256, dim / m)
+        # Per inverted list: (labels, codes) parts, merged on first read
+        self._lists: list[list[tuple[np.ndarray, np.ndarray]]] = []
+        # Tombstones, indexed by label
+        self._deleted = np.zeros(0, dtype=bool)
+        self._count = 0
+        # Labels added before training, searched exactly
+        self._pending = ExactBackend(store)
+        self._lock = threading.RLock()
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    def train(self, sample: np.ndarray) -> None:
+        """Fit the coarse and product quantizers to ``sample`` (n, dim).
+
+        Everything already added is (re-)encoded under the new
+        quantizers, reading its vectors back from the store.
+        """
+        sample = _normalize(sample)
+        rng = np.random.default_rng(self._seed)
+        nlist = self._nlist or int(4 * np.sqrt(len(sample)))
+        nlist = max(min(nlist, len(sample)), 1)
+        centroids = _kmeans(sample, nlist, self._iterations, rng)
+
+        residuals = sample - centroids[_nearest(sample, centroids)]
+        sub = self._store.dim // self._m
+        ksub = min(256, len(sample))
+        codebooks = np.zeros((self._m, 256, sub), dtype=np.float32)
+        for j in range(self._m):
+            part = np.ascontiguousarray(residuals[:, j * sub : (j + 1) * sub])
+            codebooks[j, :ksub] = _kmeans(part, ksub, self._iterations, rng)
+
+        with self._lock:
+            labels = np.sort(self.labels())
+            self._centroids, self._codebooks = centroids, codebooks
+            self._lists = [[] for _ in range(len(centroids))]
+            self._pending = ExactBackend(self._store)
+            for start in range(0, len(labels), _ENCODE_BLOCK):
+                block = labels[start : start + _ENCODE_BLOCK]
+                self._encode(self._store.vectors(block), block)
+
+    def _encode(self, vectors: np.ndarray, labels: np.ndarray) -> None:
+        """Quantize vectors and append them to their inverted lists."""
+        vectors = _normalize(vectors)
+        assign = _nearest(vectors, self._centroids)
+        residuals = vectors - self._centroids[assign]
+        sub = self._store.dim // self._m
+        codes = np.empty((len(vectors), self._m), dtype=np.uint8)
+        for j in range(self._m):
+            codes[:, j] = _nearest(
+                np.ascontiguousarray(residuals[:, j * sub : (j + 1) * sub]),
+                self._codebooks[j],
+            )
+
+        order = np.argsort(assign, kind="stable")
+        bounds = np.searchsorted(assign[order], np.arange(len(self._lists) + 1))
+        labels = np.asarray(labels).astype(np.int32)
+        with self._lock:
+            for lst in np.flatnonzero(np.diff(bounds)).tolist():
+                rows = order[bounds[lst] : bounds[lst + 1]]
+                self._lists[lst].append((labels[rows], codes[rows]))
+
+    def _list(
+        self, lst: int, lists: list[list[tuple[np.ndarray, np.ndarray]]] | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """(labels, codes) of one inverted list, of ``lists`` if given."""
+        with self._lock:
+            parts = (self._lists if lists is None else lists)[lst]
+            if not parts:
+                return np.empty(0, np.int32), np.empty((0, self._m), np.uint8)
+            if len(parts) > 1:
+                parts[:] = [
+                    (
+                        np.concatenate([p[0] for p in parts]),
+                        np.concatenate([p[1] for p in parts]),
+                    )
+                ]
+            return parts[0]
+
+    def _grow(self, end: int) -> None:
+        """Make room for tombstones of labels below ``end``."""
+        if end > len(self._deleted):
+            grown = np.zeros(max(end, 2 * len(self._deleted)), dtype=bool)
+            grown[: len(self._deleted)] = self._deleted
+            self._deleted = grown
+
+    def add(self, vectors: np.ndarray, labels: np.ndarray) -> None:
+        if not len(labels):
+            return
+        labels = np.asarray(labels, dtype=np.int64)
+        with self._lock:
+            self._grow(int(labels.max()) + 1)
+            self._count += len(labels)
+            if self.trained:
+                self._encode(vectors, labels)
+                return
+            self._pending.add(vectors, labels)
+            if len(self._pending) >= self._train_size:
+                rng = np.random.default_rng(self._seed)
+                sample = rng.choice(
+                    self._pending.labels(), self._train_size, replace=False
+                )
+                self.train(self._store.vectors(np.sort(sample)))
+
+    def mark_deleted(self, label: int) -> bool:
+        with self._lock:
+            if label >= len(self._deleted) or self._deleted[label]:
+                return False
+            self._deleted[label] = True
+            self._pending.mark_deleted(label)
+            return True
+
+    def labels(self) -> np.ndarray:
+        with self._lock:
+            parts = [self._pending.labels()]
+            parts += [self._list(lst)[0] for lst in range(len(self._lists))]
+            return np.concatenate(parts).astype(np.int64)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        ef_search: int = 50,
+        num_threads: int = -1,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        # Quantizers, lists and tombstones are taken together, so a
+        # concurrent train() or add() cannot mix generations; labels
+        # added since then are past the end of ``deleted`` and live.
+        with self._lock:
+            pending = self._pending
+            centroids, codebooks = self._centroids, self._codebooks
+            lists, deleted = self._lists, self._deleted
+        if centroids is None:
+            return pending.search(queries, k)
+        queries = _normalize(queries)
+        sub = self._store.dim // self._m
+        subspaces = np.arange(self._m)
+        nprobe = min(self._nprobe, len(centroids))
+
+        labels = np.full((len(queries), k), -1, dtype=np.int64)
+        sims = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for row, query in enumerate(queries):
+            coarse = centroids @ query
+            probe = np.argpartition(-coarse, nprobe - 1)[:nprobe]
+            # Inner product of the query with every codeword, per subspace;
+            # a code's approximate similarity is its list's centroid score
+            # plus one table lookup per subspace.
+            table = np.einsum("jcs,js->jc", codebooks, query.reshape(self._m, sub))
+
+            found, approx = [], []
+            for lst in probe.tolist():
+                list_labels, codes = self._list(lst, lists)
+                found.append(list_labels)
+                approx.append(coarse[lst] + table[subspaces, codes].sum(axis=1))
+            found = np.concatenate(found).astype(np.int64)
+            approx = np.concatenate(approx)
+            live = found >= len(deleted)
+            live[~live] = ~deleted[found[~live]]
+            found, approx = found[live], approx[live]
+            if not len(found):
+                continue
+
+            fetch = min(k * self._rerank, len(found))
+            if fetch < len(found):
+                found = found[np.argpartition(-approx, fetch - 1)[:fetch]]
+            found = np.sort(found)  # sequential reads from the store
+            exact = self._store.score(query, found)
+            order = np.argsort(-exact, kind="stable")[:k]
+            labels[row, : len(order)] = found[order]
+            sims[row, : len(order)] = exact[order]
+        return labels, sims
+
+    def save(self, path: Path) -> None:
+        with self._lock:
+            arrays = {
+                "pending": self._pending.labels(),
+                "deleted": np.flatnonzero(self._deleted),
+            }
+            if self.trained:
+                merged = [self._list(lst) for lst in range(len(self._lists))]
+                arrays.update(
+                    centroids=self._centroids,
+                    codebooks=self._codebooks,
+                    lengths=np.array([len(l) for l, _ in merged], dtype=np.int64),
+                    labels=np.concatenate([l for l, _ in merged]),
+                    codes=np.concatenate([c for _, c in merged]),
+                )
+        # A file object stops numpy from appending ".npz" to the name
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: Path, store: EmbeddingStore, **options) -> IvfPqBackend:
+        """Restore a backend written by ``save``; ``options`` as for __init__."""
+        backend = cls(store, **options)
+        with np.load(path) as saved:
+            pending, deleted = saved["pending"], saved["deleted"]
+            labels = np.empty(0, dtype=np.int32)
+            if "centroids" in saved:
+                backend._centroids = saved["centroids"]
+                backend._codebooks = saved["codebooks"]
+                backend._m = len(backend._codebooks)
+                labels, codes = saved["labels"], saved["codes"]
+                bounds = np.concatenate([[0], np.cumsum(saved["lengths"])])
+                backend._lists = [
+                    [(labels[a:b], codes[a:b])] if b > a else []
+                    for a, b in zip(bounds[:-1].tolist(), bounds[1:].tolist())
+                ]
+        backend._pending.add(store.vectors(pending), pending)
+        everything = np.concatenate([labels, pending, deleted])
+        backend._grow(int(everything.max(initial=-1)) + 1)
+        backend._deleted[deleted] = True
+        for label in deleted.tolist():
+            backend._pending.mark_deleted(label)
+        backend._count = len(labels) + len(pending)
+        return backend
@@ -1,11 +1,69 @@
 from __future__ import annotations
 
+import hashlib
 import tempfile
 from pathlib import Path
 
+import numpy as np
 import pytest
 
 from memory_condense.db import Database
+from memory_condense.embedding import EmbeddingService, SparseHead
+
+
+class FakeSentenceModel:
+    """Deterministic stand-in for SentenceTransformer.
+
+    Each text maps to a fixed unit vector seeded from its SHA-1, so
+    identical texts embed identically across processes. Records the
+    size of every ``encode`` call in ``calls``.
+    """
+
+    def __init__(self, dim: int = 1024) -> None:
+        self.dim = dim
+        self.calls: list[int] = []
+
+    def encode(
+        self,
+        texts,
+        batch_size=32,
+        normalize_embeddings=False,
+        output_value="sentence_embedding",
+        **kwargs,
+    ):
+        self.calls.append(len(texts))
+        vecs = np.empty((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            vecs[i] = _unit_vector(text, self.dim)
+        if output_value is None:
+            return [self._features(text, vec) for text, vec in zip(texts, vecs)]
+        return vecs
+
+    def _features(self, text: str, vec: np.ndarray) -> dict:
+        """All outputs for one text, shaped like SentenceTransformer's.
+
+        Token ids are word hashes wrapped in <s>=0 and </s>=2, padded with
+        two pad (1) tokens that the attention mask excludes.
+        """
+        words = [w.strip(".,:;!?()").lower() for w in text.split()]
+        ids = [0] + [_word_id(w) for w in words if w] + [2]
+        n = len(ids)
+        return {
+            "input_ids": np.array(ids + [1, 1]),
+            "attention_mask": np.array([1] * n + [0, 0]),
+            "token_embeddings": np.ones((n + 2, self.dim), dtype=np.float32),
+            "sentence_embedding": vec,
+        }
+
+
+def _unit_vector(text: str, dim: int) -> np.ndarray:
+    seed = int.from_bytes(hashlib.sha1(text.encode()).digest()[:4], "little")
+    vec = np.random.default_rng(seed).standard_normal(dim)
+    return vec / np.linalg.norm(vec)
+
+
+def _word_id(word: str) -> int:
+    return 4 + int.from_bytes(hashlib.sha1(word.encode()).digest()[:3], "little")
 
 
 @pytest.fixture
@@ -18,3 +76,19 @@ def db(tmp_dir: Path) -> Database:
     d = Database(tmp_dir / "test.db")
     yield d
     d.close()
+
+
+@pytest.fixture
+def fake_model(monkeypatch) -> FakeSentenceModel:
+    """Patch EmbeddingService to use FakeSentenceModel instead of bge-m3."""
+    model = FakeSentenceModel()
+    monkeypatch.setattr(EmbeddingService, "_load_model", lambda self: model)
+    return model
+
+
+@pytest.fixture
+def fake_sparse(fake_model, monkeypatch) -> SparseHead:
+    """Give every non-special fake token lexical weight 1.0."""
+    head = SparseHead(np.zeros(fake_model.dim), 1.0, skip_ids=(0, 1, 2, 3))
+    monkeypatch.setattr(EmbeddingService, "_load_sparse_head", lambda self: head)
+    return head
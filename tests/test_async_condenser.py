@@ -0,0 +1,101 @@
+"""AsyncMemoryCondenser tests, driven with asyncio.run and the fake encoder."""
+
+import asyncio
+
+import pytest
+
+from memory_condense import AsyncMemoryCondenser
+
+
+def _open(tmp_dir, **kwargs) -> AsyncMemoryCondenser:
+    return AsyncMemoryCondenser(
+        data_dir=tmp_dir / "amc",
+        chunker_min_tokens=5,
+        chunker_max_tokens=50,
+        **kwargs,
+    )
+
+
+def test_ingest_and_search(tmp_dir, fake_model):
+    async def run():
+        async with _open(tmp_dir) as amc:
+            turn, chunks = await amc.ingest("user", "The staging database is Postgres.")
+            assert chunks and chunks[0].turn_id == turn.turn_id
+            hits = await amc.search(chunks[0].text, k=1)
+            assert hits[0].chunk.chunk_id == chunks[0].chunk_id
+
+    asyncio.run(run())
+
+
+def test_concurrent_ingests_are_coalesced_and_ordered(tmp_dir, fake_model):
+    async def run():
+        async with _open(tmp_dir) as amc:
+            texts = [f"Concurrent message number {i}." for i in range(30)]
+            results = await asyncio.gather(*(amc.ingest("user", t) for t in texts))
+            assert [turn.text for turn, _ in results] == texts
+            assert amc.condenser.transcript.count() == 30
+        return sum(fake_model.calls)
+
+    assert asyncio.run(run()) == 30
+    # Queued requests share ingest_many calls rather than one encode each
+    assert len(fake_model.calls) < 30
+
+
+def test_searches_run_during_ingest(tmp_dir, fake_model):
+    async def run():
+        async with _open(tmp_dir) as amc:
+            await amc.ingest("user", "Seed memory about the deploy key.")
+            ingest = asyncio.gather(
+                *(amc.ingest("user", f"Background turn {i}.") for i in range(20))
+            )
+            searches = await asyncio.gather(
+                *(amc.search("deploy key", k=1) for _ in range(10))
+            )
+            await ingest
+            assert all(len(hits) == 1 for hits in searches)
+
+    asyncio.run(run())
+
+
+def test_ingest_nowait_backpressure(tmp_dir, fake_model):
+    async def run():
+        async with _open(tmp_dir, max_pending_ingests=2) as amc:
+            first = amc.ingest_nowait("user", "One.")
+            second = amc.ingest_nowait("user", "Two.")
+            with pytest.raises(asyncio.QueueFull):
+                amc.ingest_nowait("user", "Three.")
+            assert amc.pending_ingests == 2
+            turn, _ = await first
+            await second
+            assert turn.text == "One."
+
+    asyncio.run(run())
+
+
+def test_write_errors_reach_callers(tmp_dir, fake_model):
+    async def run():
+        async with _open(tmp_dir) as amc:
+            with pytest.raises(Exception):
+                await amc.ingest("robot", "Invalid role.")
+            turn, _ = await amc.ingest("user", "Still works.")
+            assert turn.text == "Still works."
+
+    asyncio.run(run())
+
+
+def test_invalid_request_fails_only_its_caller(tmp_dir, fake_model):
+    async def run():
+        async with _open(tmp_dir) as amc:
+            texts = [f"Valid message number {i}." for i in range(5)]
+            results = await asyncio.gather(
+                *(amc.ingest("user", t) for t in texts[:2]),
+                amc.ingest("robot", "Invalid role."),
+                *(amc.ingest("user", t) for t in texts[2:]),
+                return_exceptions=True,
+            )
+            assert isinstance(results[2], Exception)
+            stored = [r for i, r in enumerate(results) if i != 2]
+            assert [turn.text for turn, _ in stored] == texts
+            assert amc.condenser.transcript.count() == 5
+
+    asyncio.run(run())
@@ -1,6 +1,7 @@
 import pytest
 
-from memory_condense.chunker import Chunker
+from memory_condense._tokenizer import count_tokens, token_end_offsets
+from memory_condense.chunker import Chunker, ParallelChunker
 
 
 @pytest.fixture
@@ -65,3 +66,98 @@ def test_long_text_splits():
     # Each chunk should respect max_tokens (approximately)
     for chunk in chunks:
         assert chunk.token_count <= 20  # some margin for merge edge cases
+
+
+def test_token_counts_match_tokenizer():
+    chunker = Chunker(min_tokens=5, max_tokens=40)
+    text = (
+        "Tokenization is computed once per turn. "
+        "Counts for sentences are derived from token offsets; "
+        "they should agree closely with encoding each chunk on its own. "
+        "Unicode like naïve café 日本語 must not shift the offsets."
+    )
+    for chunk in chunker.chunk_turn("t1", text):
+        assert abs(chunk.token_count - count_tokens(chunk.text)) <= 2
+
+
+def test_hard_split_respects_budget():
+    chunker = Chunker(min_tokens=3, max_tokens=20)
+    text = " ".join(f"word{i}" for i in range(300))  # no punctuation at all
+    chunks = chunker.chunk_turn("t1", text)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk.token_count <= 20
+    assert " ".join(c.text for c in chunks).split() == text.split()
+
+
+def test_token_end_offsets():
+    text = "Hello world. naïve 日本"
+    ends = token_end_offsets(text)
+    assert ends[-1] == len(text)
+    assert list(ends) == sorted(ends)
+    assert len(ends) == count_tokens(text)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Hello world.   Hello world.\n\nHello world.",
+        "  Leading space. Repeated. Repeated. Repeated.  ",
+        "One clause; another clause, and a third, " * 20 + "done.",
+        " ".join(f"word{i}" for i in range(300)),
+        "Line one\nLine two.\tTabbed sentence.  Mr. Smith went home.",
+    ],
+)
+def test_chunk_text_is_exact_source_slice(text):
+    chunker = Chunker(min_tokens=3, max_tokens=20)
+    chunks = chunker.chunk_turn("t1", text)
+    assert chunks
+    for chunk in chunks:
+        assert text[chunk.start_char : chunk.end_char] == chunk.text
+        assert chunk.text == chunk.text.strip()
+    for prev, nxt in zip(chunks, chunks[1:]):
+        assert prev.end_char <= nxt.start_char
+
+
+def test_sentence_spans_match_pysbd_char_spans():
+    import pysbd
+
+    text = (
+        "Dr. Smith arrived at 5 p.m. on Jan. 3rd.  He said hi. He said hi.\n\n"
+        "Then he left... Quickly! Did he? Yes.   "
+    )
+    reference = pysbd.Segmenter(language="en", clean=False, char_span=True)
+    expected = [
+        (span.start + len(span.sent) - len(span.sent.lstrip()),
+         span.start + len(span.sent.rstrip()))
+        for span in reference.segment(text)
+        if span.sent.strip()
+    ]
+    assert Chunker()._sentence_spans(text) == expected
+
+
+def _spans(chunks):
+    return [(c.turn_id, c.text, c.start_char, c.end_char, c.token_count) for c in chunks]
+
+
+def test_parallel_chunker_matches_serial_order():
+    turns = [
+        (f"t{i}", f"Turn {i} opens here. " + "It keeps going for a while. " * (i % 7))
+        for i in range(25)
+    ]
+    serial = Chunker(min_tokens=5, max_tokens=20)
+    expected = [_spans(serial.chunk_turn(tid, text)) for tid, text in turns]
+
+    with ParallelChunker(min_tokens=5, max_tokens=20, workers=2, batch_size=4) as pc:
+        got = pc.chunk_turns(turns)
+        assert pc._pool is not None
+
+    assert [_spans(chunks) for chunks in got] == expected
+
+
+def test_parallel_chunker_small_batch_stays_in_process():
+    with ParallelChunker(workers=4, batch_size=8) as pc:
+        result = pc.chunk_turns([("t1", "Just one turn."), ("t2", "")])
+        assert pc._pool is None
+    assert len(result) == 2
+    assert result[1] == []
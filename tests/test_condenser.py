@@ -0,0 +1,314 @@
+"""MemoryCondenser tests using a deterministic fake encoder (no model download)."""
+
+import threading
+
+import numpy as np
+import pytest
+
+from memory_condense import MemoryCondenser
+from memory_condense.embedding import EmbeddingService
+from memory_condense.embedding_cache import cache_key
+
+
+@pytest.fixture
+def mc(tmp_dir, fake_model):
+    with MemoryCondenser(
+        data_dir=tmp_dir / "mc", chunker_min_tokens=5, chunker_max_tokens=50
+    ) as condenser:
+        yield condenser
+
+
+def test_ingest_many_returns_pairs_in_order(mc):
+    turns = [
+        ("user", "My name is Alex."),
+        ("assistant", "Nice to meet you, Alex!"),
+        ("user", ""),
+        ("user", "I prefer Python and SQLite for storage."),
+    ]
+    results = mc.ingest_many(turns)
+
+    assert [t.text for t, _ in results] == [text for _, text in turns]
+    assert results[2][1] == []
+    for turn, chunks in results:
+        for chunk in chunks:
+            assert chunk.turn_id == turn.turn_id
+            assert chunk.embedding is not None
+    assert mc.transcript.count() == 4
+
+
+def test_ingest_many_single_encode_call(mc, fake_model):
+    turns = [("user", f"Message number {i} about topic {i}.") for i in range(20)]
+    mc.ingest_many(turns)
+    assert fake_model.calls == [20]
+
+
+def test_ingest_many_embeds_outside_the_write_transaction(mc, monkeypatch):
+    embed_chunks = mc.embedder.embed_chunks
+    written = []
+
+    def embed_while_writing(chunks):
+        writer = threading.Thread(
+            target=lambda: written.append(mc.transcript.append("user", "Meanwhile."))
+        )
+        writer.start()
+        writer.join(timeout=5)
+        return embed_chunks(chunks)
+
+    monkeypatch.setattr(mc.embedder, "embed_chunks", embed_while_writing)
+    [(turn, chunks)] = mc.ingest_many([("user", "The deploy key lives in vault.")])
+    # Another writer was not held up by the model call
+    assert written and chunks
+    assert mc.transcript.count() == 2
+
+
+def test_ingest_many_searchable(mc):
+    results = mc.ingest_many(
+        [("user", "The deploy key lives in vault."), ("assistant", "Noted.")]
+    )
+    target = results[0][1][0]
+    hits = mc.search(target.text, k=1)
+    assert hits[0].chunk.chunk_id == target.chunk_id
+
+
+def test_ingest_many_empty(mc):
+    assert mc.ingest_many([]) == []
+
+
+def test_ingest_many_parallel_chunking(tmp_dir, fake_model):
+    turns = [("user", f"Parallel message {i}. It has two sentences.") for i in range(80)]
+    with MemoryCondenser(
+        data_dir=tmp_dir / "par",
+        chunker_min_tokens=5,
+        chunker_max_tokens=50,
+        chunk_workers=2,
+    ) as mc:
+        results = mc.ingest_many(turns)
+        assert mc._parallel_chunker._pool is not None
+
+    assert [t.text for t, _ in results] == [text for _, text in turns]
+    for turn, chunks in results:
+        assert chunks and all(c.turn_id == turn.turn_id for c in chunks)
+
+
+def test_embedding_cache_persists_across_sessions(tmp_dir, fake_model):
+    turns = [("user", "Traceback: KeyError 'token'."), ("user", "Fixed it.")]
+    with MemoryCondenser(data_dir=tmp_dir / "cache") as mc:
+        mc.ingest_many(turns)
+    assert (tmp_dir / "cache" / "embedding_cache.db").exists()
+
+    with MemoryCondenser(data_dir=tmp_dir / "cache") as mc:
+        mc.ingest_many(turns)
+        stats = mc.embedding_cache_stats()
+    assert fake_model.calls == [2]
+    assert stats.hits == 2 and stats.misses == 0
+
+
+def test_embedding_cache_disabled(tmp_dir, fake_model):
+    with MemoryCondenser(data_dir=tmp_dir / "nocache", embedding_cache=False) as mc:
+        mc.ingest_many([("user", "Same."), ("user", "Same.")])
+        assert mc.embedding_cache_stats() is None
+    assert fake_model.calls == [2]
+
+
+def test_search_cache_hits_until_new_chunks(mc, fake_model):
+    mc.ingest_many([("user", "The deploy key lives in vault.")])
+    first = mc.search("where is the deploy key", k=1)
+    calls = len(fake_model.calls)
+
+    assert mc.search("where is  the deploy key ", k=1) == first
+    assert len(fake_model.calls) == calls
+    stats = mc.search_cache_stats()
+    assert stats.result_hits == 1
+
+    mc.ingest("user", "The deploy key was rotated to a new vault path.")
+    calls = len(fake_model.calls)
+    again = mc.search("where is the deploy key", k=2)
+    assert len(again) == 2
+    # New generation: ANN search reruns, but the query embedding is reused
+    assert len(fake_model.calls) == calls
+    assert mc.search_cache_stats().embedding_hits >= 1
+
+
+def test_search_by_embedding_shares_the_search_cache(mc, fake_model):
+    mc.ingest_many([("user", "The deploy key lives in vault.")])
+    query = "where is the deploy key"
+    assert mc.cached_search(query, k=1) is None
+    assert mc.cached_query_embedding(query) is None
+
+    embedding = mc.embedder.embed_query(query)
+    results = mc.search_by_embedding(embedding, k=1, query=query)
+    assert results[0].chunk.text == "The deploy key lives in vault."
+    np.testing.assert_array_equal(mc.cached_query_embedding(query), embedding)
+    assert mc.cached_search(query, k=1) == results
+
+    calls = len(fake_model.calls)
+    assert mc.search(query, k=1) == results
+    assert len(fake_model.calls) == calls
+
+
+def test_search_cache_disabled(tmp_dir, fake_model):
+    with MemoryCondenser(data_dir=tmp_dir / "nosc", search_cache_size=0) as mc:
+        mc.ingest("user", "Cache me if you can.")
+        mc.search("cache", k=1)
+        mc.search("cache", k=1)
+        assert mc.search_cache_stats() is None
+    assert fake_model.calls[-2:] == [1, 1]
+
+
+def test_search_many_one_encode_per_batch(mc, fake_model):
+    results = mc.ingest_many(
+        [("user", f"Fact number {i} about project {i}.") for i in range(6)]
+    )
+    texts = [chunks[0].text for _, chunks in results]
+    calls = len(fake_model.calls)
+
+    hits = mc.search_many(texts, k=1)
+    assert fake_model.calls[calls:] == [6]
+    assert [h[0].chunk.text for h in hits] == texts
+    assert mc.search_many([]) == []
+
+
+def test_bulk_load_ingest(mc):
+    turns = [("user", f"Archived fact number {i}.") for i in range(50)]
+    with mc.bulk_load() as report:
+        results = mc.ingest_many(turns[:25])
+        results += mc.ingest_many(turns[25:])
+
+    assert report.turns == 50
+    assert report.chunks == report.indexed == 50
+    assert report.integrity_check == "ok"
+    target = results[7][1][0]
+    assert mc.search(target.text, k=1)[0].chunk.chunk_id == target.chunk_id
+
+
+def test_injected_embedder_is_shared_and_left_open(tmp_dir, fake_model):
+    embedder = EmbeddingService()
+    with MemoryCondenser(data_dir=tmp_dir / "a", embedder=embedder) as a:
+        a.ingest("user", "Shared embedders skip reloading the model.")
+        assert a._embedder is embedder
+        assert a.embedding_cache_stats() is None
+    with MemoryCondenser(data_dir=tmp_dir / "b", embedder=embedder) as b:
+        b.ingest("user", "A second store reuses it.")
+        assert len(b.search("second store", k=1)) == 1
+    assert not (tmp_dir / "a" / "embedding_cache.db").exists()
+
+
+def test_hybrid_search_matches_identifiers(tmp_dir, fake_sparse):
+    with MemoryCondenser(
+        data_dir=tmp_dir / "hybrid",
+        chunker_min_tokens=5,
+        chunker_max_tokens=50,
+        sparse=True,
+    ) as mc:
+        mc.ingest("user", "The deploy failed with error code ZX-4471 on staging.")
+        for i in range(20):
+            mc.ingest("assistant", f"Unrelated note number {i} about lunch plans.")
+
+        results = mc.search("ZX-4471", k=1, hybrid=True)
+        assert "ZX-4471" in results[0].chunk.text
+        assert mc.search("ZX-4471", k=1, hybrid=True) == results
+        assert len(mc._retriever.lexical_index) == 21
+
+
+def test_hybrid_search_requires_sparse(mc):
+    with pytest.raises(ValueError, match="sparse=True"):
+        mc.search("anything", hybrid=True)
+
+
+def test_keyword_auto_skips_embedder_for_lookups(mc, fake_model):
+    mc.ingest("user", "The deploy failed with error code ZX-4471 on staging.")
+    mc.ingest("assistant", "Dark mode is enabled in every app you use.")
+    calls = len(fake_model.calls)
+
+    hits = mc.search("ZX-4471", k=3, keyword="auto")
+    assert "ZX-4471" in hits[0].chunk.text
+    assert len(fake_model.calls) == calls
+
+    fused = mc.search("what are my display preferences", k=3, keyword="auto")
+    assert len(fake_model.calls) == calls + 1
+    assert fused
+
+    mc.search("dark mode ZX-4471", k=3, keyword="fuse")
+    # A lookup BM25 cannot answer falls back to fusing with dense results
+    assert mc.search("QQ-9999", k=3, keyword="auto")
+
+    stats = mc.keyword_stats()
+    assert stats.queries == 4
+    assert (stats.bm25_only, stats.fused, stats.dense_only) == (1, 2, 1)
+    assert stats.embedder_skip_rate == 0.25
+
+    with pytest.raises(ValueError, match="keyword"):
+        mc.search("x", keyword="bm25")
+
+
+def test_delete_turns_removes_them_from_search(mc):
+    (keep, kept), (drop, dropped) = mc.ingest_many(
+        [
+            ("user", "I prefer Python and SQLite for storage."),
+            ("user", "My passport number is ZX-4471, please remember it."),
+        ]
+    )
+    assert mc.search("ZX-4471", k=5, keyword="auto")
+
+    assert mc.delete_turns([drop.turn_id]) == 1
+    assert [t.turn_id for t in mc.transcript.get_all()] == [keep.turn_id]
+    dropped_ids = {c.chunk_id for c in dropped}
+    for keyword in ("off", "auto"):
+        hits = mc.search("passport number ZX-4471", k=5, keyword=keyword)
+        assert not {h.chunk.chunk_id for h in hits} & dropped_ids
+
+    report = mc.compact()
+    assert report.live_chunks == len(kept)
+    assert [h.chunk.chunk_id for h in mc.search("Python", k=5)] == [
+        c.chunk_id for c in kept
+    ]
+
+
+def test_failed_delete_turns_leaves_everything_in_place(mc, monkeypatch):
+    [(turn, chunks)] = mc.ingest_many([("user", "My passport number is ZX-4471.")])
+    store = mc._retriever.embedding_store
+    labels = [mc._retriever._chunk_id_to_label[c.chunk_id] for c in chunks]
+    vectors = np.array(store.vectors(labels))
+    generation = mc._retriever.generation
+
+    def boom(turn_ids):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(mc.transcript, "delete_turns", boom)
+    with pytest.raises(RuntimeError, match="disk full"):
+        mc.delete_turns([turn.turn_id])
+
+    assert mc._retriever.generation == generation
+    assert mc._retriever.deleted_fraction == 0.0
+    np.testing.assert_array_equal(store.vectors(labels), vectors)
+    hits = mc.search("passport number ZX-4471", k=5)
+    assert {h.chunk.chunk_id for h in hits} == {c.chunk_id for c in chunks}
+
+
+def test_delete_purges_cache_and_lexical_postings(tmp_dir, fake_sparse):
+    with MemoryCondenser(
+        data_dir=tmp_dir / "purge",
+        chunker_min_tokens=5,
+        chunker_max_tokens=50,
+        sparse=True,
+    ) as mc:
+        [(keep, _), (drop, dropped)] = mc.ingest_many(
+            [
+                ("user", "I prefer Python and SQLite for storage."),
+                ("user", "My passport number is ZX-4471, please remember it."),
+            ]
+        )
+        cache = mc._embedding_cache
+        model = mc._embedder._model_name
+        dropped_keys = [cache_key(model, c.text) for c in dropped]
+        assert set(cache.get_many(dropped_keys)) == set(dropped_keys)
+        postings = mc._retriever.lexical_index.postings
+
+        mc.delete_turns([drop.turn_id])
+
+        assert cache.get_many(dropped_keys) == {}
+        assert len(cache) == 1
+        assert len(mc._retriever.lexical_index) == 1
+        assert mc._retriever.lexical_index.postings < postings
+        hits = mc.search("ZX-4471", k=5, hybrid=True)
+        assert [h.chunk.turn_id for h in hits] == [keep.turn_id]
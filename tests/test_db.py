@@ -0,0 +1,239 @@
+import sqlite3
+import threading
+
+import pytest
+
+from memory_condense.db import _SCHEMA_SQL, Database
+from memory_condense.transcript_store import TranscriptStore
+
+
+def test_transaction_defers_commit(db):
+    store = TranscriptStore(db)
+    with db.transaction():
+        store.append("user", "one")
+        store.append("assistant", "two")
+        assert db.connection.in_transaction
+    assert not db.connection.in_transaction
+    assert store.count() == 2
+
+
+def test_transaction_rolls_back_on_error(db):
+    store = TranscriptStore(db)
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            store.append("user", "lost")
+            raise RuntimeError("boom")
+    assert store.count() == 0
+
+
+def test_nested_transaction_commits_once(db):
+    store = TranscriptStore(db)
+    with db.transaction():
+        with db.transaction():
+            store.append("user", "inner")
+        assert db.connection.in_transaction
+    assert store.count() == 1
+
+
+def test_commit_hooks_run_after_outermost_commit(db):
+    calls = []
+    with db.transaction():
+        with db.transaction():
+            db.after_commit(lambda: calls.append(db.connection.in_transaction))
+            db.after_rollback(lambda: calls.append("rolled back"))
+        assert calls == []
+    assert calls == [False]
+
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.after_commit(lambda: calls.append("committed"))
+            db.after_rollback(lambda: calls.append("rolled back"))
+            raise RuntimeError("boom")
+    assert calls == [False, "rolled back"]
+
+    db.after_commit(lambda: calls.append("now"))
+    assert calls[-1] == "now"
+
+
+def _in_thread(fn):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("value", fn()))
+    thread.start()
+    thread.join(timeout=5)
+    assert not thread.is_alive(), "read blocked behind the writer"
+    return result["value"]
+
+
+def test_reads_do_not_block_on_open_transaction(db):
+    store = TranscriptStore(db)
+    store.append("user", "committed")
+    with db.transaction():
+        store.append("user", "pending")
+        # The writing thread sees its own uncommitted row...
+        assert store.count() == 2
+        # ...other threads read the last committed state without waiting
+        assert _in_thread(store.count) == 1
+    assert _in_thread(store.count) == 2
+
+
+def test_reader_connections_are_per_thread_and_reused(db):
+    main_a = db._reader()
+    main_b = db._reader()
+    other = _in_thread(db._reader)
+    assert main_a is main_b
+    assert other is not main_a
+    with pytest.raises(sqlite3.OperationalError):
+        db.read("DELETE FROM turns")
+
+
+def test_concurrent_writers_are_serialized(db):
+    store = TranscriptStore(db)
+
+    def writer(n):
+        for i in range(20):
+            with db.transaction():
+                store.append("user", f"{n}-{i}a")
+                store.append("assistant", f"{n}-{i}b")
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert store.count() == 160
+
+
+def _indexes(db):
+    rows = db.read(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'"
+    )
+    return {name for (name,) in rows}
+
+
+def test_bulk_load_relaxes_and_restores_settings(db):
+    store = TranscriptStore(db)
+    synchronous = db.execute("PRAGMA synchronous").fetchone()[0]
+    with db.bulk_load() as report:
+        assert db.execute("PRAGMA synchronous").fetchone()[0] == 0
+        assert db.execute("PRAGMA foreign_keys").fetchone()[0] == 0
+        assert _indexes(db) == set()
+        store.append_many([("user", "a"), ("assistant", "b")])
+
+    assert db.execute("PRAGMA synchronous").fetchone()[0] == synchronous
+    assert db.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    assert _indexes(db) == {"idx_turns_created", "idx_chunks_turn"}
+    assert report.turns == 2
+    assert report.integrity_check == "ok"
+    assert report.foreign_key_violations == 0
+
+
+def test_bulk_load_reports_foreign_key_violations(db):
+    with pytest.raises(sqlite3.IntegrityError):
+        with db.bulk_load():
+            db.execute(
+                "INSERT INTO chunks (chunk_id, turn_id, text, start_char, end_char, "
+                "token_count) VALUES ('c1', 'missing-turn', 'x', 0, 1, 1)"
+            )
+    # Settings are restored even though the load failed verification
+    assert db.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    assert "idx_chunks_turn" in _indexes(db)
+
+
+def _fts_match(db, term: str) -> list[str]:
+    rows = db.execute(
+        "SELECT c.chunk_id FROM chunks_fts JOIN chunks c ON c.rowid = chunks_fts.rowid "
+        "WHERE chunks_fts MATCH ?",
+        (term,),
+    ).fetchall()
+    return [cid for (cid,) in rows]
+
+
+def _insert_chunk(db, turn_id: str, chunk_id: str, text: str) -> None:
+    db.execute(
+        "INSERT INTO chunks (chunk_id, turn_id, text, start_char, end_char, "
+        "token_count) VALUES (?, ?, ?, 0, 1, 1)",
+        (chunk_id, turn_id, text),
+    )
+
+
+def test_fts_index_follows_chunk_writes(db):
+    assert db.fts
+    turn = TranscriptStore(db).append("user", "x")
+    _insert_chunk(db, turn.turn_id, "c1", "error ZX-4471 on deploy")
+    assert _fts_match(db, '"ZX-4471"') == ["c1"]
+
+    db.execute("UPDATE chunks SET text = 'all clear' WHERE chunk_id = 'c1'")
+    assert _fts_match(db, '"ZX-4471"') == []
+    assert _fts_match(db, "clear") == ["c1"]
+
+    db.execute("DELETE FROM chunks WHERE chunk_id = 'c1'")
+    assert _fts_match(db, "clear") == []
+
+
+def test_bulk_load_backfills_fts(db):
+    turn = TranscriptStore(db).append("user", "x")
+    _insert_chunk(db, turn.turn_id, "before", "kept token alpha")
+    with db.bulk_load():
+        _insert_chunk(db, turn.turn_id, "during", "bulk token beta")
+        assert _fts_match(db, "beta") == []
+
+    assert _fts_match(db, "alpha") == ["before"]
+    assert _fts_match(db, "beta") == ["during"]
+    _insert_chunk(db, turn.turn_id, "after", "trigger restored gamma")
+    assert _fts_match(db, "gamma") == ["after"]
+
+
+def test_bulk_load_refuses_chunk_deletes_and_text_updates(db):
+    turn = TranscriptStore(db).append("user", "x")
+    _insert_chunk(db, turn.turn_id, "before", "kept token alpha")
+    with db.bulk_load():
+        with db.transaction():
+            _insert_chunk(db, turn.turn_id, "during", "bulk token beta")
+        for sql in (
+            "DELETE FROM chunks WHERE chunk_id = 'during'",
+            "UPDATE chunks SET text = 'edited' WHERE chunk_id = 'during'",
+        ):
+            with pytest.raises(sqlite3.IntegrityError, match="bulk_load"):
+                with db.transaction():
+                    db.execute(sql)
+
+    assert _fts_match(db, "beta") == ["during"]
+    assert db.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    db.execute("INSERT INTO chunks_fts (chunks_fts) VALUES ('integrity-check')")
+    with db.transaction():
+        db.execute("DELETE FROM chunks WHERE chunk_id = 'during'")
+    assert _fts_match(db, "beta") == []
+
+
+def test_fts_backfilled_for_existing_database(tmp_dir):
+    path = tmp_dir / "old.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(_SCHEMA_SQL)
+    conn.execute("INSERT INTO turns VALUES ('t', 'user', 'x', '2024-01-01')")
+    conn.execute(
+        "INSERT INTO chunks (chunk_id, turn_id, text, start_char, end_char, "
+        "token_count) VALUES ('c', 't', 'legacy words', 0, 1, 1)"
+    )
+    conn.commit()
+    conn.close()
+
+    with Database(path) as db:
+        assert _fts_match(db, "legacy") == ["c"]
+
+
+def test_vacuum_reclaims_space_and_rebuilds_fts(db):
+    turn = TranscriptStore(db).append("user", "x")
+    for i in range(200):
+        _insert_chunk(db, turn.turn_id, f"c{i:03d}", f"filler text {i} " * 20)
+    _insert_chunk(db, turn.turn_id, "keep", "survivor token omega")
+    db.commit()
+    db.execute("DELETE FROM chunks WHERE chunk_id LIKE 'c%'")
+    db.commit()
+    before = db.size_bytes()
+
+    db.vacuum()
+    assert db.size_bytes() < before
+    assert _fts_match(db, "omega") == ["keep"]
+    assert _fts_match(db, "filler") == []
+    with db.transaction(), pytest.raises(RuntimeError):
+        db.vacuum()
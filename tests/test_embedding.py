@@ -7,7 +7,7 @@ Mark them as slow/integration tests if needed.
 import numpy as np
 import pytest
 
-from memory_condense.embedding import EmbeddingService
+from memory_condense.embedding import EmbeddingService, SparseHead
 from memory_condense.schemas import Chunk
 
 
@@ -46,3 +46,13 @@ def test_embed_empty_list(embedder):
 def test_dim():
     svc = EmbeddingService.__new__(EmbeddingService)
     assert svc.dim == 1024
+
+
+def test_sparse_head_pools_and_skips_special_tokens():
+    head = SparseHead(np.array([1.0, 0.0]), bias=-0.5, skip_ids=[0, 2])
+    ids = np.array([0, 5, 6, 5, 7, 2])
+    hidden = np.array([[9, 0], [1, 0], [0.2, 0], [2, 0], [0.9, 0], [9, 0]])
+
+    weights = head(ids, hidden)
+
+    assert weights == pytest.approx({"5": 1.5, "7": 0.4})
@@ -0,0 +1,65 @@
+import numpy as np
+
+from memory_condense.embedding import EmbeddingService
+from memory_condense.embedding_cache import EmbeddingCache, cache_key
+from memory_condense.schemas import Chunk
+
+
+def _chunk(text: str) -> Chunk:
+    return Chunk(turn_id="t1", text=text, start_char=0, end_char=len(text), token_count=1)
+
+
+def test_key_depends_on_model_and_text():
+    assert cache_key("m", "hello") == cache_key("m", "hello")
+    assert cache_key("m", "hello") != cache_key("other", "hello")
+    assert cache_key("m", "hello") != cache_key("m", "hello!")
+
+
+def test_put_get_roundtrip_and_persist(tmp_dir):
+    path = tmp_dir / "cache.db"
+    cache = EmbeddingCache(path)
+    vec = np.arange(4, dtype=np.float32)
+    cache.put_many([(b"k1", vec)])
+    assert set(cache.get_many([b"k1", b"k2"])) == {b"k1"}
+    cache.close()
+
+    reopened = EmbeddingCache(path)
+    assert len(reopened) == 1
+    np.testing.assert_array_equal(reopened.get_many([b"k1"])[b"k1"], vec)
+    reopened.close()
+
+
+def test_delete_many():
+    cache = EmbeddingCache()
+    vec = np.arange(4, dtype=np.float32)
+    cache.put_many([(b"k1", vec), (b"k2", vec)])
+    assert cache.delete_many([b"k1", b"missing"]) == 1
+    assert set(cache.get_many([b"k1", b"k2"])) == {b"k2"}
+
+
+def test_embed_chunks_skips_cached_and_duplicate_texts(fake_model):
+    cache = EmbeddingCache()
+    svc = EmbeddingService(cache=cache)
+
+    first = svc.embed_chunks([_chunk("a"), _chunk("b"), _chunk("a")])
+    assert fake_model.calls == [2]
+    assert first[0].embedding == first[2].embedding
+
+    second = svc.embed_chunks([_chunk("b"), _chunk("c")])
+    assert fake_model.calls == [2, 1]
+    assert second[0].embedding == first[1].embedding
+
+    svc.embed_chunks([_chunk("a"), _chunk("c")])
+    assert fake_model.calls == [2, 1]
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (4, 3, 3)
+    assert stats.hit_rate == 4 / 7
+
+
+def test_cached_vectors_match_uncached(fake_model):
+    chunks = [_chunk("alpha"), _chunk("beta")]
+    plain = EmbeddingService().embed_chunks(chunks)
+    cached = EmbeddingService(cache=EmbeddingCache()).embed_chunks(chunks)
+    for p, c in zip(plain, cached):
+        np.testing.assert_allclose(p.embedding, c.embedding)
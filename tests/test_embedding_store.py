@@ -0,0 +1,160 @@
+import os
+
+import numpy as np
+import pytest
+
+from memory_condense import embedding_store
+from memory_condense.embedding_store import EmbeddingStore
+
+
+@pytest.mark.parametrize("on_disk", [True, False])
+def test_append_and_read(tmp_dir, on_disk):
+    store = EmbeddingStore(dim=4, path=tmp_dir / "vecs.f32" if on_disk else None)
+    assert len(store) == 0
+    assert store.matrix().shape == (0, 4)
+
+    a = np.arange(8, dtype=np.float32).reshape(2, 4)
+    b = np.ones((3, 4), dtype=np.float32)
+    assert store.append(a) == 0
+    assert store.append(b) == 2
+
+    assert len(store) == 5
+    np.testing.assert_array_equal(store.matrix()[:2], a)
+    np.testing.assert_array_equal(store.take(np.array([2, 3, 4])), b)
+    np.testing.assert_array_equal(store.take(np.array([0, 4])), [a[0], b[2]])
+
+
+def test_reopen_persists_rows(tmp_dir):
+    path = tmp_dir / "vecs.f32"
+    store = EmbeddingStore(dim=4, path=path)
+    store.append(np.full((3, 4), 0.5, dtype=np.float32))
+    store.flush()
+
+    reopened = EmbeddingStore(dim=4, path=path)
+    assert len(reopened) == 3
+    np.testing.assert_array_equal(reopened.matrix(), np.full((3, 4), 0.5))
+
+
+def test_contiguous_take_is_a_view(tmp_dir):
+    store = EmbeddingStore(dim=4, path=tmp_dir / "vecs.f32")
+    store.append(np.zeros((10, 4), dtype=np.float32))
+    view = store.take(np.arange(2, 7))
+    assert view.shape == (5, 4)
+    assert np.shares_memory(view, store.matrix())
+
+
+def test_truncates_partial_trailing_row(tmp_dir):
+    path = tmp_dir / "vecs.f32"
+    store = EmbeddingStore(dim=4, path=path)
+    store.append(np.ones((2, 4), dtype=np.float32))
+    with open(path, "ab") as f:
+        f.write(b"\x00" * 6)  # torn write
+
+    reopened = EmbeddingStore(dim=4, path=path)
+    assert len(reopened) == 2
+    assert path.stat().st_size == 2 * 4 * 4
+
+
+@pytest.mark.parametrize("precision, nbytes", [("float16", 2), ("int8", 1)])
+def test_quantized_roundtrip(tmp_dir, precision, nbytes):
+    rng = np.random.default_rng(0)
+    vecs = rng.standard_normal((50, 32)).astype(np.float32)
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+
+    path = tmp_dir / "q.vec"
+    store = EmbeddingStore(dim=32, path=path, precision=precision)
+    store.append(vecs)
+    assert store.bytes_per_vector == 32 * nbytes
+    assert path.stat().st_size == 50 * 32 * nbytes
+
+    reopened = EmbeddingStore(dim=32, path=path, precision=precision)
+    decoded = reopened.vectors(np.arange(50))
+    assert decoded.dtype == np.float32
+    np.testing.assert_allclose(decoded, vecs, atol=0.02)
+
+    scores = reopened.score(vecs[7], np.arange(50))
+    assert int(np.argmax(scores)) == 7
+    assert scores[7] == pytest.approx(1.0, abs=1e-2)
+
+
+@pytest.mark.parametrize("precision", ["float32", "float16", "int8"])
+def test_dot_matches_decoded_rows(tmp_dir, precision):
+    rng = np.random.default_rng(1)
+    vecs = rng.standard_normal((20, 8)).astype(np.float32)
+    queries = rng.standard_normal((3, 8)).astype(np.float32)
+    store = EmbeddingStore(dim=8, path=tmp_dir / "d.vec", precision=precision)
+    store.append(vecs)
+
+    dots = store.dot(queries, 5, 15)
+    assert dots.shape == (3, 10)
+    np.testing.assert_allclose(
+        dots, queries @ store.vectors(np.arange(5, 15)).T, rtol=1e-4, atol=1e-4
+    )
+
+
+@pytest.mark.parametrize("on_disk", [True, False])
+def test_erase_zeroes_rows_in_place(tmp_dir, on_disk):
+    store = EmbeddingStore(dim=4, path=tmp_dir / "e.vec" if on_disk else None)
+    store.append(np.ones((5, 4), dtype=np.float32))
+    store.erase(np.array([1, 3, 9]))
+
+    assert len(store) == 5
+    np.testing.assert_array_equal(store.matrix().sum(axis=1), [4, 0, 4, 0, 4])
+
+
+def test_int8_scale_widens_and_requantizes(tmp_dir):
+    store = EmbeddingStore(dim=4, path=tmp_dir / "q.vec", precision="int8")
+    small = np.array([[0.1, -0.1, 0.05, 0.0]], dtype=np.float32)
+    store.append(small)
+    big = np.array([[1.0, -2.0, 0.5, 0.3]], dtype=np.float32)
+    store.append(big)
+
+    np.testing.assert_allclose(store.vectors(np.arange(2)), np.vstack([small, big]), atol=0.02)
+
+
+def test_int8_normalised_vectors_never_requantize(tmp_dir, monkeypatch):
+    store = EmbeddingStore(dim=8, path=tmp_dir / "q.vec", precision="int8")
+    calls = []
+    monkeypatch.setattr(store, "_requantize", lambda scale: calls.append(scale))
+    rng = np.random.default_rng(0)
+    vecs = rng.standard_normal((300, 8)).astype(np.float32)
+    vecs[0] = np.eye(8, dtype=np.float32)[3]  # a component at the bound
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+    for vec in vecs:
+        store.append(vec)
+
+    assert calls == []
+    np.testing.assert_allclose(store.vectors(np.arange(300)), vecs, atol=0.005)
+
+
+@pytest.mark.parametrize("failed_replace", [1, 2])
+def test_int8_requantize_survives_crash(tmp_dir, monkeypatch, failed_replace):
+    path = tmp_dir / "q.vec"
+    store = EmbeddingStore(dim=4, path=path, precision="int8")
+    small = np.array([[0.1, -0.1, 0.05, 0.0]], dtype=np.float32)
+    store.append(small)
+
+    # Crash before (1) or after (2) the rows file is swapped in
+    real_replace = os.replace
+    calls = []
+
+    def crash(src, dst):
+        calls.append(dst)
+        if len(calls) == failed_replace:
+            raise OSError("crash")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(embedding_store.os, "replace", crash)
+    with pytest.raises(OSError):
+        store.append(np.array([[1.0, -2.0, 0.5, 0.3]], dtype=np.float32))
+    monkeypatch.undo()
+
+    reopened = EmbeddingStore(dim=4, path=path, precision="int8")
+    assert len(reopened) == 1
+    np.testing.assert_allclose(reopened.vectors(np.arange(1)), small, atol=0.01)
+    assert sorted(p.name for p in tmp_dir.iterdir()) == ["q.vec", "q.vec.scale"]
+
+
+def test_rejects_unknown_precision():
+    with pytest.raises(ValueError):
+        EmbeddingStore(dim=4, precision="bfloat16")
@@ -0,0 +1,122 @@
+"""Staged ingest pipeline tests using the fake encoder."""
+
+import json
+import threading
+
+import pytest
+
+from memory_condense import MemoryCondenser
+from memory_condense.ingest import IngestPipeline, ingest_directory
+
+
+@pytest.fixture
+def mc(tmp_dir, fake_model):
+    with MemoryCondenser(
+        data_dir=tmp_dir / "mc", chunker_min_tokens=5, chunker_max_tokens=50
+    ) as condenser:
+        yield condenser
+
+
+@pytest.fixture
+def export_dir(tmp_dir):
+    d = tmp_dir / "exports"
+    d.mkdir()
+    for i in range(5):
+        lines = []
+        for j in range(7):
+            lines.append(f"User:\nQuestion {j} in file {i} about topic {i * 10 + j}.")
+            lines.append(f"Claude:\nAnswer {j} in file {i}. It has two sentences.")
+        (d / f"conv_{i}.txt").write_text("\n".join(lines) + "\n")
+    (d / "notes.json").write_text("{}")
+    return d
+
+
+def test_ingest_directory_counts(mc, export_dir):
+    report = ingest_directory(mc, export_dir, batch_turns=4, queue_size=2)
+
+    assert report.files == 5
+    assert report.turns == 70
+    assert mc.transcript.count() == 70
+    assert report.chunks == len(mc._retriever.embedding_store)
+    assert [s.name for s in report.stages] == ["parse", "chunk", "embed", "index"]
+    by_name = {s.name: s for s in report.stages}
+    assert by_name["parse"].items == 5
+    assert by_name["chunk"].items == 70
+    assert by_name["index"].items == report.chunks
+    for stage in report.stages[1:]:
+        assert stage.max_queue_depth <= 2
+    assert report.bottleneck in by_name
+
+
+def test_pipeline_multiple_workers_searchable(mc, export_dir):
+    pipeline = IngestPipeline(
+        mc, parse_workers=2, embed_workers=2, batch_turns=3, queue_size=1
+    )
+    report = pipeline.run(sorted(export_dir.glob("*.txt")))
+
+    assert report.turns == 70
+    hits = mc.search("Question 3 in file 2 about topic 23.", k=1)
+    assert hits[0].chunk.text == "Question 3 in file 2 about topic 23."
+
+
+def test_pipeline_empty(mc):
+    report = IngestPipeline(mc).run([])
+    assert report.turns == 0
+    assert report.chunks == 0
+
+
+def test_pipeline_stage_error_propagates(mc, export_dir, monkeypatch):
+    def boom(chunks):
+        raise RuntimeError("encoder failed")
+
+    monkeypatch.setattr(mc._embedder, "embed_chunks", boom)
+    with pytest.raises(RuntimeError, match="encoder failed"):
+        IngestPipeline(mc, batch_turns=2, queue_size=1).run(
+            sorted(export_dir.glob("*.txt"))
+        )
+
+
+def test_pipeline_streams_json_export(mc, tmp_dir):
+    export = [
+        {
+            "name": f"conv {i}",
+            "chat_messages": [
+                {"sender": "human", "text": f"Question about json topic {i}."},
+                {"sender": "assistant", "text": f"Answer for json topic {i}."},
+            ],
+        }
+        for i in range(6)
+    ]
+    path = tmp_dir / "conversations.json"
+    path.write_text(json.dumps(export))
+
+    report = IngestPipeline(mc, batch_turns=4, queue_size=1).run([path])
+
+    assert report.files == 1
+    assert report.turns == 12
+    assert mc.transcript.count() == 12
+
+
+def test_pipeline_inside_bulk_load(mc, export_dir):
+    # The index stage writes from its own thread, so bulk_load() must not
+    # keep the writer locked to the thread that entered it.
+    result = {}
+
+    def load():
+        with mc.bulk_load() as report:
+            result["pipeline"] = IngestPipeline(mc, batch_turns=4, queue_size=1).run(
+                sorted(export_dir.glob("*.txt"))
+            )
+        result["bulk"] = report
+
+    loader = threading.Thread(target=load, daemon=True)
+    loader.start()
+    loader.join(timeout=60)
+    assert not loader.is_alive(), "pipeline deadlocked inside bulk_load()"
+
+    assert result["pipeline"].turns == 70
+    assert result["bulk"].turns == 70
+    assert result["bulk"].indexed == result["pipeline"].chunks
+    assert result["bulk"].integrity_check == "ok"
+    hits = mc.search("Question 3 in file 2 about topic 23.", k=1)
+    assert hits[0].chunk.text == "Question 3 in file 2 about topic 23."
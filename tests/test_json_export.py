@@ -0,0 +1,132 @@
+import io
+import json
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from memory_condense.json_export import (
+    conversation_turns,
+    iter_json_array,
+    iter_json_conversations,
+)
+from memory_condense.loader import iter_conversation, load_conversation
+
+
+def _chatgpt(title, messages, branch_off=False):
+    """Build a ChatGPT-style mapping tree; optionally add a dead branch."""
+    mapping = {"root": {"id": "root", "message": None, "parent": None, "children": []}}
+    parent = "root"
+    for i, (role, text) in enumerate(messages):
+        nid = f"n{i}"
+        mapping[nid] = {
+            "id": nid,
+            "message": {
+                "author": {"role": role},
+                "content": {"content_type": "text", "parts": [text]},
+            },
+            "parent": parent,
+            "children": [],
+        }
+        mapping[parent]["children"].append(nid)
+        parent = nid
+    if branch_off:
+        mapping["dead"] = {
+            "id": "dead",
+            "message": {
+                "author": {"role": "assistant"},
+                "content": {"content_type": "text", "parts": ["regenerated away"]},
+            },
+            "parent": "n0",
+            "children": [],
+        }
+        mapping["n0"]["children"].append("dead")
+    return {"title": title, "mapping": mapping, "current_node": parent}
+
+
+def _claude(name, messages):
+    return {
+        "name": name,
+        "chat_messages": [{"sender": s, "text": t} for s, t in messages],
+    }
+
+
+def test_iter_json_array_small_chunks():
+    data = [{"a": 1}, [1, 2.5, "x,]"], 12345, "tail", None, {"nested": {"b": [True]}}]
+    f = io.StringIO(" \n" + json.dumps(data, indent=2))
+    assert list(iter_json_array(f, chunk_size=3)) == data
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5])
+def test_iter_json_array_numbers_across_chunk_edges(chunk_size):
+    text = '[1.5, 2, -3e2,0.25E-1 ,-0.125,\n1e+3, 10, true, null, [4.75]]'
+    assert list(iter_json_array(io.StringIO(text), chunk_size=chunk_size)) == json.loads(
+        text
+    )
+
+
+def test_iter_json_array_empty_and_invalid():
+    assert list(iter_json_array(io.StringIO("  [ ] "))) == []
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO('{"a": 1}')))
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO("[1, 2"), chunk_size=2))
+
+
+def test_iter_json_array_is_lazy():
+    f = io.StringIO("[1, 2, " + "x" * 100)
+    items = iter_json_array(f, chunk_size=4)
+    assert next(items) == 1
+    assert next(items) == 2
+
+
+def test_chatgpt_follows_current_branch():
+    conv = _chatgpt(
+        "t",
+        [("user", "Hi"), ("assistant", "Hello!"), ("tool", "ignored"), ("user", " ")],
+        branch_off=True,
+    )
+    assert conversation_turns(conv) == [("user", "Hi"), ("assistant", "Hello!")]
+
+
+def test_claude_messages():
+    conv = _claude("c", [("human", "Question?"), ("assistant", "Answer.")])
+    conv["chat_messages"].append(
+        {"sender": "assistant", "text": "", "content": [{"type": "text", "text": "More."}]}
+    )
+    assert conversation_turns(conv) == [
+        ("user", "Question?"),
+        ("assistant", "Answer."),
+        ("assistant", "More."),
+    ]
+
+
+def test_iter_json_conversations(tmp_path: Path):
+    export = [
+        _chatgpt("First", [("user", "a"), ("assistant", "b")]),
+        {"title": "Empty", "mapping": {}},
+        _claude("", [("human", "c")]),
+    ]
+    f = tmp_path / "conversations.json"
+    f.write_text(json.dumps(export), encoding="utf-8")
+    assert list(iter_json_conversations(f)) == [
+        ("First", [("user", "a"), ("assistant", "b")]),
+        ("2", [("user", "c")]),
+    ]
+
+
+def test_loader_reads_json_and_zip(tmp_path: Path):
+    export = [
+        _chatgpt("One", [("user", "q1"), ("assistant", "a1")]),
+        _claude("Two", [("human", "q2"), ("assistant", "a2")]),
+    ]
+    expected = [("user", "q1"), ("assistant", "a1"), ("user", "q2"), ("assistant", "a2")]
+
+    f = tmp_path / "conversations.json"
+    f.write_text(json.dumps(export), encoding="utf-8")
+    assert load_conversation(f) == expected
+
+    z = tmp_path / "export.zip"
+    with zipfile.ZipFile(z, "w") as archive:
+        archive.writestr("export/conversations.json", json.dumps(export))
+    assert list(iter_conversation(z)) == expected
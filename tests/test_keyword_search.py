@@ -0,0 +1,65 @@
+import pytest
+
+from memory_condense.keyword_search import (
+    fts_query,
+    is_lexical_query,
+    reciprocal_rank_fusion,
+)
+from memory_condense.schemas import Chunk, RetrievalResult
+
+
+def _result(chunk_id: str, score: float = 0.0) -> RetrievalResult:
+    chunk = Chunk(
+        chunk_id=chunk_id,
+        turn_id="t",
+        text=chunk_id,
+        start_char=0,
+        end_char=1,
+        token_count=1,
+    )
+    return RetrievalResult(chunk=chunk, score=score)
+
+
+def test_fts_query_quotes_terms():
+    assert fts_query('ZX-4471 say "hi" (now)') == '"ZX-4471" OR "say" OR "hi" OR "now"'
+    assert fts_query('a"b') == '"a""b"'
+    assert fts_query("  ?! ") == ""
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "ZX-4471",
+        "ticket #4471",
+        "os.path.join",
+        "parse_txt failing",
+        "getUserName",
+        "ENOENT",
+        '"exact phrase" here',
+    ],
+)
+def test_lexical_queries(query):
+    assert is_lexical_query(query)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "",
+        "hello there",
+        "what did I say about dark mode",
+        "why does ZX-4471 keep happening on every deploy",
+    ],
+)
+def test_semantic_queries(query):
+    assert not is_lexical_query(query)
+
+
+def test_reciprocal_rank_fusion():
+    dense = [_result("a", 0.9), _result("b", 0.8), _result("c", 0.7)]
+    bm25 = [_result("c", 12.0), _result("d", 3.0)]
+
+    fused = reciprocal_rank_fusion([dense, bm25], k=3)
+
+    assert [r.chunk.chunk_id for r in fused] == ["c", "a", "b"]
+    assert fused[0].score == pytest.approx(1 / 63 + 1 / 61)
@@ -0,0 +1,65 @@
+import json
+
+import numpy as np
+import pytest
+
+from memory_condense.lexical_index import LexicalIndex, decode_weights, encode_weights
+
+
+def test_encode_decode_roundtrip():
+    weights = {"42": 0.25, "7": 0.125, "100000": 0.3}
+    blob = encode_weights(weights)
+
+    assert isinstance(blob, bytes)
+    assert len(blob) == 6 * len(weights)
+    decoded = decode_weights(blob)
+    assert decoded.keys() == weights.keys()
+    for token, weight in weights.items():
+        assert decoded[token] == pytest.approx(weight, abs=1e-3)
+
+
+def test_decode_legacy_json():
+    assert decode_weights(json.dumps({"5": 0.5})) == {"5": 0.5}
+
+
+def test_scores_sum_shared_tokens():
+    index = LexicalIndex()
+    index.add(
+        [0, 1, 2, 3],
+        [
+            {"10": 1.0, "11": 0.5},
+            {"11": 2.0},
+            None,
+            encode_weights({"10": 0.25, "12": 1.0}),
+        ],
+    )
+    assert len(index) == 3
+    assert index.postings == 5
+
+    labels, scores = index.scores({"10": 2.0, "11": 1.0})
+    assert labels.tolist() == [0, 1, 3]
+    np.testing.assert_allclose(scores, [2.5, 2.0, 0.5])
+
+    top_labels, top_scores = index.search({"10": 2.0, "11": 1.0}, k=2)
+    assert top_labels.tolist() == [0, 1]
+    np.testing.assert_allclose(top_scores, [2.5, 2.0])
+
+
+def test_no_matching_tokens():
+    index = LexicalIndex()
+    index.add([0], [{"1": 1.0}])
+    labels, scores = index.search({"2": 1.0}, k=5)
+    assert len(labels) == 0 and len(scores) == 0
+
+
+def test_remove_drops_postings():
+    index = LexicalIndex()
+    docs = [{"10": 1.0, "11": 0.5}, encode_weights({"11": 2.0}), {"10": 0.25}]
+    index.add([0, 1, 2], docs)
+
+    index.remove([1, 2], docs[1:])
+    assert len(index) == 1
+    assert index.postings == 2
+    labels, scores = index.scores({"10": 1.0, "11": 1.0})
+    assert labels.tolist() == [0]
+    np.testing.assert_allclose(scores, [1.5])
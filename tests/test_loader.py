@@ -1,6 +1,14 @@
 from pathlib import Path
 
-from memory_condense.loader import load_conversation, load_directory, parse_md, parse_txt
+from memory_condense.loader import (
+    iter_conversation,
+    iter_directory,
+    iter_turns,
+    load_conversation,
+    load_directory,
+    parse_md,
+    parse_txt,
+)
 
 
 def test_parse_txt_basic():
@@ -146,3 +154,57 @@ def test_load_real_md_format():
     assert turns[0][0] == "assistant"
     assert "genericity" in turns[0][1]
     assert turns[1][0] == "user"
+
+
+def test_parse_txt_header_rules():
+    text = (
+        "preamble is ignored\n"
+        "User:  \n"
+        "User: inline text is not a header\n"
+        " Claude:\n"
+        "Claude:\n"
+        "reply\n"
+        "User:"  # no trailing newline: body text, not a header
+    )
+    assert parse_txt(text) == [
+        ("user", "User: inline text is not a header\n Claude:"),
+        ("assistant", "reply\nUser:"),
+    ]
+
+
+def test_iter_turns_custom_headers():
+    lines = ["### Human\n", "hi\n", "User:\n", "### Bot\n", "hello\n"]
+    headers = {"### Human": "user", "### Bot": "assistant"}
+    assert list(iter_turns(lines, headers)) == [
+        ("user", "hi\nUser:"),
+        ("assistant", "hello"),
+    ]
+
+
+def test_iter_conversation_is_lazy(tmp_path: Path):
+    f = tmp_path / "chat.txt"
+    f.write_text("User:\none\n\nClaude:\ntwo\n\nUser:\nthree\n", encoding="utf-8")
+    turns = iter_conversation(f)
+    assert next(turns) == ("user", "one")
+    assert next(turns) == ("assistant", "two")
+    assert list(turns) == [("user", "three")]
+
+
+def test_iter_conversation_crlf(tmp_path: Path):
+    f = tmp_path / "chat.md"
+    f.write_bytes(b"**User:**\r\n\r\nHello\r\nthere\r\n**Assistant:**\r\nHi\r\n")
+    assert list(iter_conversation(f)) == [
+        ("user", "Hello\nthere"),
+        ("assistant", "Hi"),
+    ]
+
+
+def test_iter_directory_matches_load_directory(tmp_path: Path):
+    (tmp_path / "b.md").write_text("**User:**\nHey\n")
+    (tmp_path / "a.txt").write_text("User:\nHello\n\nClaude:\n Hi\n")
+    (tmp_path / "empty.txt").write_text("no headers here\n")
+
+    gen = iter_directory(tmp_path)
+    assert next(gen)[0] == "a.txt"
+    assert dict(iter_directory(tmp_path)) == load_directory(tmp_path)
+    assert "empty.txt" not in load_directory(tmp_path)
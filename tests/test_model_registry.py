@@ -0,0 +1,86 @@
+import threading
+import time
+
+from memory_condense.embedding import EmbeddingService
+from memory_condense.model_registry import ModelRegistry
+
+
+class _Loader:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.calls: list[tuple[str, str | None]] = []
+
+    def __call__(self, model_name, device):
+        self.calls.append((model_name, device))
+        time.sleep(self.delay)
+        return object()
+
+
+def test_shares_model_by_name_and_device():
+    loader = _Loader()
+    registry = ModelRegistry(idle_timeout=None, loader=loader)
+
+    a = registry.get("m")
+    assert registry.get("m") is a
+    assert registry.get("m", "cpu") is not a
+    assert loader.calls == [("m", None), ("m", "cpu")]
+    stats = registry.stats()
+    assert (stats.models, stats.loads, stats.hits) == (2, 2, 1)
+
+
+def test_concurrent_gets_load_once():
+    loader = _Loader(delay=0.05)
+    registry = ModelRegistry(idle_timeout=None, loader=loader)
+    models = []
+    threads = [
+        threading.Thread(target=lambda: models.append(registry.get("m")))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(loader.calls) == 1
+    assert all(m is models[0] for m in models)
+
+
+def test_evict_idle():
+    loader = _Loader()
+    registry = ModelRegistry(idle_timeout=30.0, loader=loader)
+    try:
+        registry.get("old")
+        registry.get("new")
+        now = time.monotonic()
+        registry._entries[("old", None)].last_used = now - 60
+
+        assert registry.evict_idle(now) == [("old", None)]
+        assert registry.loaded() == [("new", None)]
+        registry.get("old")
+        assert len(loader.calls) == 3
+    finally:
+        registry.close()
+    assert registry.loaded() == []
+
+
+def test_reaper_evicts_in_background():
+    registry = ModelRegistry(idle_timeout=0.05, loader=_Loader())
+    try:
+        registry.get("m")
+        deadline = time.monotonic() + 2.0
+        while registry.loaded() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert registry.loaded() == []
+        assert registry.stats().evictions == 1
+    finally:
+        registry.close()
+
+
+def test_embedding_services_share_registry_model():
+    loader = _Loader()
+    registry = ModelRegistry(idle_timeout=None, loader=loader)
+    a = EmbeddingService(model_name="m", registry=registry)
+    b = EmbeddingService(model_name="m", registry=registry)
+
+    assert a._load_model() is b._load_model()
+    assert len(loader.calls) == 1
@@ -0,0 +1,99 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from memory_condense.embedding import EmbeddingService
+from memory_condense.query_batcher import QueryBatcher
+
+
+def _fake_encode(calls):
+    def encode(texts):
+        calls.append(list(texts))
+        return np.array([[len(t), i] for i, t in enumerate(texts)], dtype=np.float32)
+
+    return encode
+
+
+def test_concurrent_queries_share_one_encode():
+    calls: list[list[str]] = []
+    batcher = QueryBatcher(_fake_encode(calls), max_batch_size=8, max_wait_ms=200)
+    futures = [batcher.submit("q" * n) for n in range(1, 6)]
+    vectors = [f.result(timeout=5) for f in futures]
+    batcher.close()
+
+    assert calls == [["q", "qq", "qqq", "qqqq", "qqqqq"]]
+    assert [int(v[0]) for v in vectors] == [1, 2, 3, 4, 5]
+    assert batcher.batches == 1 and batcher.mean_batch_size == 5
+
+
+def test_max_batch_size_caps_batches():
+    calls: list[list[str]] = []
+    batcher = QueryBatcher(_fake_encode(calls), max_batch_size=3, max_wait_ms=200)
+    futures = [batcher.submit(f"q{i}") for i in range(7)]
+    for f in futures:
+        f.result(timeout=5)
+    batcher.close()
+    assert [len(c) for c in calls] == [3, 3, 1]
+
+
+def test_lone_query_waits_at_most_max_wait():
+    batcher = QueryBatcher(_fake_encode([]), max_batch_size=32, max_wait_ms=20)
+    start = time.perf_counter()
+    batcher.embed("alone")
+    assert time.perf_counter() - start < 1.0
+    batcher.close()
+
+
+def test_encode_errors_propagate():
+    def fail(texts):
+        raise ValueError("boom")
+
+    batcher = QueryBatcher(fail, max_wait_ms=1)
+    with pytest.raises(ValueError):
+        batcher.embed("q")
+    batcher.close()
+
+
+def test_close_during_submit_never_strands_a_query():
+    batcher = QueryBatcher(_fake_encode([]), max_wait_ms=1)
+    put = batcher._queue.put
+    closer = threading.Thread(target=batcher.close)
+
+    def put_after_close_starts(item):
+        # Let close() run between submit()'s closed check and its enqueue
+        if item is not None and not closer.is_alive():
+            closer.start()
+            deadline = time.monotonic() + 0.2
+            while not batcher._closed and time.monotonic() < deadline:
+                time.sleep(0.001)
+        put(item)
+
+    batcher._queue.put = put_after_close_starts
+    future = batcher.submit("q")
+    closer.join(timeout=5)
+    assert future.result(timeout=5)[0] == 1
+    with pytest.raises(RuntimeError, match="closed"):
+        batcher.submit("late")
+
+
+def test_embedding_service_batches_threads(fake_model):
+    svc = EmbeddingService(query_batch_size=16, query_max_wait_ms=100)
+    results: dict[int, np.ndarray] = {}
+
+    def worker(i):
+        results[i] = svc.embed_query(f"query {i}")
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    svc.close()
+
+    assert sum(fake_model.calls) == 10
+    assert len(fake_model.calls) < 10
+    unbatched = EmbeddingService()
+    for i, vec in results.items():
+        np.testing.assert_allclose(vec, unbatched.embed_query(f"query {i}"))
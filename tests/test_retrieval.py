@@ -1,3 +1,6 @@
+import json
+import time
+
 import numpy as np
 import pytest
 
@@ -21,9 +24,13 @@ def _make_chunk(turn_id: str, text: str, dim: int = 16) -> Chunk:
     )
 
 
-@pytest.fixture
-def retriever(db):
-    return SimilarityRetriever(db=db, dim=16, max_elements=100)
+@pytest.fixture(params=["hnsw", "exact"])
+def retriever(db, request):
+    retriever = SimilarityRetriever(
+        db=db, dim=16, max_elements=100, backend=request.param
+    )
+    yield retriever
+    retriever.close()  # joins any background compaction before db closes
 
 
 def test_add_and_query(db, retriever):
@@ -61,6 +68,38 @@ def test_idempotent_add(db, retriever):
     assert len(results) == 1
 
 
+def test_chunks_searchable_only_after_commit(db, retriever):
+    store = TranscriptStore(db)
+    turn = store.append("user", "pending")
+    chunk = _make_chunk(turn.turn_id, "pending chunk", dim=16)
+    query_vec = np.array(chunk.embedding, dtype=np.float32)
+    generation = retriever.generation
+
+    with db.transaction():
+        retriever.add_chunks([chunk])
+        # Not yet visible to readers, so not yet in the index either
+        assert retriever.generation == generation
+        assert retriever.query(query_vec, k=1) == []
+
+    assert retriever.generation > generation
+    assert retriever.query(query_vec, k=1)[0].chunk.chunk_id == chunk.chunk_id
+
+
+def test_rolled_back_chunks_can_be_added_again(db, retriever):
+    store = TranscriptStore(db)
+    turn = store.append("user", "retry")
+    chunk = _make_chunk(turn.turn_id, "retry chunk", dim=16)
+
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            retriever.add_chunks([chunk])
+            raise RuntimeError("boom")
+    retriever.add_chunks([chunk])
+
+    query_vec = np.array(chunk.embedding, dtype=np.float32)
+    assert retriever.query(query_vec, k=1)[0].chunk.chunk_id == chunk.chunk_id
+
+
 def test_multiple_chunks_ranked(db, retriever):
     store = TranscriptStore(db)
     turn = store.append("user", "multiple test")
@@ -100,3 +139,581 @@ def test_save_and_rebuild(db, tmp_dir):
     results = retriever2.query(query_vec, k=1)
     assert len(results) == 1
     assert results[0].chunk.chunk_id == chunk.chunk_id
+
+
+def test_query_skips_vectors_by_default(db, retriever):
+    store = TranscriptStore(db)
+    turn = store.append("user", "vector hydration")
+    chunk = _make_chunk(turn.turn_id, "vector hydration", dim=16)
+    retriever.add_chunks([chunk])
+
+    query_vec = np.array(chunk.embedding, dtype=np.float32)
+    result = retriever.query(query_vec, k=1)[0]
+    assert result.chunk.embedding is None
+    assert result.turn is not None
+    assert result.turn.turn_id == turn.turn_id
+    assert result.turn.text == "vector hydration"
+
+    result = retriever.query(query_vec, k=1, include_vectors=True)[0]
+    assert result.chunk.embedding == pytest.approx(chunk.embedding)
+
+
+def test_query_hydrates_in_one_statement(db, retriever, monkeypatch):
+    store = TranscriptStore(db)
+    turns = [store.append("user", f"turn {i}") for i in range(10)]
+    chunks = [_make_chunk(t.turn_id, f"hydrate {i}", dim=16) for i, t in enumerate(turns)]
+    retriever.add_chunks(chunks)
+
+    statements: list[str] = []
+    read = db.read
+    monkeypatch.setattr(
+        db, "read", lambda sql, params=(): statements.append(sql) or read(sql, params)
+    )
+
+    query_vec = np.array(chunks[3].embedding, dtype=np.float32)
+    results = retriever.query(query_vec, k=10)
+    assert len(results) == 10
+    assert len(statements) == 1
+    assert {r.turn.turn_id for r in results} == {t.turn_id for t in turns}
+    scores = [r.score for r in results]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_query_many_matches_query_and_hydrates_once(db, retriever, monkeypatch):
+    store = TranscriptStore(db)
+    turns = [store.append("user", f"turn {i}") for i in range(12)]
+    chunks = [_make_chunk(t.turn_id, f"many {i}", dim=16) for i, t in enumerate(turns)]
+    retriever.add_chunks(chunks)
+
+    queries = np.array([c.embedding for c in chunks[:5]], dtype=np.float32)
+    expected = [retriever.query(q, k=4) for q in queries]
+
+    statements: list[str] = []
+    read = db.read
+    monkeypatch.setattr(
+        db, "read", lambda sql, params=(): statements.append(sql) or read(sql, params)
+    )
+    batched = retriever.query_many(queries, k=4)
+
+    assert len(statements) == 1
+    assert [[r.chunk.chunk_id for r in rs] for rs in batched] == [
+        [r.chunk.chunk_id for r in rs] for rs in expected
+    ]
+    for i, results in enumerate(batched):
+        assert results[0].chunk.chunk_id == chunks[i].chunk_id
+
+
+def test_query_many_empty(retriever):
+    assert retriever.query_many(np.zeros((3, 16), dtype=np.float32)) == [[], [], []]
+    assert retriever.query_many(np.zeros((0, 16), dtype=np.float32)) == []
+
+
+def test_embeddings_kept_out_of_sqlite(db, retriever):
+    store = TranscriptStore(db)
+    turn = store.append("user", "metadata only")
+    chunk = _make_chunk(turn.turn_id, "metadata only", dim=16)
+    retriever.add_chunks([chunk])
+
+    blob = db.execute("SELECT embedding FROM chunks").fetchone()[0]
+    assert blob is None
+    np.testing.assert_allclose(retriever.embedding_store.matrix()[0], chunk.embedding)
+
+
+def test_migrates_legacy_blob_embeddings(db, tmp_dir):
+    store = TranscriptStore(db)
+    turn = store.append("user", "legacy")
+    chunks = [_make_chunk(turn.turn_id, f"legacy {i}", dim=16) for i in range(3)]
+    for label, chunk in zip([0, 1, None], chunks):
+        db.execute(
+            "INSERT INTO chunks (chunk_id, turn_id, text, start_char, end_char, "
+            "token_count, embedding, hnsw_label) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                chunk.chunk_id, chunk.turn_id, chunk.text, 0, 1, 1,
+                np.array(chunk.embedding, dtype=np.float32).tobytes(), label,
+            ),
+        )
+    db.commit()
+
+    retriever = SimilarityRetriever(
+        db=db, dim=16, index_path=tmp_dir / "legacy.bin", max_elements=100
+    )
+    retriever.rebuild_index()
+
+    assert len(retriever.embedding_store) == 3
+    assert db.execute("SELECT COUNT(*) FROM chunks WHERE embedding IS NOT NULL").fetchone()[0] == 0
+    for chunk in chunks:
+        results = retriever.query(np.array(chunk.embedding, dtype=np.float32), k=1)
+        assert results[0].chunk.chunk_id == chunk.chunk_id
+
+
+def test_rebuild_from_store(db, tmp_dir):
+    store = TranscriptStore(db)
+    turn = store.append("user", "rebuild")
+    index_path = tmp_dir / "rebuild.bin"
+    retriever = SimilarityRetriever(db=db, dim=16, index_path=index_path, max_elements=100)
+    chunks = [_make_chunk(turn.turn_id, f"rebuild {i}", dim=16) for i in range(5)]
+    retriever.add_chunks(chunks)
+
+    retriever2 = SimilarityRetriever(db=db, dim=16, index_path=index_path, max_elements=100)
+    retriever2.rebuild_index()
+    query_vec = np.array(chunks[2].embedding, dtype=np.float32)
+    assert retriever2.query(query_vec, k=1)[0].chunk.chunk_id == chunks[2].chunk_id
+
+
+@pytest.mark.parametrize("precision", ["float16", "int8"])
+def test_quantized_rescore(db, tmp_dir, precision):
+    store = TranscriptStore(db)
+    turn = store.append("user", "quantized")
+    retriever = SimilarityRetriever(
+        db=db, dim=16, index_path=tmp_dir / "q.bin", max_elements=100, precision=precision
+    )
+    chunks = [_make_chunk(turn.turn_id, f"quantized {i}", dim=16) for i in range(20)]
+    retriever.add_chunks(chunks)
+
+    query_vec = np.array(chunks[5].embedding, dtype=np.float32)
+    results = retriever.query(query_vec, k=3, rescore=True, include_vectors=True)
+    assert results[0].chunk.chunk_id == chunks[5].chunk_id
+    assert results[0].chunk.embedding == pytest.approx(chunks[5].embedding, abs=0.05)
+    scores = [r.score for r in results]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_precision_is_fixed_per_store(db, tmp_dir):
+    SimilarityRetriever(db=db, dim=16, index_path=tmp_dir / "p.bin", precision="int8")
+    with pytest.raises(ValueError):
+        SimilarityRetriever(db=db, dim=16, index_path=tmp_dir / "p.bin", precision="float32")
+
+
+def test_replays_additions_after_crash(db, tmp_dir):
+    store = TranscriptStore(db)
+    turn = store.append("user", "crash")
+    index_path = tmp_dir / "crash.bin"
+
+    retriever = SimilarityRetriever(db=db, dim=16, index_path=index_path, max_elements=100)
+    saved = [_make_chunk(turn.turn_id, f"saved {i}", dim=16) for i in range(3)]
+    retriever.add_chunks(saved)
+    retriever.save()
+    unsaved = [_make_chunk(turn.turn_id, f"unsaved {i}", dim=16) for i in range(3)]
+    retriever.add_chunks(unsaved)
+    # no save(): simulate a crash
+
+    recovered = SimilarityRetriever(db=db, dim=16, index_path=index_path, max_elements=100)
+    for chunk in saved + unsaved:
+        results = recovered.query(np.array(chunk.embedding, dtype=np.float32), k=1)
+        assert results[0].chunk.chunk_id == chunk.chunk_id
+
+
+def test_save_writes_checkpoint_only_when_dirty(db, tmp_dir):
+    store = TranscriptStore(db)
+    turn = store.append("user", "checkpoint")
+    index_path = tmp_dir / "ckpt.bin"
+    retriever = SimilarityRetriever(db=db, dim=16, index_path=index_path, max_elements=100)
+
+    retriever.save()
+    assert not index_path.exists()
+
+    retriever.add_chunks([_make_chunk(turn.turn_id, f"ckpt {i}", dim=16) for i in range(4)])
+    retriever.save()
+    assert json.loads(index_path.with_suffix(".checkpoint").read_text()) == {"next_label": 4}
+
+    mtime = index_path.stat().st_mtime_ns
+    retriever.save()
+    assert index_path.stat().st_mtime_ns == mtime
+
+
+def test_background_checkpoint(db, tmp_dir):
+    store = TranscriptStore(db)
+    turn = store.append("user", "background")
+    index_path = tmp_dir / "bg.bin"
+    retriever = SimilarityRetriever(
+        db=db, dim=16, index_path=index_path, max_elements=100, checkpoint_interval=0.05
+    )
+    retriever.add_chunks([_make_chunk(turn.turn_id, "background", dim=16)])
+
+    deadline = time.monotonic() + 5
+    while not index_path.exists() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    retriever.close()
+    assert index_path.exists()
+    assert json.loads(index_path.with_suffix(".checkpoint").read_text()) == {"next_label": 1}
+
+
+def test_verify_index_repairs_divergence(db, tmp_dir):
+    store = TranscriptStore(db)
+    turn = store.append("user", "diverge")
+    index_path = tmp_dir / "diverge.bin"
+
+    retriever = SimilarityRetriever(db=db, dim=16, index_path=index_path, max_elements=100)
+    chunks = [_make_chunk(turn.turn_id, f"diverge {i}", dim=16) for i in range(6)]
+    retriever.add_chunks(chunks[:4])
+    retriever.save()
+    retriever.add_chunks(chunks[4:])  # committed to SQLite, never checkpointed
+    # Simulate a rolled-back insert: label in the index, no chunk row
+    db.execute("DELETE FROM chunks WHERE chunk_id = ?", (chunks[0].chunk_id,))
+    db.commit()
+
+    reopened = SimilarityRetriever(db=db, dim=16, index_path=index_path, max_elements=100)
+    report = reopened.repair_report
+    assert report is not None
+    assert report.db_labels == 5
+    assert report.index_labels == 4
+    assert report.replayed == 2
+    assert report.orphans_deleted == 1
+    assert report.seconds >= 0
+
+    results = reopened.query(np.array(chunks[0].embedding, dtype=np.float32), k=5)
+    assert len(results) == 5
+    assert chunks[0].chunk_id not in {r.chunk.chunk_id for r in results}
+
+    # A second pass finds nothing left to do
+    report = reopened.verify_index()
+    assert report.replayed == 0
+    assert report.orphans_deleted == 0
+
+
+def test_add_chunks_flushes_vectors_before_the_rows_commit(db, tmp_dir, monkeypatch):
+    store = TranscriptStore(db)
+    turn = store.append("user", "durable")
+    retriever = SimilarityRetriever(db=db, dim=16, index_path=tmp_dir / "durable.bin")
+    flushed_rows = []
+
+    def flush():
+        (count,) = db.read("SELECT COUNT(*) FROM chunks")[0]
+        flushed_rows.append(count)
+
+    monkeypatch.setattr(retriever._store, "flush", flush)
+    retriever.add_chunks([_make_chunk(turn.turn_id, "durable")])
+    assert flushed_rows == [0]
+    retriever.close()
+
+
+def test_verify_index_counts_labels_missing_from_the_store(db, tmp_dir):
+    store = TranscriptStore(db)
+    turn = store.append("user", "lost")
+    index_path = tmp_dir / "lost.bin"
+    retriever = SimilarityRetriever(db=db, dim=16, index_path=index_path)
+    chunks = [_make_chunk(turn.turn_id, f"lost {i}") for i in range(3)]
+    retriever.add_chunks(chunks[:2])
+    retriever.save()
+    retriever.add_chunks(chunks[2:])
+    # A crash lost the last vector row after its chunk row committed
+    vectors_path = index_path.with_suffix(".vectors")
+    vectors_path.write_bytes(vectors_path.read_bytes()[: 2 * 16 * 4])
+
+    reopened = SimilarityRetriever(db=db, dim=16, index_path=index_path)
+    report = reopened.repair_report
+    assert report.missing_vectors == 1
+    assert report.replayed == 0
+    reopened.close()
+
+
+def test_bulk_load_defers_indexing_to_one_pass(db, tmp_dir):
+    store = TranscriptStore(db)
+    turn = store.append("user", "bulk")
+    index_path = tmp_dir / "bulk.bin"
+    retriever = SimilarityRetriever(db=db, dim=16, index_path=index_path, max_elements=10)
+    chunks = [_make_chunk(turn.turn_id, f"bulk {i}", dim=16) for i in range(40)]
+    generation = retriever.generation
+
+    with retriever.bulk_load() as report:
+        for i in range(0, 40, 8):
+            retriever.add_chunks(chunks[i : i + 8])
+        probe = np.array(chunks[0].embedding, dtype=np.float32)
+        assert retriever.query(probe, k=1) == []
+        retriever.save()
+        assert not index_path.exists()
+
+    assert report.indexed == 40
+    assert retriever.generation == generation + 1
+    for chunk in chunks:
+        results = retriever.query(np.array(chunk.embedding, dtype=np.float32), k=1)
+        assert results[0].chunk.chunk_id == chunk.chunk_id
+
+
+def _sparse_chunk(turn_id: str, text: str, weights: dict[str, float]) -> Chunk:
+    return _make_chunk(turn_id, text).model_copy(update={"lexical_weights": weights})
+
+
+def test_query_hybrid_surfaces_lexical_match(db, tmp_dir):
+    retriever = SimilarityRetriever(
+        db=db, dim=16, max_elements=100, index_path=tmp_dir / "h.bin"
+    )
+    turn = TranscriptStore(db).append("user", "tickets")
+    chunks = [
+        _sparse_chunk(turn.turn_id, f"filler {i}", {str(100 + i): 0.2}) for i in range(40)
+    ]
+    target = _sparse_chunk(turn.turn_id, "ticket ABC-1234", {"7": 0.9, "8": 0.4})
+    retriever.add_chunks(chunks + [target])
+
+    # A query vector far from the target: dense search alone misses it
+    query_vec = -np.array(target.embedding, dtype=np.float32)
+    dense = retriever.query(query_vec, k=3)
+    assert target.chunk_id not in [r.chunk.chunk_id for r in dense]
+
+    hybrid = retriever.query_hybrid(query_vec, {"7": 1.0}, k=3, sparse_weight=5.0)
+    assert hybrid[0].chunk.chunk_id == target.chunk_id
+    assert hybrid[0].score == pytest.approx(-1.0 + 5.0 * 0.9, abs=1e-2)
+
+    # Weights are stored packed and the inverted index is rebuilt on load
+    (blob,) = db.execute(
+        "SELECT lexical_weights FROM chunks WHERE chunk_id = ?", (target.chunk_id,)
+    ).fetchone()
+    assert isinstance(blob, bytes)
+    retriever.close()
+    reopened = SimilarityRetriever(
+        db=db, dim=16, max_elements=100, index_path=tmp_dir / "h.bin"
+    )
+    assert len(reopened.lexical_index) == 41
+    again = reopened.query_hybrid(query_vec, {"7": 1.0}, k=1, sparse_weight=5.0)
+    assert again[0].chunk.chunk_id == target.chunk_id
+
+    full = reopened.query_hybrid(
+        query_vec, {"7": 1.0}, k=1, sparse_weight=5.0, include_vectors=True
+    )
+    assert full[0].chunk.lexical_weights["7"] == pytest.approx(0.9, abs=1e-3)
+
+
+def test_query_hybrid_empty(retriever):
+    assert retriever.query_hybrid(np.ones(16, dtype=np.float32), {"1": 1.0}) == []
+
+
+def test_query_bm25(db, retriever):
+    turn = TranscriptStore(db).append("user", "logs")
+    chunks = [
+        _make_chunk(turn.turn_id, "deploy failed with ZX-4471"),
+        _make_chunk(turn.turn_id, "deploy succeeded"),
+        _make_chunk(turn.turn_id, "lunch plans"),
+    ]
+    retriever.add_chunks(chunks)
+
+    hits = retriever.query_bm25("ZX-4471 deploy", k=5)
+    assert [r.chunk.chunk_id for r in hits] == [chunks[0].chunk_id, chunks[1].chunk_id]
+    assert hits[0].score > hits[1].score > 0
+    assert hits[0].turn.turn_id == turn.turn_id
+    assert retriever.query_bm25("nothing matches", k=5) == []
+    assert retriever.query_bm25('" *', k=5) == []
+
+
+def test_auto_backend_promotes_to_hnsw(db, tmp_dir):
+    store = TranscriptStore(db)
+    turn = store.append("user", "promotion")
+    index_path = tmp_dir / "auto.bin"
+    retriever = SimilarityRetriever(
+        db=db, dim=16, index_path=index_path, backend="auto", exact_threshold=5
+    )
+    chunks = [_make_chunk(turn.turn_id, f"auto {i}") for i in range(8)]
+
+    retriever.add_chunks(chunks[:5])
+    assert retriever.backend == "exact"
+    retriever.save()
+    assert not index_path.exists()  # nothing to persist but the store
+
+    generation = retriever.generation
+    retriever.add_chunks(chunks[5:])
+    assert retriever.backend == "hnsw"
+    assert retriever.generation > generation
+    for chunk in chunks:
+        hit = retriever.query(np.array(chunk.embedding), k=1)[0]
+        assert hit.chunk.chunk_id == chunk.chunk_id
+    retriever.close()
+    assert index_path.exists()
+
+    reopened = SimilarityRetriever(
+        db=db, dim=16, index_path=index_path, backend="auto", exact_threshold=5
+    )
+    assert reopened.backend == "hnsw"
+    assert reopened.repair_report.replayed == 0
+
+
+def test_exact_backend_reopens_from_store(db, tmp_dir):
+    store = TranscriptStore(db)
+    turn = store.append("user", "exact")
+    index_path = tmp_dir / "exact.bin"
+    retriever = SimilarityRetriever(db=db, dim=16, index_path=index_path, backend="exact")
+    chunks = [_make_chunk(turn.turn_id, f"exact {i}") for i in range(6)]
+    retriever.add_chunks(chunks)
+    retriever.close()
+
+    reopened = SimilarityRetriever(db=db, dim=16, index_path=index_path, backend="exact")
+    assert reopened.backend == "exact"
+    hits = reopened.query(np.array(chunks[3].embedding), k=6)
+    assert [h.chunk.chunk_id for h in hits][0] == chunks[3].chunk_id
+    assert hits[0].score == pytest.approx(1.0, abs=1e-5)
+    assert len(hits) == 6
+
+
+def test_rejects_unknown_backend(db):
+    with pytest.raises(ValueError):
+        SimilarityRetriever(db=db, dim=16, backend="faiss")
+
+
+def test_ivfpq_backend_trains_and_checkpoints(db, tmp_dir):
+    store = TranscriptStore(db)
+    turn = store.append("user", "ivfpq")
+    index_path = tmp_dir / "ivf.bin"
+    options = {"m": 4, "nlist": 4, "nprobe": 4, "train_size": 1000}
+    retriever = SimilarityRetriever(
+        db=db, dim=16, index_path=index_path, backend="ivfpq", backend_options=options
+    )
+    chunks = [_make_chunk(turn.turn_id, f"ivf {i}") for i in range(40)]
+    retriever.add_chunks(chunks)
+    assert retriever.backend == "ivfpq"
+
+    generation = retriever.generation
+    retriever.train_index()
+    assert retriever.generation > generation
+    hit = retriever.query(np.array(chunks[9].embedding), k=1)[0]
+    assert hit.chunk.chunk_id == chunks[9].chunk_id
+    assert hit.score == pytest.approx(1.0, abs=1e-5)
+    retriever.close()
+    assert (tmp_dir / "ivf.ivfpq").exists()
+    assert not index_path.exists()
+
+    reopened = SimilarityRetriever(
+        db=db, dim=16, index_path=index_path, backend="ivfpq", backend_options=options
+    )
+    assert reopened.repair_report.replayed == 0
+    hit = reopened.query(np.array(chunks[9].embedding), k=1)[0]
+    assert hit.chunk.chunk_id == chunks[9].chunk_id
+
+
+def test_compact_retrains_ivfpq_quantizers(db):
+    store = TranscriptStore(db)
+    turn = store.append("user", "ivfpq")
+    options = {"m": 4, "nlist": 4, "nprobe": 4, "train_size": 1000}
+    retriever = SimilarityRetriever(
+        db=db, dim=16, backend="ivfpq", backend_options=options
+    )
+    chunks = [_make_chunk(turn.turn_id, f"ivf {i}") for i in range(40)]
+    retriever.add_chunks(chunks)
+    retriever.train_index()
+    retriever.delete_chunks([c.chunk_id for c in chunks[:5]])
+
+    retriever.compact(vacuum=False)
+    assert retriever._index.trained
+    hit = retriever.query(np.array(chunks[9].embedding), k=1)[0]
+    assert hit.chunk.chunk_id == chunks[9].chunk_id
+    retriever.close()
+
+
+def test_train_index_requires_ivfpq(retriever):
+    with pytest.raises(ValueError):
+        retriever.train_index()
+
+
+def test_delete_chunks_tombstones_immediately(db, retriever):
+    store = TranscriptStore(db)
+    turn = store.append("user", "deletion")
+    chunks = [_make_chunk(turn.turn_id, f"del {i}") for i in range(6)]
+    retriever.add_chunks(chunks)
+    generation = retriever.generation
+
+    gone = [chunks[0].chunk_id, chunks[1].chunk_id]
+    assert retriever.delete_chunks(gone + ["missing"]) == 2
+    assert retriever.generation > generation
+    assert retriever.deleted_fraction == pytest.approx(2 / 6)
+    assert db.execute("SELECT COUNT(*) FROM chunks").fetchone()[0] == 4
+
+    # k beyond the live count must not trip hnswlib
+    hits = retriever.query(np.array(chunks[0].embedding), k=10)
+    assert len(hits) == 4
+    assert not {h.chunk.chunk_id for h in hits} & set(gone)
+    erased = retriever.embedding_store.matrix()[:2]
+    assert not erased.any()
+
+
+def test_compact_drops_tombstones_and_vacuums(db, tmp_dir):
+    store = TranscriptStore(db)
+    turn = store.append("user", "compaction")
+    index_path = tmp_dir / "compact.bin"
+    retriever = SimilarityRetriever(
+        db=db, dim=16, index_path=index_path, max_elements=100, compact_threshold=None
+    )
+    chunks = [_make_chunk(turn.turn_id, f"compact {i}") for i in range(30)]
+    retriever.add_chunks(chunks)
+    retriever.delete_chunks([c.chunk_id for c in chunks[:20]])
+    assert retriever.compaction_report is None
+
+    report = retriever.compact()
+    assert report.tombstones == 20
+    assert report.live_chunks == 10
+    assert report.deleted_fraction == pytest.approx(20 / 30)
+    assert report.query_ms_before > 0 and report.query_ms_after > 0
+    assert retriever.deleted_fraction == 0.0
+    assert retriever.compaction_report == report
+    hit = retriever.query(np.array(chunks[25].embedding), k=1)[0]
+    assert hit.chunk.chunk_id == chunks[25].chunk_id
+    assert retriever.query_bm25("compact", k=50)
+    retriever.close()
+
+    reopened = SimilarityRetriever(db=db, dim=16, index_path=index_path)
+    assert reopened.repair_report.index_labels == 10
+    assert reopened.deleted_fraction == 0.0
+
+
+def test_compact_to_exact_discards_saved_hnsw_index(db, tmp_dir):
+    store = TranscriptStore(db)
+    turn = store.append("user", "shrink")
+    index_path = tmp_dir / "shrink.bin"
+    options = dict(
+        dim=16, index_path=index_path, backend="auto", exact_threshold=10,
+        compact_threshold=None,
+    )
+    retriever = SimilarityRetriever(db=db, **options)
+    chunks = [_make_chunk(turn.turn_id, f"shrink {i}") for i in range(20)]
+    retriever.add_chunks(chunks)
+    retriever.save()
+    assert retriever.backend == "hnsw" and index_path.exists()
+
+    gone = {c.chunk_id for c in chunks[:15]}
+    retriever.delete_chunks(list(gone))
+    retriever.compact()
+    assert retriever.backend == "exact"
+    assert not index_path.exists()
+    assert not index_path.with_suffix(".checkpoint").exists()
+    retriever.close()
+
+    reopened = SimilarityRetriever(db=db, **options)
+    assert reopened.backend == "exact"
+    assert len(reopened._index.labels()) == 5
+    assert reopened.verify_index().orphans_deleted == 0
+    for chunk in chunks:
+        hits = reopened.query(np.array(chunk.embedding), k=5)
+        assert not {h.chunk.chunk_id for h in hits} & gone
+    hit = reopened.query(np.array(chunks[17].embedding), k=1)[0]
+    assert hit.chunk.chunk_id == chunks[17].chunk_id
+    reopened.close()
+
+
+def test_deletion_past_threshold_compacts_in_background(db):
+    store = TranscriptStore(db)
+    turn = store.append("user", "background")
+    retriever = SimilarityRetriever(db=db, dim=16, max_elements=100, compact_threshold=0.5)
+    chunks = [_make_chunk(turn.turn_id, f"bg {i}") for i in range(10)]
+    retriever.add_chunks(chunks)
+
+    retriever.delete_chunks([c.chunk_id for c in chunks[:3]])
+    assert retriever.compaction_report is None
+    retriever.delete_chunks([c.chunk_id for c in chunks[3:6]])
+    retriever.close()  # waits for the compaction
+    assert retriever.compaction_report.tombstones == 6
+    assert retriever.deleted_fraction == 0.0
+
+
+def test_reopen_counts_tombstones_in_saved_index(db, tmp_dir):
+    store = TranscriptStore(db)
+    turn = store.append("user", "reopen")
+    index_path = tmp_dir / "tomb.bin"
+    retriever = SimilarityRetriever(
+        db=db, dim=16, index_path=index_path, max_elements=100, compact_threshold=None
+    )
+    chunks = [_make_chunk(turn.turn_id, f"tomb {i}") for i in range(4)]
+    retriever.add_chunks(chunks)
+    retriever.delete_chunks([chunks[0].chunk_id])
+    retriever.close()
+
+    reopened = SimilarityRetriever(
+        db=db, dim=16, index_path=index_path, compact_threshold=None, verify_on_load=False
+    )
+    assert reopened.deleted_fraction == pytest.approx(1 / 4)
+    assert len(reopened.query(np.array(chunks[0].embedding), k=4)) == 3
@@ -0,0 +1,43 @@
+import numpy as np
+
+from memory_condense.search_cache import SearchCache, normalize_query
+
+
+def test_normalize_query():
+    assert normalize_query("  what   is\tthe key? ") == "what is the key?"
+    assert normalize_query("Case") != normalize_query("case")
+
+
+def test_embedding_lru_eviction():
+    cache = SearchCache(max_queries=2)
+    cache.put_embedding("a", np.zeros(2))
+    cache.put_embedding("b", np.ones(2))
+    assert cache.get_embedding("a") is not None  # a is now most recent
+    cache.put_embedding("c", np.ones(2))
+    assert cache.get_embedding("b") is None
+    assert cache.get_embedding(" a ") is not None
+    stats = cache.stats()
+    assert (stats.embedding_hits, stats.embedding_misses) == (2, 1)
+    assert stats.embedding_entries == 2
+
+
+def test_results_keyed_on_params_and_generation():
+    cache = SearchCache()
+    cache.put_results("q", 1, ["r1"], k=5, ef_search=50)
+    assert cache.get_results("q", 1, k=5, ef_search=50) == ["r1"]
+    assert cache.get_results("q", 1, k=10, ef_search=50) is None
+
+    # A newer generation drops everything cached for older ones
+    assert cache.get_results("q", 2, k=5, ef_search=50) is None
+    assert cache.stats().result_entries == 0
+
+    # Results computed against a stale generation are not stored
+    cache.put_results("q", 1, ["old"], k=5, ef_search=50)
+    assert cache.stats().result_entries == 0
+
+
+def test_cached_results_are_copies():
+    cache = SearchCache()
+    cache.put_results("q", 0, ["r1"], k=1)
+    cache.get_results("q", 0, k=1).append("mutated")
+    assert cache.get_results("q", 0, k=1) == ["r1"]
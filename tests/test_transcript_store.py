@@ -1,3 +1,7 @@
+import threading
+
+import pytest
+
 from memory_condense.transcript_store import TranscriptStore
 
 
@@ -47,3 +51,59 @@ def test_get_all(db):
     assert len(all_turns) == 2
     assert all_turns[0].text == "a"
     assert all_turns[1].text == "b"
+
+
+def test_append_many(db):
+    store = TranscriptStore(db)
+    turns = store.append_many([("user", "a"), ("assistant", "b"), ("user", "c")])
+    assert [t.text for t in turns] == ["a", "b", "c"]
+    assert store.count() == 3
+    assert [t.text for t in store.get_all()] == ["a", "b", "c"]
+
+
+def test_insert_many_keeps_ids(db):
+    from memory_condense.schemas import Turn
+
+    store = TranscriptStore(db)
+    built = [Turn(role="user", text="x"), Turn(role="assistant", text="y")]
+    store.insert_many(built)
+    assert store.get_turn(built[1].turn_id).text == "y"
+    assert store.count() == 2
+
+
+def test_delete_turns(db):
+    store = TranscriptStore(db)
+    keep = store.append("user", "keep")
+    drop = store.append("assistant", "drop")
+    assert store.delete_turns([drop.turn_id, "missing"]) == 1
+    assert [t.turn_id for t in store.get_all()] == [keep.turn_id]
+
+
+def test_append_survives_another_threads_rollback(db, monkeypatch):
+    store = TranscriptStore(db)
+    execute = db.execute
+    failed = []
+
+    def failing_transaction():
+        with pytest.raises(RuntimeError):
+            with db.transaction():
+                raise RuntimeError("boom")
+        failed.append(True)
+
+    other = threading.Thread(target=failing_transaction)
+
+    def execute_then_race(sql, params=()):
+        cur = execute(sql, params)
+        # Another thread's transaction fails between the insert and its commit
+        other.start()
+        other.join(timeout=0.2)
+        return cur
+
+    monkeypatch.setattr(db, "execute", execute_then_race)
+    turn = store.append("user", "kept")
+    monkeypatch.undo()
+    other.join(timeout=5)
+
+    assert failed == [True]
+    assert store.get_turn(turn.turn_id) is not None
+    assert store.count() == 1
@@ -0,0 +1,149 @@
+import numpy as np
+import pytest
+
+from memory_condense.embedding_store import EmbeddingStore
+from memory_condense.vector_backend import ExactBackend, HnswBackend, IvfPqBackend
+
+
+def _unit_vectors(n: int, dim: int = 16, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    vecs = rng.standard_normal((n, dim)).astype(np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+def _exact(vectors: np.ndarray, precision: str = "float32") -> ExactBackend:
+    store = EmbeddingStore(dim=vectors.shape[1], precision=precision)
+    store.append(vectors)
+    backend = ExactBackend(store, block_rows=7)
+    backend.add(store.vectors(np.arange(len(vectors))), np.arange(len(vectors)))
+    return backend
+
+
+@pytest.mark.parametrize("precision", ["float32", "float16", "int8"])
+def test_exact_matches_brute_force(precision):
+    vectors = _unit_vectors(50)
+    queries = _unit_vectors(4, seed=1) * 3.0  # queries need not be normalized
+    backend = _exact(vectors, precision)
+
+    labels, sims = backend.search(queries, k=5)
+    expected = np.argsort(-(queries @ vectors.T), axis=1)[:, :5]
+    assert labels.shape == sims.shape == (4, 5)
+    np.testing.assert_array_equal(labels, expected)
+    assert np.all(np.diff(sims, axis=1) <= 0)
+    if precision == "float32":
+        np.testing.assert_allclose(
+            sims, np.take_along_axis(_unit_vectors(4, seed=1) @ vectors.T, expected, 1),
+            rtol=1e-5,
+        )
+
+
+def test_exact_mark_deleted_and_missing_labels():
+    vectors = _unit_vectors(10)
+    store = EmbeddingStore(dim=16)
+    store.append(vectors)
+    backend = ExactBackend(store)
+    backend.add(vectors[:6], np.arange(6))  # labels 6..9 never added
+
+    assert len(backend) == 6
+    assert backend.mark_deleted(2)
+    assert not backend.mark_deleted(2)
+    assert not backend.mark_deleted(8)
+    np.testing.assert_array_equal(backend.labels(), np.arange(6))
+
+    labels, _ = backend.search(vectors[2:3], k=6)
+    assert 2 not in labels[0, :5]
+    assert labels[0, -1] == -1  # only five labels are searchable
+
+
+def test_exact_agrees_with_hnsw():
+    vectors = _unit_vectors(200)
+    queries = _unit_vectors(10, seed=2)
+    hnsw = HnswBackend(dim=16, max_elements=50)  # forces a resize
+    hnsw.add(vectors, np.arange(200))
+    assert len(hnsw) == 200
+
+    hnsw_labels, hnsw_sims = hnsw.search(queries, k=3, ef_search=200)
+    exact_labels, exact_sims = _exact(vectors).search(queries, k=3)
+    np.testing.assert_array_equal(hnsw_labels, exact_labels)
+    np.testing.assert_allclose(hnsw_sims, exact_sims, atol=1e-5)
+
+
+def _clustered(n: int, dim: int = 32, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centroids = _unit_vectors(8, dim, seed=seed + 100)
+    vecs = centroids[rng.integers(0, 8, n)] + 0.2 * rng.standard_normal((n, dim))
+    return (vecs / np.linalg.norm(vecs, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _ivfpq(vectors: np.ndarray, **options) -> IvfPqBackend:
+    store = EmbeddingStore(dim=vectors.shape[1])
+    store.append(vectors)
+    backend = IvfPqBackend(store, **options)
+    backend.add(vectors, np.arange(len(vectors)))
+    return backend
+
+
+def test_ivfpq_searches_exactly_until_trained():
+    vectors = _clustered(100)
+    backend = _ivfpq(vectors, train_size=1000)
+    assert not backend.trained
+
+    labels, sims = backend.search(vectors[:3], k=1)
+    np.testing.assert_array_equal(labels[:, 0], [0, 1, 2])
+    np.testing.assert_allclose(sims[:, 0], 1.0, atol=1e-5)
+
+
+def test_ivfpq_trains_at_train_size_and_recalls_neighbours():
+    vectors = _clustered(2000)
+    queries = _clustered(20, seed=7)
+    backend = _ivfpq(vectors, m=8, nlist=16, nprobe=4, train_size=1000)
+    assert backend.trained
+    assert len(backend) == 2000
+    np.testing.assert_array_equal(np.sort(backend.labels()), np.arange(2000))
+
+    labels, sims = backend.search(queries, k=10)
+    truth, _ = _exact(vectors).search(queries, k=10)
+    recall = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(labels, truth)])
+    assert recall >= 0.8
+    # Returned scores come from the exact re-rank
+    expected = np.einsum("qkd,qd->qk", vectors[labels], queries)
+    np.testing.assert_allclose(sims, expected, atol=1e-5)
+
+
+def test_ivfpq_tombstones_and_roundtrip(tmp_dir):
+    vectors = _clustered(600)
+    backend = _ivfpq(vectors, m=4, nlist=8, nprobe=8, train_size=500)
+    assert backend.mark_deleted(5)
+    assert not backend.mark_deleted(5)
+    labels, _ = backend.search(vectors[5:6], k=5)
+    assert 5 not in labels[0]
+
+    backend.save(tmp_dir / "index.ivfpq")
+    loaded = IvfPqBackend.load(tmp_dir / "index.ivfpq", backend._store, nprobe=8)
+    assert loaded.trained
+    assert len(loaded) == 600
+    reloaded, _ = loaded.search(vectors[5:6], k=5)
+    np.testing.assert_array_equal(reloaded, labels)
+
+
+def test_ivfpq_search_sees_labels_added_mid_search(monkeypatch):
+    vectors = _clustered(620)
+    backend = _ivfpq(vectors[:600], m=4, nlist=8, nprobe=8, train_size=500)
+    backend._store.append(vectors[600:])
+    list_of = backend._list
+
+    def add_then_list(*args):
+        # An add() landing between the snapshot and the list reads grows
+        # the tombstone array past the one this search holds.
+        if len(backend) == 600:
+            backend.add(vectors[600:], np.arange(600, 620))
+        return list_of(*args)
+
+    monkeypatch.setattr(backend, "_list", add_then_list)
+    labels, _ = backend.search(vectors[610:611], k=1)
+    assert labels[0, 0] == 610
+
+
+def test_ivfpq_rejects_m_not_dividing_dim():
+    with pytest.raises(ValueError):
+        IvfPqBackend(EmbeddingStore(dim=10), m=3)